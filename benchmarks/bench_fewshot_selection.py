@@ -0,0 +1,85 @@
+"""
+Benchmark few-shot example selection.
+
+Measures how long `FewShotSelector` takes to index a dataset and to pick the
+top-k examples for a prompt, and compares the size of the resulting prompt
+with the static FEW_SHOT_PROMPT. `--scale` replicates the dataset (with the
+copies' inputs perturbed so they stay distinct) to estimate the cost on
+larger datasets.
+
+Usage:
+    uv run python benchmarks/bench_fewshot_selection.py [dataset.json] [--scale N]
+"""
+
+import argparse
+import statistics
+import time
+from pathlib import Path
+
+from flare_ai_social.prompts import (
+    FEW_SHOT_PROMPT,
+    ZERO_SHOT_PROMPT,
+    FewShotExample,
+    FewShotSelector,
+)
+from flare_ai_social.prompts.selector import render_examples
+
+DEFAULT_DATASET = Path(__file__).parent.parent / "src" / "data" / "training_data.json"
+QUERIES = [
+    "What is FAssets?",
+    "Where can I short memecoins on Flare?",
+    "Is Chainlink better than the FTSO?",
+    "When will XRP staking come to Flare?",
+    "gm",
+    "Why would anyone bridge DOGE?",
+]
+
+
+def scale_examples(examples: list[FewShotExample], scale: int) -> list[FewShotExample]:
+    """Replicate the examples, tagging each copy so its input stays unique."""
+    return [
+        FewShotExample(f"{example.text_input} copy{i}", example.output)
+        for i in range(scale)
+        for example in examples
+    ]
+
+
+def main() -> None:
+    description = (__doc__ or "").strip().partition("\n")[0]
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("dataset", nargs="?", type=Path, default=DEFAULT_DATASET)
+    parser.add_argument("--scale", type=int, default=1)
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    examples = FewShotSelector.from_json(args.dataset).examples
+    examples = scale_examples(examples, args.scale) if args.scale > 1 else examples
+
+    start = time.perf_counter()
+    selector = FewShotSelector(examples, k=args.k)
+    build_ms = (time.perf_counter() - start) * 1e3
+
+    timings: list[float] = []
+    for _ in range(args.repeat):
+        for query in QUERIES:
+            start = time.perf_counter()
+            selector.select(query)
+            timings.append((time.perf_counter() - start) * 1e6)
+    timings.sort()
+
+    prompt_chars = [
+        len(ZERO_SHOT_PROMPT) + len(render_examples(selector.select(query)))
+        for query in QUERIES
+    ]
+
+    print(f"examples: {len(examples)}, k={args.k}")
+    print(f"index build: {build_ms:8.2f} ms")
+    print(f"select p50:  {statistics.median(timings):8.2f} us")
+    print(f"select p99:  {timings[int(len(timings) * 0.99)]:8.2f} us")
+    print(f"static prompt:   {len(FEW_SHOT_PROMPT):6d} chars")
+    print(f"selected prompt: {statistics.mean(prompt_chars):6.0f} chars (mean)")
+
+
+if __name__ == "__main__":
+    main()
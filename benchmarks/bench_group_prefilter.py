@@ -0,0 +1,123 @@
+"""
+Benchmark the Telegram group-chat pre-filter on recorded group traffic.
+
+Compares the per-message cost of the old handler prelude (building the debug
+dump of the update and scanning the text for mentions) with
+`GroupMentionFilter`, which rejects unaddressed group messages before the
+handler runs.
+
+The traffic file holds one Telegram `Message` JSON object per line, as returned
+by the Bot API. The bundled sample is synthetic supergroup traffic with a
+realistic mix of mentions, replies and links, addressed to @FlarePulseBot.
+
+Usage:
+    uv run python benchmarks/bench_group_prefilter.py [traffic.jsonl] [--repeat N]
+"""
+
+import argparse
+import json
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from telegram import Message, Update, User
+
+from flare_ai_social.telegram.prefilter import GroupMentionFilter
+
+DEFAULT_TRAFFIC = Path(__file__).parent / "data" / "group_traffic.jsonl"
+BOT = User(
+    id=7000000001, first_name="Flare Pulse", is_bot=True, username="FlarePulseBot"
+)
+
+
+def load_traffic(path: Path) -> list[Update]:
+    """Load recorded messages and wrap them in updates."""
+    with path.open() as f:
+        return [
+            Update(update_id=i, message=Message.de_json(json.loads(line), None))
+            for i, line in enumerate(f)
+            if line.strip()
+        ]
+
+
+def legacy_prelude(update: Update) -> bool:
+    """The work `handle_message` used to do for every group message."""
+    message = update.message
+    if message is None or message.text is None or BOT.username is None:
+        return False
+    text = message.text
+
+    # _dump_update
+    dump: dict[str, Any] = {
+        "message_id": message.message_id,
+        "from_user": message.from_user.to_dict() if message.from_user else None,
+        "chat": message.chat.to_dict(),
+        "date": str(message.date),
+        "text": text,
+        "has_entities": bool(message.entities),
+    }
+    if message.entities:
+        dump["entities"] = [
+            {
+                "type": e.type,
+                "offset": e.offset,
+                "length": e.length,
+                "text": text[e.offset : e.offset + e.length],
+            }
+            for e in message.entities
+        ]
+
+    # _process_group_chat_mention
+    for entity in message.entities:
+        if entity.type == "mention":
+            mention_text = text[entity.offset : entity.offset + entity.length]
+            mention = mention_text[1:].lower() if mention_text.startswith("@") else ""
+            if mention == BOT.username.lower():
+                return True
+    for variation in [f"@{BOT.username}", f"@{BOT.username.lower()}"]:
+        if variation.lower() in text.lower():
+            idx = text.lower().find(variation.lower())
+            if idx >= 0:
+                return True
+    reply = message.reply_to_message
+    return bool(reply and reply.from_user and reply.from_user.id == BOT.id)
+
+
+def measure(
+    check: Callable[[Update], object], updates: list[Update], repeat: int
+) -> tuple[float, int]:
+    """Return the mean cost per message in microseconds and the pass count."""
+    passed = sum(1 for update in updates if check(update))
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for update in updates:
+            check(update)
+    elapsed = time.perf_counter() - start
+    return elapsed / (repeat * len(updates)) * 1e6, passed
+
+
+def main() -> None:
+    description = (__doc__ or "").strip().partition("\n")[0]
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("traffic", nargs="?", type=Path, default=DEFAULT_TRAFFIC)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    updates = load_traffic(args.traffic)
+    mention_filter = GroupMentionFilter()
+    mention_filter.set_bot(BOT)
+
+    legacy_us, legacy_passed = measure(legacy_prelude, updates, args.repeat)
+    filter_us, filter_passed = measure(
+        mention_filter.check_update, updates, args.repeat
+    )
+
+    print(f"messages: {len(updates)} (repeat {args.repeat})")
+    print(f"legacy prelude: {legacy_us:8.2f} us/msg, {legacy_passed} addressed")
+    print(f"pre-filter:     {filter_us:8.2f} us/msg, {filter_passed} addressed")
+    print(f"speedup:        {legacy_us / filter_us:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark passage retrieval.
+
+Measures how long the RetrievalProvider takes to embed a prompt with the
+hashing embedder and to search a memory-mapped float16 passage store of
+`--passages` random vectors for the top-k passages. The store is written to a
+temporary directory and loaded the way the provider stack loads it.
+
+Usage:
+    uv run python benchmarks/bench_passage_search.py [--passages N] [--dim D]
+"""
+
+import argparse
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from flare_ai_social.ai import HashingEmbedder
+from flare_ai_social.rag import Passage, PassageStore
+
+QUERIES = [
+    "What is FAssets?",
+    "How does the FTSO compute its prices?",
+    "Can the FDC prove a Bitcoin payment?",
+    "When will XRP staking come to Flare?",
+    "gm",
+]
+
+
+def random_store(passages: int, dim: int) -> PassageStore:
+    """Store of random unit vectors with placeholder passages."""
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((passages, dim), dtype=np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return PassageStore(
+        vectors.astype(np.float16),
+        [Passage(f"doc{i}.md", f"Doc {i}", "text") for i in range(passages)],
+        "hashing",
+    )
+
+
+def main() -> None:
+    description = (__doc__ or "").strip().partition("\n")[0]
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--passages", type=int, default=20000)
+    parser.add_argument("--dim", type=int, default=512)
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    embedder = HashingEmbedder(args.dim)
+    with tempfile.TemporaryDirectory() as tmp:
+        random_store(args.passages, args.dim).save(Path(tmp))
+        store = PassageStore.load(Path(tmp))
+        size_mb = sum(p.stat().st_size for p in Path(tmp).glob("*.npy")) / 2**20
+
+        embed_us: list[float] = []
+        search_ms: list[float] = []
+        for _ in range(args.repeat):
+            for query in QUERIES:
+                start = time.perf_counter()
+                vector = embedder.embed([query])[0]
+                embed_us.append((time.perf_counter() - start) * 1e6)
+                start = time.perf_counter()
+                store.search(vector, args.k)
+                search_ms.append((time.perf_counter() - start) * 1e3)
+        del store
+    search_ms.sort()
+
+    print(f"passages: {args.passages}, dim={args.dim}, k={args.k}")
+    print(f"vectors file: {size_mb:8.2f} MiB (float16)")
+    print(f"embed p50:    {statistics.median(embed_us):8.2f} us")
+    print(f"search p50:   {statistics.median(search_ms):8.2f} ms")
+    print(f"search p99:   {search_ms[int(len(search_ms) * 0.99)]:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
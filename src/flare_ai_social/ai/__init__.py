@@ -5,16 +5,117 @@ from .base import (
     GenerationConfig,
     ModelResponse,
 )
+from .batch import BatchExecutor, BatchResult, BatchStats, SupportsBatch
+from .cache import CachedProvider, ResponseCache, no_cache
+from .cascade import CascadePolicy, CascadeProvider
+from .coalesce import SingleFlight, normalize_prompt
+from .deadline import (
+    DeadlineExceededError,
+    budget,
+    deadline,
+    deadline_misses,
+    fits,
+    remaining,
+)
+from .faq import FAQEntry, FAQIndex
+from .fewshot import FewShotProvider
 from .gemini import GeminiProvider
-from .openrouter import AsyncOpenRouterProvider, OpenRouterProvider
+from .hedged import CircuitBreaker, HedgedProvider, LatencyTracker
+from .keys import KeyPool, KeyUsage, QuotaExhaustedError
+from .memory import ConversationMemory, ConversationStore, ProviderSummarizer
+from .model_router import ModelRouter, RoutedOpenRouterProvider
+from .openrouter import (
+    AsyncOpenRouterProvider,
+    OpenRouterAIProvider,
+    OpenRouterProvider,
+)
+from .registry import ModelRegistry, Variant
+from .retrieval import (
+    RetrievalProvider,
+    current_query,
+    render_passages,
+    retrieval_query,
+)
+from .scheduler import (
+    OverloadedError,
+    Priority,
+    RequestScheduler,
+    SchedulerProvider,
+    TrafficClass,
+    traffic,
+    traffic_source,
+)
+from .semantic_cache import (
+    GeminiEmbedder,
+    HashingEmbedder,
+    SemanticCacheProvider,
+    VectorIndex,
+)
+from .shadow import ShadowProvider, ShadowRecord, ShadowStore
+from .transport import TransportConfig
+from .wrapper import ProviderWrapper
 
 __all__ = [
     "AsyncOpenRouterProvider",
     "BaseAIProvider",
+    "BatchExecutor",
+    "BatchResult",
+    "BatchStats",
+    "CachedProvider",
+    "CascadePolicy",
+    "CascadeProvider",
     "ChatRequest",
+    "CircuitBreaker",
     "CompletionRequest",
+    "ConversationMemory",
+    "ConversationStore",
+    "DeadlineExceededError",
+    "FAQEntry",
+    "FAQIndex",
+    "FewShotProvider",
+    "GeminiEmbedder",
     "GeminiProvider",
     "GenerationConfig",
+    "HashingEmbedder",
+    "HedgedProvider",
+    "KeyPool",
+    "KeyUsage",
+    "LatencyTracker",
+    "ModelRegistry",
     "ModelResponse",
+    "ModelRouter",
+    "OpenRouterAIProvider",
     "OpenRouterProvider",
+    "OverloadedError",
+    "Priority",
+    "ProviderSummarizer",
+    "ProviderWrapper",
+    "QuotaExhaustedError",
+    "RequestScheduler",
+    "ResponseCache",
+    "RetrievalProvider",
+    "RoutedOpenRouterProvider",
+    "SchedulerProvider",
+    "SemanticCacheProvider",
+    "ShadowProvider",
+    "ShadowRecord",
+    "ShadowStore",
+    "SingleFlight",
+    "SupportsBatch",
+    "TrafficClass",
+    "TransportConfig",
+    "Variant",
+    "VectorIndex",
+    "budget",
+    "current_query",
+    "deadline",
+    "deadline_misses",
+    "fits",
+    "no_cache",
+    "normalize_prompt",
+    "remaining",
+    "render_passages",
+    "retrieval_query",
+    "traffic",
+    "traffic_source",
 ]
@@ -1,9 +1,22 @@
+import asyncio
+import json
+import time
 from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator
 from dataclasses import dataclass
-from typing import Any, Protocol, TypedDict, runtime_checkable
+from typing import Any, NotRequired, Protocol, Self, TypedDict, runtime_checkable
 
 import httpx
-import requests
+import structlog
+
+from flare_ai_social.ai.deadline import budget
+from flare_ai_social.ai.transport import (
+    TransportConfig,
+    is_retryable_error,
+    retry_statuses,
+)
+
+logger = structlog.get_logger(__name__)
 
 
 @dataclass
@@ -73,6 +86,82 @@ class BaseAIProvider(ABC):
             ModelResponse containing the response text and metadata
         """
 
+    async def agenerate_content(
+        self,
+        prompt: str,
+        response_mime_type: str | None = None,
+        response_schema: Any | None = None,
+        *,
+        timeout: float | None = None,  # noqa: ASYNC109
+    ) -> ModelResponse:
+        """Asynchronously generate a response without conversation context
+
+        Providers without a native async API run `generate_content` in a
+        worker thread. Cancelling the awaiting task abandons the call.
+
+        Args:
+            prompt: Input text prompt
+            response_mime_type: Expected response format
+            response_schema: Expected response structure schema
+            timeout: Seconds to wait before raising TimeoutError
+
+        Returns:
+            ModelResponse containing the generated text and metadata
+        """
+        async with asyncio.timeout(timeout):
+            return await asyncio.to_thread(
+                self.generate_content, prompt, response_mime_type, response_schema
+            )
+
+    async def asend_message(
+        self,
+        msg: str,
+        *,
+        timeout: float | None = None,  # noqa: ASYNC109
+    ) -> ModelResponse:
+        """Asynchronously send a message in a conversational context
+
+        Providers without a native async API run `send_message` in a
+        worker thread.
+
+        Args:
+            msg: Input message text
+            timeout: Seconds to wait before raising TimeoutError
+
+        Returns:
+            ModelResponse containing the response text and metadata
+        """
+        async with asyncio.timeout(timeout):
+            return await asyncio.to_thread(self.send_message, msg)
+
+    async def stream_content(self, prompt: str) -> AsyncIterator[str]:
+        """Stream a response without maintaining conversation context
+
+        Providers without a native streaming API yield the complete
+        `agenerate_content` result as a single chunk.
+
+        Args:
+            prompt: Input text prompt
+
+        Yields:
+            Successive text chunks of the generated response
+        """
+        yield (await self.agenerate_content(prompt)).text
+
+    async def stream_message(self, msg: str) -> AsyncIterator[str]:
+        """Stream a response in a conversational context
+
+        Providers without a native streaming API yield the complete
+        `asend_message` result as a single chunk.
+
+        Args:
+            msg: Input message text
+
+        Yields:
+            Successive text chunks of the response
+        """
+        yield (await self.asend_message(msg)).text
+
 
 class Message(TypedDict):
     role: str
@@ -91,37 +180,62 @@ class ChatRequest(TypedDict):
     messages: list[Message]
     max_tokens: int
     temperature: float
+    response_format: NotRequired[dict[str, Any]]
+    stream: NotRequired[bool]
+    provider: NotRequired[dict[str, Any]]
 
 
 class BaseRouter:
     """A base class to handle HTTP requests and common logic for API interaction."""
 
-    def __init__(self, base_url: str, api_key: str | None = None) -> None:
+    def __init__(
+        self,
+        base_url: str,
+        api_key: str | None = None,
+        transport: TransportConfig | None = None,
+    ) -> None:
         """
         :param base_url: The base URL for the API.
         :param api_key: Optional API key for authentication.
+        :param transport: Pool, retry and timeout settings.
         """
         self.base_url = base_url.rstrip("/")  # Ensure no trailing slash
         self.api_key = api_key
-        self.session = requests.Session()
+        self.transport = transport or TransportConfig()
+        # Pooled session retrying connection errors, 429 and 5xx responses
+        self.session = self.transport.requests_session()
         # Set up headers: include the Authorization header if an API key is provided.
         self.headers = {"accept": "application/json"}
         if self.api_key:
             self.headers["Authorization"] = f"Bearer {self.api_key}"
 
-    def _get(self, endpoint: str, params: dict | None = None) -> dict:
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def _timeout(self, timeout: float | None) -> tuple[float, float]:
+        """Connect and read timeouts of a request."""
+        read_timeout = budget(timeout or self.transport.timeout)
+        return (self.transport.connect_timeout, read_timeout)
+
+    def _get(
+        self, endpoint: str, params: dict | None = None, timeout: float | None = None
+    ) -> dict:
         """
         Make a GET request to the API and return the JSON response.
 
         :param endpoint: The API endpoint (should begin with a slash, e.g., "/models").
         :param params: Optional query parameters.
+        :param timeout: Optional read timeout in seconds.
         :return: JSON response as a dictionary.
         """
         params = params or {}
 
         url = self.base_url + endpoint
         response = self.session.get(
-            url=url, params=params, headers=self.headers, timeout=30, ssl=False
+            url=url, params=params, headers=self.headers, timeout=self._timeout(timeout)
         )
 
         success_status = 200
@@ -134,6 +248,7 @@ class BaseRouter:
         self,
         endpoint: str,
         json_payload: dict[str, Any] | CompletionRequest | ChatRequest,
+        timeout: float | None = None,
     ) -> dict:
         """
         Make a POST request to the API with a JSON payload and return the JSON response.
@@ -141,11 +256,15 @@ class BaseRouter:
         :param endpoint: The API endpoint (should begin with a slash,
             e.g., "/completions").
         :param json_payload: The JSON payload to send.
+        :param timeout: Optional read timeout in seconds.
         :return: JSON response as a dictionary.
         """
         url = self.base_url + endpoint
         response = self.session.post(
-            url=url, headers=self.headers, json=json_payload, timeout=30
+            url=url,
+            headers=self.headers,
+            json=json_payload,
+            timeout=self._timeout(timeout),
         )
 
         success_status = 200
@@ -154,36 +273,135 @@ class BaseRouter:
         msg = f"Error ({response.status_code}): {response.text}"
         raise ConnectionError(msg)
 
+    def close(self) -> None:
+        """
+        Close the pooled connections.
+        """
+        self.session.close()
+
 
 class AsyncBaseRouter:
     """
     An asynchronous base class to handle HTTP requests and
     common logic for API interaction.
+
+    The HTTP client is created on first use and again after `close`, so a
+    router can be closed on application shutdown and reused after a restart.
     """
 
-    def __init__(self, base_url: str, api_key: str | None = None) -> None:
+    def __init__(
+        self,
+        base_url: str,
+        api_key: str | None = None,
+        transport: TransportConfig | None = None,
+    ) -> None:
         """
         :param base_url: The base URL for the API.
         :param api_key: Optional API key for authentication.
+        :param transport: Pool, retry and timeout settings.
         """
         self.base_url = base_url.rstrip("/")
         self.api_key = api_key
-        self.client = httpx.AsyncClient(timeout=30.0)
+        self.transport = transport or TransportConfig()
+        self._client: httpx.AsyncClient | None = None
         self.headers = {"accept": "application/json"}
         if self.api_key:
             self.headers["Authorization"] = f"Bearer {self.api_key}"
 
-    async def _get(self, endpoint: str, params: dict | None = None) -> dict:
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.close()
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """The pooled HTTP client, opened on first use."""
+        if self._client is None or self._client.is_closed:
+            self._client = self.transport.httpx_client()
+        return self._client
+
+    async def _send(
+        self,
+        request: httpx.Request,
+        deadline: float,
+        *,
+        stream: bool = False,
+    ) -> httpx.Response:
+        """
+        Send a request, retrying connection errors and transient statuses.
+
+        Non-idempotent requests are only retried when the server cannot have
+        acted on them (see `transport.retry_statuses`).
+
+        Retries wait with jittered exponential backoff, or as long as the
+        server's `Retry-After` asks, and stop once the deadline would be
+        passed. The last response is returned whatever its status.
+
+        :param request: The request to send.
+        :param deadline: `time.monotonic()` value by which to give up.
+        :param stream: Return before reading the body (for SSE responses).
+        :return: The final response.
+        """
+        attempt = 0
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                msg = f"Deadline exceeded for {request.method} {request.url}"
+                raise TimeoutError(msg)
+            request.extensions["timeout"] = httpx.Timeout(
+                remaining, connect=min(remaining, self.transport.connect_timeout)
+            ).as_dict()
+            try:
+                response = await self.client.send(request, stream=stream)
+            except httpx.TransportError as e:
+                delay = self.transport.retry_delay(attempt)
+                if (
+                    not is_retryable_error(request.method, e)
+                    or attempt >= self.transport.retries
+                    or time.monotonic() + delay >= deadline
+                ):
+                    if isinstance(e, httpx.TimeoutException):
+                        raise TimeoutError(str(e)) from e
+                    raise ConnectionError(str(e)) from e
+            else:
+                delay = self.transport.retry_delay(
+                    attempt, response.headers.get("Retry-After")
+                )
+                if (
+                    response.status_code not in retry_statuses(request.method)
+                    or attempt >= self.transport.retries
+                    or time.monotonic() + delay >= deadline
+                ):
+                    return response
+                await response.aclose()
+            logger.debug("Retrying request", url=str(request.url), delay=delay)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def _deadline(self, timeout: float | None) -> float:
+        return time.monotonic() + budget(timeout or self.transport.timeout)
+
+    async def _get(
+        self,
+        endpoint: str,
+        params: dict | None = None,
+        timeout: float | None = None,  # noqa: ASYNC109
+    ) -> dict:
         """
         Make an asynchronous GET request to the API and return the JSON response.
 
         :param endpoint: The API endpoint (should begin with a slash, e.g., "/models").
         :param params: Optional query parameters.
+        :param timeout: Optional deadline in seconds, retries included.
         :return: JSON response as a dictionary.
         """
         params = params or {}
         url = self.base_url + endpoint
-        response = await self.client.get(url, params=params, headers=self.headers)
+        request = self.client.build_request(
+            "GET", url, params=params, headers=self.headers
+        )
+        response = await self._send(request, self._deadline(timeout))
 
         success_status = 200
         if response.status_code == success_status:
@@ -195,6 +413,7 @@ class AsyncBaseRouter:
         self,
         endpoint: str,
         json_payload: dict[str, Any] | CompletionRequest | ChatRequest,
+        timeout: float | None = None,  # noqa: ASYNC109
     ) -> dict:
         """
         Make an asynchronous POST request to the API with a JSON
@@ -203,10 +422,14 @@ class AsyncBaseRouter:
         :param endpoint: The API endpoint
             (should begin with a slash, e.g., "/completions").
         :param json_payload: The JSON payload to send.
+        :param timeout: Optional deadline in seconds, retries included.
         :return: JSON response as a dictionary.
         """
         url = self.base_url + endpoint
-        response = await self.client.post(url, headers=self.headers, json=json_payload)
+        request = self.client.build_request(
+            "POST", url, headers=self.headers, json=json_payload
+        )
+        response = await self._send(request, self._deadline(timeout))
 
         success_status = 200
         if response.status_code == success_status:
@@ -214,8 +437,52 @@ class AsyncBaseRouter:
         msg = f"Error ({response.status_code}): {response.text}"
         raise ConnectionError(msg)
 
+    async def _stream_post(
+        self,
+        endpoint: str,
+        json_payload: dict[str, Any] | CompletionRequest | ChatRequest,
+        timeout: float | None = None,  # noqa: ASYNC109
+    ) -> AsyncIterator[dict]:
+        """
+        Make an asynchronous POST request answered with server-sent events
+        and yield the JSON object carried by each `data:` line.
+
+        Comment lines (used by some APIs as keep-alives) are skipped and the
+        stream ends at the `[DONE]` sentinel. Only opening the stream is
+        retried; an error mid-stream is raised to the caller.
+
+        :param endpoint: The API endpoint
+            (should begin with a slash, e.g., "/chat/completions").
+        :param json_payload: The JSON payload to send.
+        :param timeout: Optional deadline in seconds for opening the stream.
+        :return: Async iterator over the decoded events.
+        """
+        url = self.base_url + endpoint
+        headers = {**self.headers, "accept": "text/event-stream"}
+        request = self.client.build_request(
+            "POST", url, headers=headers, json=json_payload
+        )
+        response = await self._send(request, self._deadline(timeout), stream=True)
+        try:
+            success_status = 200
+            if response.status_code != success_status:
+                await response.aread()
+                msg = f"Error ({response.status_code}): {response.text}"
+                raise ConnectionError(msg)
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line.removeprefix("data:").strip()
+                if data == "[DONE]":
+                    break
+                if data:
+                    yield json.loads(data)
+        finally:
+            await response.aclose()
+
     async def close(self) -> None:
         """
         Close the underlying asynchronous HTTP client.
         """
-        await self.client.aclose()
+        if self._client is not None:
+            await self._client.aclose()
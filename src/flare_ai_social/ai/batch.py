@@ -0,0 +1,247 @@
+"""
+Batch Execution Module
+
+Runs lists of one-shot prompts for non-interactive workloads (model
+comparisons, evaluations, backfills) concurrently instead of one call at a
+time. Calls are capped by a concurrency limit and an optional request rate,
+results come back in input order with per-item errors instead of failing the
+whole run, and aggregate throughput and latency are reported.
+
+Providers exposing `agenerate_batch` (see `SupportsBatch`) receive prompts in
+chunks of `batch_size` per request; every other provider gets one call per
+prompt.
+
+Batch calls are attributed to the "batch" traffic source, so a scheduler
+serves them after interactive traffic.
+"""
+
+import asyncio
+import time
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Any, Protocol, runtime_checkable
+
+import numpy as np
+import structlog
+
+from flare_ai_social.ai.base import BaseAIProvider, ModelResponse
+from flare_ai_social.ai.scheduler import traffic
+
+logger = structlog.get_logger(__name__)
+
+
+@runtime_checkable
+class SupportsBatch(Protocol):
+    """Provider answering several prompts with a single request"""
+
+    async def agenerate_batch(
+        self,
+        prompts: Sequence[str],
+        response_mime_type: str | None = None,
+        response_schema: Any | None = None,
+    ) -> list[ModelResponse | Exception]: ...
+
+
+@dataclass
+class BatchResult:
+    """Outcome of one prompt of a batch"""
+
+    index: int
+    prompt: str
+    response: ModelResponse | None
+    error: Exception | None
+    latency: float  # seconds, of the request that answered the prompt
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class BatchStats:
+    """Aggregate outcome of a batch run"""
+
+    items: int
+    succeeded: int
+    failed: int
+    elapsed: float  # wall-clock seconds
+    p50_latency: float
+    p95_latency: float
+
+    @property
+    def throughput(self) -> float:
+        """Prompts completed per second."""
+        return self.items / self.elapsed if self.elapsed else 0.0
+
+
+class RateLimiter:
+    """
+    Spaces calls evenly to at most `rate` per second.
+
+    Attributes:
+        rate (float): Calls per second
+    """
+
+    def __init__(self, rate: float) -> None:
+        self.rate = rate
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Wait until the next call slot."""
+        async with self._lock:
+            now = time.monotonic()
+            wait = self._next - now
+            self._next = max(now, self._next) + 1 / self.rate
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class BatchExecutor:
+    """
+    Concurrent, rate-limited executor of one-shot prompts.
+
+    Attributes:
+        provider (BaseAIProvider): Provider answering the prompts
+        concurrency (int): Requests in flight at most
+        requests_per_minute (float | None): Request rate cap, unlimited if None
+        batch_size (int): Prompts per request for providers supporting batches
+        timeout (float | None): Seconds allowed per request
+        last_stats (BatchStats | None): Stats of the most recent run
+    """
+
+    def __init__(
+        self,
+        provider: BaseAIProvider,
+        *,
+        concurrency: int = 8,
+        requests_per_minute: float | None = None,
+        batch_size: int = 16,
+        timeout: float | None = None,
+    ) -> None:
+        """
+        Initialize the executor.
+
+        Args:
+            provider: Provider answering the prompts
+            concurrency: Requests in flight at most
+            requests_per_minute: Request rate cap, unlimited if None or 0
+            batch_size: Prompts per request for providers supporting batches
+            timeout: Seconds allowed per request
+        """
+        self.provider = provider
+        self.concurrency = concurrency
+        self.requests_per_minute = requests_per_minute
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self.last_stats: BatchStats | None = None
+
+    async def arun(
+        self,
+        prompts: Sequence[str],
+        response_mime_type: str | None = None,
+        response_schema: Any | None = None,
+    ) -> list[BatchResult]:
+        """
+        Answer all prompts, returning the results in input order.
+
+        A failing prompt does not stop the run; its result carries the error.
+
+        Args:
+            prompts: Prompts to answer
+            response_mime_type: Expected MIME type of every response
+            response_schema: Schema of every response
+
+        Returns:
+            list[BatchResult]: One result per prompt, in input order
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+        limiter = (
+            RateLimiter(self.requests_per_minute / 60)
+            if self.requests_per_minute
+            else None
+        )
+        batched = isinstance(self.provider, SupportsBatch)
+        size = self.batch_size if batched else 1
+        chunks = [
+            range(i, min(i + size, len(prompts))) for i in range(0, len(prompts), size)
+        ]
+
+        async def run_chunk(indexes: range) -> list[BatchResult]:
+            async with semaphore:
+                if limiter is not None:
+                    await limiter.acquire()
+                started = time.monotonic()
+                try:
+                    async with asyncio.timeout(self.timeout):
+                        outcomes = await self._call(
+                            [prompts[i] for i in indexes],
+                            response_mime_type,
+                            response_schema,
+                            batched=batched,
+                        )
+                except Exception as e:  # noqa: BLE001
+                    outcomes = [e] * len(indexes)
+                latency = time.monotonic() - started
+            return [
+                BatchResult(
+                    index=i,
+                    prompt=prompts[i],
+                    response=None if isinstance(o, Exception) else o,
+                    error=o if isinstance(o, Exception) else None,
+                    latency=latency,
+                )
+                for i, o in zip(indexes, outcomes, strict=True)
+            ]
+
+        started = time.monotonic()
+        with traffic("batch"):
+            groups = await asyncio.gather(*(run_chunk(c) for c in chunks))
+        results = [result for group in groups for result in group]
+        self.last_stats = _stats(results, time.monotonic() - started)
+        logger.info(
+            "Batch finished",
+            **vars(self.last_stats),
+            throughput=round(self.last_stats.throughput, 3),
+        )
+        return results
+
+    def run(
+        self,
+        prompts: Sequence[str],
+        response_mime_type: str | None = None,
+        response_schema: Any | None = None,
+    ) -> list[BatchResult]:
+        """Synchronous version of `arun` for scripts."""
+        return asyncio.run(self.arun(prompts, response_mime_type, response_schema))
+
+    async def _call(
+        self,
+        prompts: list[str],
+        response_mime_type: str | None,
+        response_schema: Any | None,
+        *,
+        batched: bool,
+    ) -> list[ModelResponse | Exception]:
+        if batched:
+            outcomes = await self.provider.agenerate_batch(  # pyright: ignore [reportAttributeAccessIssue]
+                prompts, response_mime_type, response_schema
+            )
+            return list(outcomes)
+        response = await self.provider.agenerate_content(
+            prompts[0], response_mime_type, response_schema
+        )
+        return [response]
+
+
+def _stats(results: list[BatchResult], elapsed: float) -> BatchStats:
+    latencies = np.array([r.latency for r in results], dtype=float)
+    succeeded = sum(r.ok for r in results)
+    return BatchStats(
+        items=len(results),
+        succeeded=succeeded,
+        failed=len(results) - succeeded,
+        elapsed=round(elapsed, 3),
+        p50_latency=float(np.quantile(latencies, 0.5)) if len(results) else 0.0,
+        p95_latency=float(np.quantile(latencies, 0.95)) if len(results) else 0.0,
+    )
@@ -0,0 +1,375 @@
+"""
+Response Cache Module
+
+Caches the answers to one-shot generations so identical prompts (repeated FAQ
+questions, greetings, `compare.py` re-runs) are answered without calling the
+model. Entries are keyed by model name, a hash of the system instruction, the
+prompt and the generation config, and held in an in-memory LRU with a TTL,
+optionally backed by a SQLite file that survives restarts.
+
+Conversational calls (`send_message` and friends) depend on chat state and
+are never cached; other calls can opt out with the `no_cache()` context.
+
+Lookups use the wrapped provider's model name. A provider that routes calls
+between models (the ModelRegistry) reports the model that answered through
+`report_served_model`, and the answer is stored under that model instead, so
+an A/B variant's answers are never served as the primary model's.
+"""
+
+import contextlib
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Iterator
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, override
+
+import structlog
+
+from flare_ai_social.ai.base import BaseAIProvider, ModelResponse
+from flare_ai_social.ai.wrapper import ProviderWrapper
+
+logger = structlog.get_logger(__name__)
+
+_bypass: ContextVar[bool] = ContextVar("response_cache_bypass", default=False)
+_served: ContextVar[tuple[list[str], ...]] = ContextVar("served_models", default=())
+
+
+@contextlib.contextmanager
+def no_cache() -> Iterator[None]:
+    """Skip the response caches for calls made inside this context."""
+    token = _bypass.set(True)
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
+
+
+def cache_bypassed() -> bool:
+    """Whether the current call runs inside `no_cache()`."""
+    return _bypass.get()
+
+
+@contextlib.contextmanager
+def served_models() -> Iterator[list[str]]:
+    """Collect the models reported to answer the calls made in this context."""
+    served: list[str] = []
+    previous = _served.get()
+    _served.set((*previous, served))
+    try:
+        yield served
+    finally:
+        # Restored rather than reset: a stream may be closed from another context
+        _served.set(previous)
+
+
+def report_served_model(model_name: str) -> None:
+    """Tell the enclosing caches which model answers the current call."""
+    for served in _served.get():
+        served.append(model_name)
+
+
+def cache_key(
+    model_name: str,
+    system_instruction: str | None,
+    prompt: str,
+    config: dict[str, Any] | None = None,
+) -> str:
+    """
+    Build the cache key of a generation.
+
+    Args:
+        model_name: Model identifier
+        system_instruction: System instruction the model runs with
+        prompt: Input prompt
+        config: Generation settings that affect the answer
+
+    Returns:
+        str: Hex SHA-256 digest identifying the generation
+    """
+    instruction_hash = hashlib.sha256((system_instruction or "").encode()).hexdigest()
+    payload = json.dumps(
+        [model_name, instruction_hash, prompt, config or {}],
+        sort_keys=True,
+        default=repr,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ResponseCache:
+    """
+    LRU cache of model responses with expiry and an optional SQLite tier.
+
+    Thread-safe, since sync generations run in worker threads.
+
+    Attributes:
+        max_entries (int): Entries kept in memory
+        ttl (float): Seconds an entry stays valid
+        hits (int): Lookups answered from memory
+        disk_hits (int): Lookups answered from the SQLite tier
+        misses (int): Lookups that found nothing
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl: float = 3600.0,
+        db_path: Path | None = None,
+    ) -> None:
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Entries kept in memory before the least recently used
+                one is evicted
+            ttl: Seconds an entry stays valid
+            db_path: SQLite file for the persistent tier, None to keep
+                entries in memory only
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[float, ModelResponse]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: sqlite3.Connection | None = None
+        if db_path is not None:
+            db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, text TEXT NOT NULL, "
+                "metadata TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._db.execute(
+                "DELETE FROM responses WHERE expires_at < ?", (time.time(),)
+            )
+            self._db.commit()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> ModelResponse | None:
+        """Return the cached response for a key, or None if absent or expired."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, response = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return response
+                del self._entries[key]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT text, metadata, expires_at FROM responses "
+                    "WHERE key = ? AND expires_at > ?",
+                    (key, now),
+                ).fetchone()
+                if row is not None:
+                    text, metadata, expires_at = row
+                    response = ModelResponse(
+                        text=text, raw_response=None, metadata=json.loads(metadata)
+                    )
+                    self._store(key, expires_at, response)
+                    self.disk_hits += 1
+                    return response
+
+            self.misses += 1
+            return None
+
+    def put(self, key: str, response: ModelResponse) -> None:
+        """Cache a response, replacing the raw provider object with None."""
+        expires_at = time.time() + self.ttl
+        metadata = {**_json_safe(response.metadata), "cached": True}
+        cached = ModelResponse(text=response.text, raw_response=None, metadata=metadata)
+        with self._lock:
+            self._store(key, expires_at, cached)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)",
+                    (key, cached.text, json.dumps(metadata), expires_at),
+                )
+                self._db.commit()
+
+    def _store(self, key: str, expires_at: float, response: ModelResponse) -> None:
+        self._entries[key] = (expires_at, response)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all entries from both tiers."""
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses")
+                self._db.commit()
+
+    def close(self) -> None:
+        """Close the SQLite tier."""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    @property
+    def hit_ratio(self) -> float:
+        """Fraction of lookups answered from either tier."""
+        lookups = self.hits + self.disk_hits + self.misses
+        return (self.hits + self.disk_hits) / lookups if lookups else 0.0
+
+    def stats(self) -> dict[str, float]:
+        """Return cache counters for logging."""
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hit_ratio, 3),
+        }
+
+
+class CachedProvider(ProviderWrapper):
+    """
+    Provider that answers repeated one-shot generations from a ResponseCache.
+
+    `generate_content`, `agenerate_content` and `stream_content` are cached;
+    conversational calls go straight to the wrapped provider.
+
+    Attributes:
+        cache (ResponseCache): Cache holding the responses
+    """
+
+    def __init__(
+        self, provider: BaseAIProvider, cache: ResponseCache | None = None
+    ) -> None:
+        """
+        Initialize the caching provider.
+
+        Args:
+            provider: Provider that handles cache misses
+            cache: Cache to use, a memory-only ResponseCache by default
+        """
+        super().__init__(provider)
+        self.cache = cache if cache is not None else ResponseCache()
+
+    def key(
+        self,
+        prompt: str,
+        response_mime_type: str | None = None,
+        response_schema: Any | None = None,
+        *,
+        served: list[str] | None = None,
+    ) -> str:
+        """
+        Return the cache key of a generation by the wrapped provider, or by
+        the last model in `served` if one was reported.
+        """
+        return cache_key(
+            served[-1] if served else self.model_name,
+            self.system_instruction,
+            prompt,
+            {
+                "response_mime_type": response_mime_type,
+                "response_schema": response_schema,
+            },
+        )
+
+    @override
+    def generate_content(
+        self,
+        prompt: str,
+        response_mime_type: str | None = None,
+        response_schema: Any | None = None,
+    ) -> ModelResponse:
+        if cache_bypassed():
+            return super().generate_content(prompt, response_mime_type, response_schema)
+        cached = self.cache.get(self.key(prompt, response_mime_type, response_schema))
+        if cached is not None:
+            return cached
+        with served_models() as served:
+            response = super().generate_content(
+                prompt, response_mime_type, response_schema
+            )
+        if response.text:
+            key = self.key(prompt, response_mime_type, response_schema, served=served)
+            self.cache.put(key, response)
+        return response
+
+    @override
+    async def agenerate_content(
+        self,
+        prompt: str,
+        response_mime_type: str | None = None,
+        response_schema: Any | None = None,
+        *,
+        timeout: float | None = None,  # noqa: ASYNC109
+    ) -> ModelResponse:
+        if cache_bypassed():
+            return await super().agenerate_content(
+                prompt, response_mime_type, response_schema, timeout=timeout
+            )
+        cached = self.cache.get(self.key(prompt, response_mime_type, response_schema))
+        if cached is not None:
+            return cached
+        with served_models() as served:
+            response = await super().agenerate_content(
+                prompt, response_mime_type, response_schema, timeout=timeout
+            )
+        if response.text:
+            key = self.key(prompt, response_mime_type, response_schema, served=served)
+            self.cache.put(key, response)
+        return response
+
+    @override
+    async def stream_content(self, prompt: str) -> AsyncIterator[str]:
+        """
+        Stream a response, replaying cached answers as a single chunk.
+
+        A streamed answer is cached once the stream completes.
+        """
+        if cache_bypassed():
+            async for chunk in super().stream_content(prompt):
+                yield chunk
+            return
+        cached = self.cache.get(self.key(prompt))
+        if cached is not None:
+            yield cached.text
+            return
+        parts: list[str] = []
+        with served_models() as served:
+            async for chunk in super().stream_content(prompt):
+                parts.append(chunk)
+                yield chunk
+        text = "".join(parts)
+        if text:
+            self.cache.put(
+                self.key(prompt, served=served),
+                ModelResponse(text=text, raw_response=None, metadata={}),
+            )
+
+    @override
+    async def aclose(self) -> None:
+        logger.info("Response cache stats", **self.cache.stats())
+        self.cache.close()
+        await super().aclose()
+
+
+def _json_safe(metadata: dict[str, Any]) -> dict[str, Any]:
+    """Drop metadata values that cannot be stored as JSON."""
+    safe: dict[str, Any] = {}
+    for name, value in metadata.items():
+        try:
+            json.dumps(value)
+        except TypeError:
+            continue
+        safe[name] = value
+    return safe
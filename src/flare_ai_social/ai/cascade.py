@@ -0,0 +1,260 @@
+"""
+Model Cascade Module
+
+Answers one-shot prompts with a small, fast model first and escalates to the
+large (tuned) model only when needed. Two cheap local checks decide:
+
+- before the call, prompts that look complex (long, several questions, many
+  technical terms) skip the small tier entirely. The user's question named
+  by `retrieval_query()` is judged when set, because the few-shot and
+  retrieval layers above and the callers' conversation history expand the
+  prompt that reaches the cascade;
+- after the call, answers that look unreliable (empty, truncated, hedging,
+  invalid JSON when JSON was requested) are discarded and the prompt is
+  escalated.
+
+Conversational and streaming calls always go to the large model: it owns
+the chat session, and a small-tier answer has to be checked whole before any
+of it is shown, which would collapse a stream into a single chunk. Per-tier
+hit rates and the latency saved by answering from the small tier are kept in
+`stats()`.
+"""
+
+import json
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any, override
+
+import structlog
+
+from flare_ai_social.ai.base import BaseAIProvider, ModelResponse
+from flare_ai_social.ai.hedged import LatencyTracker
+from flare_ai_social.ai.retrieval import current_query
+from flare_ai_social.ai.wrapper import ProviderWrapper
+from flare_ai_social.prompts.selector import tokenize
+
+logger = structlog.get_logger(__name__)
+
+# Words that mark a prompt as needing protocol knowledge the tuned model has
+TECHNICAL_TERMS = frozenset(
+    {
+        "apr", "apy", "attestation", "bridge", "consensus", "contract",
+        "delegate", "delegation", "fassets", "fdc", "ftso", "governance",
+        "liquidity", "oracle", "protocol", "slashing", "smart", "stake",
+        "staking", "tokenomics", "validator", "wrap", "wrapped", "yield",
+    }
+)  # fmt: skip
+
+# Phrases showing the small model is unsure of its answer
+HEDGING_PHRASES = (
+    "i'm not sure",
+    "i am not sure",
+    "i don't know",
+    "i do not know",
+    "not certain",
+    "can't answer",
+    "cannot answer",
+    "unable to answer",
+    "as an ai",
+)
+
+# Finish reasons of a complete answer (OpenRouter lowercase, Gemini enum names)
+COMPLETE_FINISH_REASONS = frozenset({"stop", "STOP"})
+
+
+@dataclass
+class CascadePolicy:
+    """Thresholds of the local complexity and confidence checks"""
+
+    max_prompt_words: int = 40
+    max_questions: int = 1
+    max_technical_terms: int = 1
+    min_answer_chars: int = 2
+
+    def prompt_is_simple(self, prompt: str) -> bool:
+        """Whether the small model may try the prompt."""
+        words = tokenize(prompt)
+        return (
+            len(words) <= self.max_prompt_words
+            and prompt.count("?") <= self.max_questions
+            and sum(w in TECHNICAL_TERMS for w in words) <= self.max_technical_terms
+        )
+
+    def answer_is_confident(
+        self, response: ModelResponse, response_mime_type: str | None = None
+    ) -> bool:
+        """Whether an answer of the small model can be returned as is."""
+        text = response.text.strip()
+        if len(text) < self.min_answer_chars:
+            return False
+        finish_reason = response.metadata.get("finish_reason")
+        if finish_reason is not None and str(finish_reason) not in (
+            COMPLETE_FINISH_REASONS
+        ):
+            return False
+        lowered = text.casefold()
+        if any(phrase in lowered for phrase in HEDGING_PHRASES):
+            return False
+        if response_mime_type == "application/json":
+            try:
+                json.loads(text)
+            except json.JSONDecodeError:
+                return False
+        return True
+
+
+class CascadeProvider(ProviderWrapper):
+    """
+    Provider trying a small model before the wrapped large model.
+
+    Attributes:
+        small (BaseAIProvider): Fast, cheap model tried first
+        policy (CascadePolicy): Complexity and confidence checks
+        latency (dict[str, LatencyTracker]): Latencies of the small calls
+            and of the large calls
+        counts (dict[str, int]): Prompts answered by the small tier
+            ("small"), escalated after a small call ("escalated") and sent
+            straight to the large model ("skipped")
+    """
+
+    def __init__(
+        self,
+        small: BaseAIProvider,
+        large: BaseAIProvider,
+        policy: CascadePolicy | None = None,
+    ) -> None:
+        """
+        Initialize the cascade.
+
+        Args:
+            small: Fast, cheap model tried first
+            large: Model used for complex prompts, escalations and chats
+            policy: Complexity and confidence checks, defaults if omitted
+        """
+        super().__init__(large)
+        self.small = small
+        self.policy = policy or CascadePolicy()
+        self.latency = {"small": LatencyTracker(), "large": LatencyTracker()}
+        self.counts = {"small": 0, "escalated": 0, "skipped": 0}
+        self._wasted = 0.0  # seconds spent on small calls that were escalated
+
+    def stats(self) -> dict[str, Any]:
+        """Per-tier hit rates and estimated latency savings."""
+        total = sum(self.counts.values())
+        small_p50 = self.latency["small"].quantile(0.5)
+        large_p50 = self.latency["large"].quantile(0.5)
+        saved = 0.0
+        if small_p50 is not None and large_p50 is not None:
+            saved = self.counts["small"] * (large_p50 - small_p50) - self._wasted
+        return {
+            **self.counts,
+            "small_hit_rate": self.counts["small"] / total if total else 0.0,
+            "large_hit_rate": (total - self.counts["small"]) / total if total else 0.0,
+            "small_p50": small_p50,
+            "large_p50": large_p50,
+            "seconds_saved": round(saved, 3),
+        }
+
+    def _accept(
+        self,
+        response: ModelResponse | None,
+        elapsed: float,
+        response_mime_type: str | None,
+    ) -> ModelResponse | None:
+        """Keep a small-tier answer if it passes the confidence check."""
+        if response is not None:
+            self.latency["small"].observe(elapsed)
+            if self.policy.answer_is_confident(response, response_mime_type):
+                self.counts["small"] += 1
+                response.metadata["cascade_tier"] = "small"
+                return response
+        self.counts["escalated"] += 1
+        self._wasted += elapsed
+        logger.debug("Escalating to large model", elapsed=elapsed)
+        return None
+
+    def _escalated(self, response: ModelResponse, elapsed: float) -> ModelResponse:
+        self.latency["large"].observe(elapsed)
+        response.metadata["cascade_tier"] = "large"
+        return response
+
+    @override
+    def generate_content(
+        self,
+        prompt: str,
+        response_mime_type: str | None = None,
+        response_schema: Any | None = None,
+    ) -> ModelResponse:
+        if self.policy.prompt_is_simple(current_query() or prompt):
+            started = time.monotonic()
+            try:
+                response = self.small.generate_content(
+                    prompt, response_mime_type, response_schema
+                )
+            except Exception as e:  # noqa: BLE001
+                logger.warning("Small model failed", error=str(e))
+                response = None
+            accepted = self._accept(
+                response, time.monotonic() - started, response_mime_type
+            )
+            if accepted is not None:
+                return accepted
+        else:
+            self.counts["skipped"] += 1
+
+        started = time.monotonic()
+        response = super().generate_content(prompt, response_mime_type, response_schema)
+        return self._escalated(response, time.monotonic() - started)
+
+    @override
+    async def agenerate_content(
+        self,
+        prompt: str,
+        response_mime_type: str | None = None,
+        response_schema: Any | None = None,
+        *,
+        timeout: float | None = None,  # noqa: ASYNC109
+    ) -> ModelResponse:
+        accepted = await self._asmall(
+            prompt,
+            response_mime_type,
+            lambda: self.small.agenerate_content(
+                prompt, response_mime_type, response_schema, timeout=timeout
+            ),
+        )
+        if accepted is not None:
+            return accepted
+
+        started = time.monotonic()
+        response = await super().agenerate_content(
+            prompt, response_mime_type, response_schema, timeout=timeout
+        )
+        return self._escalated(response, time.monotonic() - started)
+
+    async def _asmall(
+        self,
+        prompt: str,
+        response_mime_type: str | None,
+        call: Callable[[], Awaitable[ModelResponse]],
+    ) -> ModelResponse | None:
+        """Try the small tier, returning its answer only if it is trusted."""
+        if not self.policy.prompt_is_simple(current_query() or prompt):
+            self.counts["skipped"] += 1
+            return None
+        started = time.monotonic()
+        try:
+            response = await call()
+        except Exception as e:  # noqa: BLE001
+            logger.warning("Small model failed", error=str(e))
+            response = None
+        return self._accept(response, time.monotonic() - started, response_mime_type)
+
+    @override
+    async def aclose(self) -> None:
+        """Log the cascade stats and close both tiers."""
+        logger.info("Model cascade stats", **self.stats())
+        aclose = getattr(self.small, "aclose", None)
+        if aclose is not None:
+            await aclose()
+        await super().aclose()
@@ -0,0 +1,105 @@
+"""
+Request Coalescing Module
+
+Collapses concurrent identical generations into one provider call. The first
+caller for a key runs the generation; callers that arrive while it is in flight
+await the same result instead of issuing their own request. Keys are prompts
+normalized for case, whitespace and trailing punctuation, so "What is FTSO?"
+and "what is ftso" share one call.
+"""
+
+import asyncio
+import re
+from collections.abc import Awaitable, Callable
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+_TRAILING_PUNCTUATION = " ?!.,;:"
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Normalize a prompt into a coalescing key."""
+    return _WHITESPACE.sub(" ", prompt.casefold()).strip(_TRAILING_PUNCTUATION)
+
+
+class _LeaderCancelledError(Exception):
+    """The call that followers were waiting on was cancelled."""
+
+
+class SingleFlight[T]:
+    """
+    Deduplicate concurrent calls that share a key.
+
+    Attributes:
+        calls (int): Calls that were executed
+        coalesced (int): Calls answered with another call's result
+    """
+
+    def __init__(self) -> None:
+        self._inflight: dict[str, asyncio.Future[T]] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> tuple[T, bool]:
+        """
+        Run `fn` unless a call with the same key is already in flight.
+
+        Args:
+            key: Coalescing key, typically `normalize_prompt(prompt)`
+            fn: Zero-argument coroutine function performing the call
+
+        Returns:
+            tuple[T, bool]: The result and whether it was shared from another
+                caller's call (False for the caller that executed `fn`)
+
+        Raises:
+            Exception: Whatever the executing call raised; followers see the
+                same exception. If the executing call is cancelled, one of
+                the followers takes over instead.
+        """
+        while (future := self._inflight.get(key)) is not None:
+            try:
+                result = await asyncio.shield(future)
+            except _LeaderCancelledError:
+                continue
+            self.coalesced += 1
+            return result, True
+
+        future = asyncio.get_running_loop().create_future()
+        future.add_done_callback(_consume_exception)
+        self._inflight[key] = future
+        self.calls += 1
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.set_exception(_LeaderCancelledError())
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def stats(self) -> dict[str, int]:
+        """Return call counters for logging."""
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "inflight": len(self._inflight),
+        }
+
+
+def _consume_exception(future: asyncio.Future[object]) -> None:
+    """Mark a failed call as retrieved so asyncio does not warn without followers."""
+    if not future.cancelled():
+        future.exception()
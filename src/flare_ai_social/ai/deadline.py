@@ -0,0 +1,116 @@
+"""
+Deadline Propagation Module
+
+A request's deadline is set once where the request enters the service (an API
+call, a Telegram update, a mention) and travels with it in a context variable,
+so every generation and HTTP call below shares one budget instead of applying
+its own fixed timeout. Work still running when the deadline passes is
+cancelled, letting the entry point answer with its fallback promptly, and
+retries that could not finish in time are not started.
+
+Misses are counted per stage (see `deadline_misses`). Worker threads started
+with `asyncio.to_thread` inherit the deadline of the awaiting task.
+"""
+
+import asyncio
+import threading
+import time
+from collections import Counter
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import overload
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+# Absolute `time.monotonic()` deadline of the current request, if any
+_deadline: ContextVar[float | None] = ContextVar("deadline", default=None)
+
+_misses: Counter[str] = Counter()
+_misses_lock = threading.Lock()
+
+
+class DeadlineExceededError(TimeoutError):
+    """Raised when a request's work did not finish before its deadline."""
+
+    def __init__(self, stage: str) -> None:
+        super().__init__(f"Deadline exceeded during {stage}")
+        self.stage = stage
+
+
+@asynccontextmanager
+async def deadline(seconds: float | None, stage: str) -> AsyncIterator[None]:
+    """
+    Bound the enclosed work to `seconds` from now.
+
+    A nested deadline can only tighten the enclosing one. When the deadline
+    passes, the enclosed work is cancelled, the miss is counted under `stage`
+    and DeadlineExceededError is raised.
+
+    Args:
+        seconds: Budget of the enclosed work, None to keep the enclosing
+            deadline (or none)
+        stage: Name the miss is counted under, e.g. "telegram.reply"
+
+    Raises:
+        DeadlineExceededError: If the work was still running at the deadline
+    """
+    outer = _deadline.get()
+    at = outer if seconds is None else time.monotonic() + seconds
+    if outer is not None and at is not None:
+        at = min(at, outer)
+    token = _deadline.set(at)
+    loop = asyncio.get_running_loop()
+    when = None if at is None else loop.time() + (at - time.monotonic())
+    try:
+        async with asyncio.timeout_at(when):
+            yield
+    except DeadlineExceededError:
+        raise
+    except TimeoutError as e:
+        # Inner timeouts derived from this deadline expire at the same time
+        if at is None or time.monotonic() < at:
+            raise
+        record_miss(stage)
+        raise DeadlineExceededError(stage) from e
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> float | None:
+    """Seconds left until the current deadline, None without one."""
+    at = _deadline.get()
+    return None if at is None else max(at - time.monotonic(), 0.0)
+
+
+@overload
+def budget(timeout: float) -> float: ...
+@overload
+def budget(timeout: float | None) -> float | None: ...
+def budget(timeout: float | None) -> float | None:
+    """The smaller of `timeout` and the time left until the current deadline."""
+    left = remaining()
+    if left is None:
+        return timeout
+    return left if timeout is None else min(timeout, left)
+
+
+def fits(delay: float) -> bool:
+    """Whether waiting `delay` seconds still leaves time before the deadline."""
+    left = remaining()
+    return left is None or delay < left
+
+
+def record_miss(stage: str) -> None:
+    """Count a deadline miss of `stage`."""
+    with _misses_lock:
+        _misses[stage] += 1
+    logger.warning("Deadline exceeded", stage=stage)
+
+
+def deadline_misses() -> dict[str, int]:
+    """Deadline misses counted so far, per stage."""
+    with _misses_lock:
+        return dict(_misses)
@@ -0,0 +1,155 @@
+"""
+FAQ Answer Module
+
+Answers the questions asked over and over (what is FTSO, FDC, FAssets, how to
+stake XRP) from a curated list instead of calling the model. A message is
+looked up by its normalized text first, a single hash lookup; failing that it
+is compared with every question and alias by the overlap of their content
+words, so "What's FTSO??" and "ftso - what is it" both find the FTSO entry.
+Both steps take microseconds for a list of a few dozen entries.
+
+Long messages are never matched: they usually ask something more specific
+than the FAQ answers.
+
+Hit counts are kept per entry, so the answers worth maintaining show up in
+the statistics (see `stats`).
+"""
+
+import json
+import re
+import threading
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import structlog
+
+from flare_ai_social.ai.coalesce import normalize_prompt
+from flare_ai_social.ai.semantic_cache import STOPWORDS
+
+logger = structlog.get_logger(__name__)
+
+_WORD = re.compile(r"\w+")
+
+
+def content_words(text: str) -> frozenset[str]:
+    """Lowercase words of a text that carry its topic."""
+    # Single letters are mostly contraction leftovers ("what's" -> "what", "s")
+    return frozenset(
+        w for w in _WORD.findall(text.casefold()) if len(w) > 1 and w not in STOPWORDS
+    )
+
+
+@dataclass
+class FAQEntry:
+    """A curated answer and the phrasings of the question it answers"""
+
+    question: str
+    answer: str
+    aliases: list[str] = field(default_factory=list)
+    hits: int = 0
+
+    @property
+    def phrasings(self) -> list[str]:
+        return [self.question, *self.aliases]
+
+
+class FAQIndex:
+    """
+    Matcher of incoming messages against curated FAQ entries.
+
+    Safe to use from several threads (the Twitter bot runs in its own).
+
+    Attributes:
+        entries (list[FAQEntry]): Indexed entries
+        threshold (float): Minimum content-word overlap (Jaccard) of a match
+        max_words (int): Messages longer than this are never matched
+    """
+
+    def __init__(
+        self,
+        entries: Sequence[FAQEntry],
+        threshold: float = 0.7,
+        max_words: int = 20,
+    ) -> None:
+        """
+        Index the entries.
+
+        Args:
+            entries: Curated entries to answer from
+            threshold: Minimum content-word overlap (Jaccard) of a match
+            max_words: Messages longer than this are never matched
+        """
+        self.entries = list(entries)
+        self.threshold = threshold
+        self.max_words = max_words
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._exact: dict[str, FAQEntry] = {}
+        self._words: list[tuple[frozenset[str], FAQEntry]] = []
+        for entry in self.entries:
+            for phrasing in entry.phrasings:
+                self._exact.setdefault(normalize_prompt(phrasing), entry)
+                words = content_words(phrasing)
+                if words:
+                    self._words.append((words, entry))
+
+    @classmethod
+    def from_json(
+        cls, path: Path, threshold: float = 0.7, max_words: int = 20
+    ) -> "FAQIndex":
+        """Build an index from a list of question/answer/aliases objects."""
+        with path.open() as f:
+            data = json.load(f)
+        entries = [
+            FAQEntry(item["question"], item["answer"], item.get("aliases", []))
+            for item in data
+        ]
+        logger.info("FAQ loaded", entries=len(entries), path=str(path))
+        return cls(entries, threshold=threshold, max_words=max_words)
+
+    def lookup(self, message: str) -> FAQEntry | None:
+        """Return the entry answering a message without counting a hit."""
+        if len(message.split()) > self.max_words:
+            return None
+        entry = self._exact.get(normalize_prompt(message))
+        if entry is not None:
+            return entry
+        words = content_words(message)
+        if not words:
+            return None
+        best, best_score = None, self.threshold
+        for phrasing, candidate in self._words:
+            score = len(words & phrasing) / len(words | phrasing)
+            if score >= best_score:
+                best, best_score = candidate, score
+        return best
+
+    def match(self, message: str) -> FAQEntry | None:
+        """
+        Return the entry answering a message, counting the hit or miss.
+
+        Args:
+            message: The user's message, without conversation context
+
+        Returns:
+            FAQEntry | None: The matching entry, None if the model should
+                answer instead
+        """
+        entry = self.lookup(message)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+            else:
+                entry.hits += 1
+        if entry is not None:
+            logger.debug("FAQ answered", question=entry.question)
+        return entry
+
+    def stats(self) -> dict[str, int]:
+        """Hits per question, most asked first, and the number of misses."""
+        with self._lock:
+            hits = {entry.question: entry.hits for entry in self.entries}
+            misses = self.misses
+        ranked = dict(sorted(hits.items(), key=lambda item: -item[1]))
+        return {**ranked, "misses": misses}
@@ -0,0 +1,75 @@
+"""
+Dynamic Few-Shot Prompting Module
+
+Wraps a provider running with the persona-only ZERO_SHOT_PROMPT and adds the
+training examples most relevant to each prompt, replacing the fixed examples
+of FEW_SHOT_PROMPT.
+"""
+
+from collections.abc import AsyncIterator
+from typing import Any, override
+
+from flare_ai_social.ai.base import BaseAIProvider, ModelResponse
+from flare_ai_social.ai.wrapper import ProviderWrapper
+from flare_ai_social.prompts.selector import FewShotSelector, render_examples
+
+
+class FewShotProvider(ProviderWrapper):
+    """
+    Provider that prefixes one-shot prompts with selected examples.
+
+    Conversational calls are passed through unchanged so the examples do
+    not accumulate in the chat history.
+
+    Attributes:
+        selector (FewShotSelector): Chooses the examples for a prompt
+    """
+
+    def __init__(self, provider: BaseAIProvider, selector: FewShotSelector) -> None:
+        """
+        Initialize the provider.
+
+        Args:
+            provider: Provider generating the responses, normally configured
+                with ZERO_SHOT_PROMPT as its system instruction
+            selector: Chooses the examples for a prompt
+        """
+        super().__init__(provider)
+        self.selector = selector
+
+    def build_prompt(self, prompt: str) -> str:
+        """Prefix a prompt with the examples most relevant to it."""
+        examples = render_examples(self.selector.select(prompt))
+        return f"{examples}\n\n{prompt}" if examples else prompt
+
+    @override
+    def generate_content(
+        self,
+        prompt: str,
+        response_mime_type: str | None = None,
+        response_schema: Any | None = None,
+    ) -> ModelResponse:
+        return super().generate_content(
+            self.build_prompt(prompt), response_mime_type, response_schema
+        )
+
+    @override
+    async def agenerate_content(
+        self,
+        prompt: str,
+        response_mime_type: str | None = None,
+        response_schema: Any | None = None,
+        *,
+        timeout: float | None = None,  # noqa: ASYNC109
+    ) -> ModelResponse:
+        return await super().agenerate_content(
+            self.build_prompt(prompt),
+            response_mime_type,
+            response_schema,
+            timeout=timeout,
+        )
+
+    @override
+    async def stream_content(self, prompt: str) -> AsyncIterator[str]:
+        async for chunk in super().stream_content(self.build_prompt(prompt)):
+            yield chunk
@@ -4,20 +4,62 @@ Gemini AI Provider Module
 This module implements the Gemini AI provider for the AI Agent API, integrating
 with Google's Generative AI service. It handles chat sessions, content generation,
 and message management while maintaining a consistent AI personality.
+
+Chat history can be kept under a token budget: the provider mirrors each
+exchange in a ConversationMemory, and once the oldest turns are evicted the
+chat session is restarted from the remaining window, prefixed with a running
+summary of the evicted turns that is generated in the background.
+
+With a KeyPool, each request draws the API key with the most quota left and
+a key answered with 429 is quarantined while the request moves to another.
 """
 
+import asyncio
+import contextlib
+import sys
+import threading
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from datetime import timedelta
 from typing import TYPE_CHECKING, Any, override
 
+import google.ai.generativelanguage as glm
 import google.generativeai as genai
 import structlog
+from google.api_core.client_options import ClientOptions
+from google.api_core.exceptions import (
+    FailedPrecondition,
+    InvalidArgument,
+    NotFound,
+    PermissionDenied,
+    ResourceExhausted,
+)
+from google.generativeai import caching
+from google.generativeai.types import helper_types
 
 from flare_ai_social.ai.base import BaseAIProvider, ModelResponse
+from flare_ai_social.ai.deadline import budget
+from flare_ai_social.ai.keys import KeyPool, QuotaExhaustedError
+from flare_ai_social.ai.memory import (
+    ConversationMemory,
+    ProviderSummarizer,
+    Summarizer,
+)
 
 if TYPE_CHECKING:
     from google.generativeai.types import ContentDict
 
 logger = structlog.get_logger(__name__)
 
+# Raised when a model or prompt cannot be context cached, e.g. tuned models or
+# system instructions below the model's minimum cacheable token count
+CONTEXT_CACHE_UNSUPPORTED = (
+    InvalidArgument,
+    FailedPrecondition,
+    NotFound,
+    PermissionDenied,
+)
+
 
 class GeminiProvider(BaseAIProvider):
     """
@@ -31,11 +73,29 @@ class GeminiProvider(BaseAIProvider):
         chat (genai.ChatSession | None): Active chat session
         model (genai.GenerativeModel): Configured Gemini model instance
         chat_history (list[ContentDict]): History of chat interactions
+        cache_system_instruction (bool): Whether the system instruction is sent
+            as server-side cached content instead of with every request
+        cache_ttl (float): Lifetime in seconds of the cached content
+        memory (ConversationMemory | None): Token-budgeted mirror of the chat,
+            None if the history is not compacted
+        summarizer (Summarizer | None): Folds evicted turns into the summary
+        key_pool (KeyPool | None): API keys requests are spread over, None to
+            use `api_key` only
         logger (BoundLogger): Structured logger for the provider
     """
 
-    def __init__(
-        self, api_key: str, model_name: str, system_instruction: str | None = None
+    def __init__(  # noqa: PLR0913
+        self,
+        api_key: str,
+        model_name: str,
+        system_instruction: str | None = None,
+        timeout: float | None = None,
+        *,
+        cache_system_instruction: bool = False,
+        cache_ttl: float = 3600.0,
+        history_max_tokens: int | None = None,
+        summarize_history: bool = False,
+        key_pool: KeyPool | None = None,
     ) -> None:
         """
         Initialize the Gemini provider with API credentials and model configuration.
@@ -45,14 +105,52 @@ class GeminiProvider(BaseAIProvider):
             model (str): Gemini model identifier to use
             **kwargs (str): Additional configuration parameters including:
                 - system_instruction: Custom system prompt for the AI personality
+                - timeout: Default timeout in seconds for requests, shortened to
+                  the remaining time when the request has a deadline
+                - cache_system_instruction: Cache the system instruction on
+                  the server and reference it from each request
+                - cache_ttl: Lifetime in seconds of the cached content; it is
+                  renewed while the provider is in use
+                - history_max_tokens: Estimated token budget of the chat
+                  history; older turns are dropped beyond it (unbounded if None)
+                - summarize_history: Replace dropped turns with a running
+                  summary generated in the background
+                - key_pool: API keys to spread requests over; disables
+                  context caching since a cache belongs to the project of the
+                  key that created it
         """
         genai.configure(api_key=api_key)
+        self.model_name = model_name
+        self.system_instruction = system_instruction
+        self.timeout = timeout
         self.chat: genai.ChatSession | None = None
         self.model = genai.GenerativeModel(
             model_name=model_name,
             system_instruction=system_instruction,
         )
         self.chat_history: list[ContentDict] = []
+        self.cache_system_instruction = cache_system_instruction and bool(
+            system_instruction
+        )
+        self.cache_ttl = cache_ttl
+        self._cached_content: caching.CachedContent | None = None
+        self._cache_expires_at = 0.0
+        self._cache_lock = threading.Lock()
+        self.key_pool = key_pool
+        self._keyed_models: dict[str, genai.GenerativeModel] = {}
+        if key_pool is not None:
+            self.cache_system_instruction = False
+        # Only the token budget applies, not a turn count
+        self.memory = (
+            ConversationMemory(max_turns=sys.maxsize, max_tokens=history_max_tokens)
+            if history_max_tokens
+            else None
+        )
+        self.summarizer: Summarizer | None = (
+            ProviderSummarizer(self) if summarize_history else None
+        )
+        self._history_stale = False
+        self._summary_task: asyncio.Task[None] | None = None
         self.logger = logger.bind(service="gemini")
         self.logger.info(
             "model setup", model_name=model_name, system_instruction=system_instruction
@@ -67,10 +165,208 @@ class GeminiProvider(BaseAIProvider):
         """
         self.chat_history = []
         self.chat = None
+        if self.memory is not None:
+            self.memory = ConversationMemory(
+                max_turns=sys.maxsize, max_tokens=self.memory.max_tokens
+            )
+        if self._summary_task is not None:
+            self._summary_task.cancel()
+            self._summary_task = None
+        self._history_stale = False
         self.logger.debug(
             "reset_gemini", chat=self.chat, chat_history=self.chat_history
         )
 
+    def _context_cache_due(self) -> bool:
+        """Whether the cached system instruction must be created or renewed."""
+        return self.cache_system_instruction and (
+            self._cache_expires_at - time.monotonic() < self.cache_ttl / 2
+        )
+
+    def _refresh_context_cache(self) -> None:
+        """
+        Create or renew the cached system instruction.
+
+        The cache is renewed once half its TTL has passed. If the model or
+        prompt cannot be cached, caching is disabled and the system
+        instruction is sent with each request as before.
+        """
+        with self._cache_lock:
+            if not self._context_cache_due():
+                return
+            ttl = timedelta(seconds=self.cache_ttl)
+            try:
+                if self._cached_content is not None:
+                    try:
+                        self._cached_content.update(ttl=ttl)
+                    except NotFound:
+                        self._cached_content = None
+                if self._cached_content is None:
+                    self._cached_content = caching.CachedContent.create(
+                        model=self.model_name,
+                        system_instruction=self.system_instruction,
+                        ttl=ttl,
+                    )
+                    self.model = genai.GenerativeModel.from_cached_content(
+                        self._cached_content
+                    )
+                    if self.chat is not None:
+                        self.chat = self.model.start_chat(history=self.chat.history)
+                    self.logger.info(
+                        "context cache created", cache=self._cached_content.name
+                    )
+            except CONTEXT_CACHE_UNSUPPORTED as e:
+                self.logger.warning(
+                    "context caching unavailable, sending system instruction inline",
+                    error=str(e),
+                )
+                self.cache_system_instruction = False
+                return
+            self._cache_expires_at = time.monotonic() + self.cache_ttl
+
+    async def _arefresh_context_cache(self) -> None:
+        """Refresh the context cache without blocking the event loop."""
+        if self._context_cache_due():
+            await asyncio.to_thread(self._refresh_context_cache)
+
+    def _chat_session(self) -> genai.ChatSession:
+        """
+        Return the chat session, restarting it from the compacted history
+        after turns were evicted or the summary changed.
+        """
+        if self.chat is not None and not self._history_stale:
+            return self.chat
+        if self.memory is not None and self._history_stale:
+            self.chat_history = _history_from_memory(self.memory)
+        self._history_stale = False
+        self.chat = self.model.start_chat(history=self.chat_history)
+        return self.chat
+
+    def _model_for(self, key: str | None) -> genai.GenerativeModel:
+        """The model to call with an API key, or the default model."""
+        if key is None:
+            return self.model
+        model = self._keyed_models.get(key)
+        if model is None:
+            model = genai.GenerativeModel(
+                model_name=self.model_name, system_instruction=self.system_instruction
+            )
+            _bind_key(model, key)
+            self._keyed_models[key] = model
+        return model
+
+    def _with_key[T](self, call: Callable[[genai.GenerativeModel], T]) -> T:
+        """
+        Run a call on the model bound to the best key of the pool, moving to
+        another key when one is throttled.
+        """
+        if self.key_pool is None:
+            return call(self.model)
+        for attempt in range(len(self.key_pool)):
+            key = self.key_pool.acquire()
+            try:
+                return call(self._model_for(key))
+            except ResourceExhausted:
+                self.key_pool.throttled(key)
+                if attempt == len(self.key_pool) - 1:
+                    raise
+            except Exception:
+                self.key_pool.failed(key)
+                raise
+        raise QuotaExhaustedError(0.0)
+
+    async def _awith_key[T](
+        self,
+        call: Callable[[genai.GenerativeModel], Awaitable[T]],
+        max_wait: float | None = None,
+    ) -> T:
+        """
+        Async version of `_with_key`, waiting up to `max_wait` seconds (the
+        call's timeout, the provider's by default) for a key to free up.
+        """
+        if self.key_pool is None:
+            return await call(self.model)
+        max_wait = budget(max_wait or self.timeout or 60.0)
+        for attempt in range(len(self.key_pool)):
+            key = await self.key_pool.acquire_async(max_wait)
+            try:
+                return await call(self._model_for(key))
+            except ResourceExhausted:
+                self.key_pool.throttled(key)
+                if attempt == len(self.key_pool) - 1:
+                    raise
+            except Exception:
+                self.key_pool.failed(key)
+                raise
+        raise QuotaExhaustedError(0.0)
+
+    def _chat_on(self, model: genai.GenerativeModel) -> genai.ChatSession:
+        """The chat session, sending its next message through `model`."""
+        chat = self._chat_session()
+        chat.model = model
+        return chat
+
+    def _record_exchange(self, msg: str, reply: str) -> None:
+        """
+        Mirror an exchange in the token-budgeted memory.
+
+        Turns pushed out of the budget mark the session for a restart and,
+        when summarization is on, are queued for the background summary.
+        """
+        if self.memory is None:
+            return
+        evicted = self.memory.add("user", msg) + self.memory.add("model", reply)
+        if not evicted:
+            return
+        self._history_stale = True
+        self.logger.debug(
+            "compacting chat history",
+            evicted=len(evicted),
+            tokens=self.memory.token_count,
+        )
+        if self.summarizer is None:
+            return
+        self.memory.pending.extend(evicted)
+        if self._summary_task is None or self._summary_task.done():
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                # Sync callers without a loop: the turns stay pending and are
+                # summarized after the next async exchange
+                return
+            self._summary_task = loop.create_task(self._summarize(self.memory))
+
+    async def _summarize(self, memory: ConversationMemory) -> None:
+        """
+        Fold pending turns into the running summary off the request path.
+
+        If the summarizer fails or is cancelled, the turns are put back in
+        front of `pending` so the next eviction retries them.
+        """
+        while memory.pending and self.summarizer is not None:
+            turns, memory.pending = memory.pending, []
+            try:
+                summary = await self.summarizer(memory.summary, turns)
+            except Exception:
+                memory.pending[:0] = turns
+                self.logger.exception("chat_summary_failed")
+                return
+            except asyncio.CancelledError:
+                memory.pending[:0] = turns
+                raise
+            memory.set_summary(summary)
+            if memory is self.memory:
+                self._history_stale = True
+
+    async def aclose(self) -> None:
+        """Stop the background summary and delete the cached instruction."""
+        if self._summary_task is not None:
+            self._summary_task.cancel()
+        cached_content, self._cached_content = self._cached_content, None
+        if cached_content is not None:
+            with contextlib.suppress(NotFound):
+                await asyncio.to_thread(cached_content.delete)
+
     @override
     def generate_content(
         self,
@@ -94,20 +390,73 @@ class GeminiProvider(BaseAIProvider):
                     - candidate_count: Number of generated candidates
                     - prompt_feedback: Feedback on the input prompt
         """
-        response = self.model.generate_content(
-            prompt,
-            generation_config=genai.GenerationConfig(
-                response_mime_type=response_mime_type, response_schema=response_schema
-            ),
+        self._refresh_context_cache()
+        config = genai.GenerationConfig(
+            response_mime_type=response_mime_type, response_schema=response_schema
         )
-        return ModelResponse(
-            text=response.text,
-            raw_response=response,
-            metadata={
-                "candidate_count": len(response.candidates),
-                "prompt_feedback": response.prompt_feedback,
-            },
+        options = _request_options(self.timeout)
+        response = self._with_key(
+            lambda model: model.generate_content(
+                prompt, generation_config=config, request_options=options
+            )
         )
+        return _to_model_response(response)
+
+    @override
+    async def agenerate_content(
+        self,
+        prompt: str,
+        response_mime_type: str | None = None,
+        response_schema: Any | None = None,
+        *,
+        timeout: float | None = None,  # noqa: ASYNC109
+    ) -> ModelResponse:
+        """
+        Generate content using the SDK's native async API.
+
+        Args:
+            prompt (str): Input prompt for content generation
+            response_mime_type (str | None): Expected MIME type for the response
+            response_schema (Any | None): Schema defining the response structure
+            timeout (float | None): Seconds to wait, defaults to the provider's
+                timeout. The request is cancelled when it or the request's
+                deadline expires.
+
+        Returns:
+            ModelResponse: Generated content with metadata (see generate_content)
+        """
+        await self._arefresh_context_cache()
+        config = genai.GenerationConfig(
+            response_mime_type=response_mime_type, response_schema=response_schema
+        )
+        async with asyncio.timeout(budget(timeout or self.timeout)):
+            response = await self._awith_key(
+                lambda model: model.generate_content_async(
+                    prompt, generation_config=config
+                ),
+                timeout,
+            )
+        return _to_model_response(response)
+
+    @override
+    async def stream_content(self, prompt: str) -> AsyncIterator[str]:
+        """
+        Stream content from the Gemini model as it is generated.
+
+        Args:
+            prompt (str): Input prompt for content generation
+
+        Yields:
+            str: Text chunks in the order they are produced by the model
+        """
+        await self._arefresh_context_cache()
+        response = await self._awith_key(
+            lambda model: model.generate_content_async(prompt, stream=True)
+        )
+        async for chunk in response:
+            text = _chunk_text(chunk)
+            if text:
+                yield text
 
     @override
     def send_message(
@@ -130,15 +479,157 @@ class GeminiProvider(BaseAIProvider):
                     - candidate_count: Number of generated candidates
                     - prompt_feedback: Feedback on the input message
         """
-        if not self.chat:
-            self.chat = self.model.start_chat(history=self.chat_history)
-        response = self.chat.send_message(msg)
+        self._refresh_context_cache()
+        options = _request_options(self.timeout)
+        response = self._with_key(
+            lambda model: self._chat_on(model).send_message(
+                msg, request_options=options
+            )
+        )
         self.logger.debug("send_message", msg=msg, response_text=response.text)
-        return ModelResponse(
-            text=response.text,
-            raw_response=response,
-            metadata={
-                "candidate_count": len(response.candidates),
-                "prompt_feedback": response.prompt_feedback,
-            },
+        self._record_exchange(msg, response.text)
+        return _to_model_response(response)
+
+    @override
+    async def asend_message(
+        self,
+        msg: str,
+        *,
+        timeout: float | None = None,  # noqa: ASYNC109
+    ) -> ModelResponse:
+        """
+        Send a message in the chat session using the SDK's native async API.
+
+        Args:
+            msg (str): Message to send to the chat session
+            timeout (float | None): Seconds to wait, defaults to the provider's
+                timeout. The request is cancelled when it or the request's
+                deadline expires.
+
+        Returns:
+            ModelResponse: Response from the chat session (see send_message)
+        """
+        await self._arefresh_context_cache()
+        async with asyncio.timeout(budget(timeout or self.timeout)):
+            response = await self._awith_key(
+                lambda model: self._chat_on(model).send_message_async(msg), timeout
+            )
+        self.logger.debug("send_message", msg=msg, response_text=response.text)
+        self._record_exchange(msg, response.text)
+        return _to_model_response(response)
+
+    @override
+    async def stream_message(self, msg: str) -> AsyncIterator[str]:
+        """
+        Send a message in the chat session and stream the response.
+
+        The exchange is added to the chat history once the stream has been
+        fully consumed. A stream abandoned early (client disconnect, deadline)
+        or failing midway leaves the SDK session holding an unfinished
+        response that breaks its next message, so the session is restarted
+        from the history before the message.
+
+        Args:
+            msg (str): Message to send to the chat session
+
+        Yields:
+            str: Text chunks in the order they are produced by the model
+        """
+        await self._arefresh_context_cache()
+        history = list(self._chat_session().history)
+        response = await self._awith_key(
+            lambda model: self._chat_on(model).send_message_async(msg, stream=True)
         )
+        chunks: list[str] = []
+        finished = False
+        try:
+            async for chunk in response:
+                text = _chunk_text(chunk)
+                if text:
+                    chunks.append(text)
+                    yield text
+            finished = True
+        finally:
+            if not finished:
+                self.chat = self.model.start_chat(history=history)
+        self._record_exchange(msg, "".join(chunks))
+
+
+def _bind_key(model: genai.GenerativeModel, key: str) -> None:
+    """
+    Give a model clients of its own, authenticated with `key`.
+
+    The SDK only configures API keys globally. The clients are built with the
+    public google.ai.generativelanguage constructors and set on the model's
+    client slots, which google-generativeai 0.8 only fills from the global
+    configuration when they are empty; the version is pinned accordingly.
+    """
+    options = ClientOptions(api_key=key)
+    model._client = glm.GenerativeServiceClient(client_options=options)  # noqa: SLF001  # pyright: ignore [reportPrivateUsage]
+    model._async_client = glm.GenerativeServiceAsyncClient(client_options=options)  # noqa: SLF001  # pyright: ignore [reportPrivateUsage]
+
+
+def _request_options(timeout: float | None) -> helper_types.RequestOptions | None:
+    """Request options bounding a blocking call by the request's deadline."""
+    seconds = budget(timeout)
+    return None if seconds is None else helper_types.RequestOptions(timeout=seconds)
+
+
+def _history_from_memory(memory: ConversationMemory) -> list["ContentDict"]:
+    """
+    Build a chat history from the turns kept in memory.
+
+    The summary is sent as a leading user/model exchange, and a model turn
+    left at the front by eviction is dropped so roles keep alternating.
+    """
+    history: list[ContentDict] = []
+    if memory.summary:
+        history.append(
+            {
+                "role": "user",
+                "parts": [f"Summary of the earlier conversation:\n{memory.summary}"],
+            }
+        )
+        history.append({"role": "model", "parts": ["Noted."]})
+    turns = list(memory.turns)
+    while turns and turns[0].role != "user":
+        turns.pop(0)
+    history.extend({"role": turn.role, "parts": [turn.text]} for turn in turns)
+    return history
+
+
+def _to_model_response(response: Any) -> ModelResponse:
+    """
+    Wrap a Gemini response in the standardized response format.
+
+    `cached_tokens` counts the prompt tokens served from context cache, i.e.
+    the tokens saved by caching the system instruction. `finish_reason` is
+    the name of the first candidate's finish reason, e.g. "STOP".
+    """
+    usage = getattr(response, "usage_metadata", None)
+    candidate = response.candidates[0] if response.candidates else None
+    finish_reason = getattr(candidate, "finish_reason", None)
+    return ModelResponse(
+        text=response.text,
+        raw_response=response,
+        metadata={
+            "candidate_count": len(response.candidates),
+            "finish_reason": getattr(finish_reason, "name", finish_reason),
+            "prompt_feedback": response.prompt_feedback,
+            "prompt_tokens": getattr(usage, "prompt_token_count", 0),
+            "cached_tokens": getattr(usage, "cached_content_token_count", 0),
+        },
+    )
+
+
+def _chunk_text(chunk: Any) -> str:
+    """
+    Extract the text of a streamed response chunk.
+
+    The final chunk of a stream (or one cut short by safety filters) may carry
+    no parts, in which case the SDK's `text` accessor raises ValueError.
+    """
+    try:
+        return chunk.text
+    except ValueError:
+        return ""
@@ -0,0 +1,395 @@
+"""
+Hedged Provider Module
+
+Combines a primary and a backup provider to cut tail latency and survive
+outages. One-shot generations go to the primary first; if it has not answered
+within a hedge delay derived from its recent p95 latency, the same request is
+sent to the backup and whichever answers first wins while the other is
+cancelled. A provider that keeps failing trips its circuit breaker and is
+skipped until a cool-down has passed.
+
+Conversational calls are not hedged because each provider keeps its own chat
+session; they fail over to the backup when the primary errors instead.
+"""
+
+import asyncio
+import functools
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Awaitable, Callable, Coroutine
+from typing import Any, override
+
+import numpy as np
+import structlog
+
+from flare_ai_social.ai.base import BaseAIProvider, ModelResponse
+
+logger = structlog.get_logger(__name__)
+
+ERR_ALL_PROVIDERS_UNAVAILABLE = "All AI providers are unavailable"
+
+
+class LatencyTracker:
+    """
+    Sliding window of call latencies.
+
+    Attributes:
+        window (int): Number of recent samples kept
+    """
+
+    def __init__(self, window: int = 200) -> None:
+        self.window = window
+        self._samples: deque[float] = deque(maxlen=window)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def observe(self, seconds: float) -> None:
+        """
+        Record the latency of a call.
+
+        For a call cancelled before it finished, pass the time it had run:
+        a lower bound of its latency that still pulls the quantiles towards
+        the slow tail the cancelled calls belong to.
+        """
+        self._samples.append(seconds)
+
+    def quantile(self, q: float) -> float | None:
+        """Return the q-quantile of recent latencies, None without samples."""
+        if not self._samples:
+            return None
+        return float(np.quantile(np.fromiter(self._samples, dtype=float), q))
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    Closed: calls pass. After `failure_threshold` consecutive failures it opens
+    and rejects calls for `reset_timeout` seconds, then lets a single trial
+    call through (half-open); success closes it, failure opens it again.
+
+    Attributes:
+        failure_threshold (int): Consecutive failures that open the breaker
+        reset_timeout (float): Seconds the breaker stays open
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self._opened_at: float | None = None
+
+    @property
+    def state(self) -> str:
+        """One of "closed", "open" or "half-open"."""
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> bool:
+        """
+        Whether a call may be attempted.
+
+        Granting the half-open trial call restarts the open period, so other
+        callers are rejected until the trial reports back, or until another
+        `reset_timeout` has passed if it never does (e.g. it was cancelled).
+        """
+        state = self.state
+        if state == "half-open":
+            self._opened_at = time.monotonic()
+        return state != "open"
+
+    def record_success(self) -> None:
+        """Close the breaker after a successful call."""
+        self.failures = 0
+        self._opened_at = None
+
+    def record_failure(self) -> None:
+        """Count a failure, opening the breaker at the threshold."""
+        self.failures += 1
+        if self.failures >= self.failure_threshold or self._opened_at is not None:
+            self._opened_at = time.monotonic()
+
+
+class HedgedProvider(BaseAIProvider):
+    """
+    Provider that hedges one-shot calls across a primary and a backup.
+
+    Attributes:
+        primary (BaseAIProvider): Preferred provider
+        backup (BaseAIProvider): Provider used for hedges and failover
+        quantile (float): Latency quantile of the primary used as hedge delay
+        min_delay (float): Lower bound of the hedge delay in seconds
+        max_delay (float): Upper bound of the hedge delay, also used until
+            enough latency samples are collected
+        min_samples (int): Samples needed before the quantile is trusted
+        stats (dict[str, int]): Counters of hedges and which provider won
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        primary: BaseAIProvider,
+        backup: BaseAIProvider,
+        *,
+        quantile: float = 0.95,
+        min_delay: float = 1.0,
+        max_delay: float = 10.0,
+        min_samples: int = 20,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+    ) -> None:
+        """
+        Initialize the hedged provider.
+
+        Args:
+            primary: Preferred provider
+            backup: Provider used for hedges and failover
+            quantile: Latency quantile of the primary used as hedge delay
+            min_delay: Lower bound of the hedge delay in seconds
+            max_delay: Upper bound of the hedge delay in seconds
+            min_samples: Samples needed before the quantile is trusted
+            failure_threshold: Consecutive failures that trip a breaker
+            reset_timeout: Seconds a tripped breaker stays open
+        """
+        self.primary = primary
+        self.backup = backup
+        self.quantile = quantile
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.min_samples = min_samples
+        self.latency = LatencyTracker()
+        self.breakers = {
+            "primary": CircuitBreaker(failure_threshold, reset_timeout),
+            "backup": CircuitBreaker(failure_threshold, reset_timeout),
+        }
+        self.stats = {"calls": 0, "hedged": 0, "primary_won": 0, "backup_won": 0}
+
+    @property
+    def model_name(self) -> str:
+        """Model identifier of the primary provider."""
+        return getattr(self.primary, "model_name", type(self.primary).__name__)
+
+    @property
+    def system_instruction(self) -> str | None:
+        """System instruction of the primary provider, if any."""
+        return getattr(self.primary, "system_instruction", None)
+
+    @property
+    @override
+    def chat_history(self) -> list[Any]:  # pyright: ignore [reportIncompatibleVariableOverride]
+        """Chat history of the primary provider."""
+        return self.primary.chat_history
+
+    def hedge_delay(self) -> float:
+        """Seconds to wait for the primary before sending the hedge."""
+        if len(self.latency) < self.min_samples:
+            return self.max_delay
+        p = self.latency.quantile(self.quantile) or self.max_delay
+        return min(max(p, self.min_delay), self.max_delay)
+
+    def _candidates(self) -> list[tuple[str, BaseAIProvider]]:
+        """
+        Providers whose breaker is not open, primary first. A call must still
+        be granted by `CircuitBreaker.allow` right before it is made.
+        """
+        candidates = [("primary", self.primary), ("backup", self.backup)]
+        available = [(n, p) for n, p in candidates if self.breakers[n].state != "open"]
+        if not available:
+            raise ConnectionError(ERR_ALL_PROVIDERS_UNAVAILABLE)
+        return available
+
+    def _record(self, name: str, error: BaseException | None) -> None:
+        if error is None:
+            self.breakers[name].record_success()
+            return
+        self.breakers[name].record_failure()
+        logger.warning(
+            "AI provider call failed",
+            provider=name,
+            error=str(error),
+            breaker=self.breakers[name].state,
+        )
+
+    def _failover[T](self, call: Callable[[BaseAIProvider], T]) -> T:
+        """Call providers in order until one succeeds."""
+        error: Exception | None = None
+        for name, provider in self._candidates():
+            if not self.breakers[name].allow():
+                continue
+            try:
+                result = call(provider)
+            except Exception as e:  # noqa: BLE001
+                self._record(name, e)
+                error = e
+                continue
+            self._record(name, None)
+            return result
+        raise error or ConnectionError(ERR_ALL_PROVIDERS_UNAVAILABLE)
+
+    async def _afailover[T](self, call: Callable[[BaseAIProvider], Awaitable[T]]) -> T:
+        """Await providers in order until one succeeds."""
+        error: Exception | None = None
+        for name, provider in self._candidates():
+            if not self.breakers[name].allow():
+                continue
+            try:
+                result = await call(provider)
+            except Exception as e:  # noqa: BLE001
+                self._record(name, e)
+                error = e
+                continue
+            self._record(name, None)
+            return result
+        raise error or ConnectionError(ERR_ALL_PROVIDERS_UNAVAILABLE)
+
+    def _observe_primary(
+        self, started: float, task: asyncio.Task[ModelResponse]
+    ) -> None:
+        """Record the primary's latency, a lower bound if it was cancelled."""
+        if task.cancelled() or task.exception() is None:
+            self.latency.observe(time.monotonic() - started)
+
+    async def _hedged(
+        self, call: Callable[[BaseAIProvider], Coroutine[Any, Any, ModelResponse]]
+    ) -> ModelResponse:
+        """
+        Run a call on the primary, hedging to the backup after the delay.
+
+        The first successful response wins and the other call is cancelled.
+        The primary's latency is recorded when it answers or is cancelled, so
+        calls that lose to the hedge still count towards the hedge delay.
+        """
+        candidates = self._candidates()
+        self.stats["calls"] += 1
+        if len(candidates) == 1 or not self.breakers["primary"].allow():
+            return await self._afailover(call)
+
+        primary = asyncio.create_task(call(self.primary))
+        primary.add_done_callback(
+            functools.partial(self._observe_primary, time.monotonic())
+        )
+        tasks = {primary: "primary"}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self.hedge_delay())
+            primary_failed = bool(done) and primary.exception() is not None
+            if (not done or primary_failed) and self.breakers["backup"].allow():
+                if not done:
+                    self.stats["hedged"] += 1
+                    logger.debug("Hedging AI request", delay=self.hedge_delay())
+                tasks[asyncio.create_task(call(self.backup))] = "backup"
+
+            error: BaseException | None = None
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                # Record every finished call before picking a winner so a
+                # failure completing alongside a success still counts.
+                winners: list[asyncio.Task[ModelResponse]] = []
+                for task in done:
+                    error = task.exception()
+                    self._record(tasks[task], error)
+                    if error is None:
+                        winners.append(task)
+                if winners:
+                    task = min(winners, key=lambda t: tasks[t] != "primary")
+                    name = tasks[task]
+                    self.stats[f"{name}_won"] += 1
+                    response = task.result()
+                    response.metadata["served_by"] = name
+                    return response
+            raise error or ConnectionError(ERR_ALL_PROVIDERS_UNAVAILABLE)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    @override
+    def reset(self) -> None:
+        self.primary.reset()
+        self.backup.reset()
+
+    @override
+    def generate_content(
+        self,
+        prompt: str,
+        response_mime_type: str | None = None,
+        response_schema: Any | None = None,
+    ) -> ModelResponse:
+        return self._failover(
+            lambda p: p.generate_content(prompt, response_mime_type, response_schema)
+        )
+
+    @override
+    def send_message(self, msg: str) -> ModelResponse:
+        return self._failover(lambda p: p.send_message(msg))
+
+    @override
+    async def agenerate_content(
+        self,
+        prompt: str,
+        response_mime_type: str | None = None,
+        response_schema: Any | None = None,
+        *,
+        timeout: float | None = None,  # noqa: ASYNC109
+    ) -> ModelResponse:
+        async with asyncio.timeout(timeout):
+            return await self._hedged(
+                lambda p: p.agenerate_content(
+                    prompt, response_mime_type, response_schema
+                )
+            )
+
+    @override
+    async def asend_message(
+        self,
+        msg: str,
+        *,
+        timeout: float | None = None,  # noqa: ASYNC109
+    ) -> ModelResponse:
+        return await self._afailover(lambda p: p.asend_message(msg, timeout=timeout))
+
+    @override
+    async def stream_content(self, prompt: str) -> AsyncIterator[str]:
+        async for chunk in self._stream(lambda p: p.stream_content(prompt)):
+            yield chunk
+
+    @override
+    async def stream_message(self, msg: str) -> AsyncIterator[str]:
+        async for chunk in self._stream(lambda p: p.stream_message(msg)):
+            yield chunk
+
+    async def _stream(
+        self, open_stream: Callable[[BaseAIProvider], AsyncIterator[str]]
+    ) -> AsyncIterator[str]:
+        """Stream from the first working provider, failing over only until
+        the first chunk has been yielded."""
+        error: Exception | None = None
+        for name, provider in self._candidates():
+            if not self.breakers[name].allow():
+                continue
+            started = False
+            try:
+                async for chunk in open_stream(provider):
+                    started = True
+                    yield chunk
+            except Exception as e:
+                self._record(name, e)
+                if started:
+                    raise
+                error = e
+                continue
+            self._record(name, None)
+            return
+        raise error or ConnectionError(ERR_ALL_PROVIDERS_UNAVAILABLE)
+
+    async def aclose(self) -> None:
+        """Log counters and close both providers."""
+        logger.info("Hedged provider stats", **self.stats)
+        for provider in (self.primary, self.backup):
+            aclose = getattr(provider, "aclose", None)
+            if aclose is not None:
+                await aclose()
@@ -0,0 +1,228 @@
+"""
+API Key Pool Module
+
+Spreads requests across several API keys so total throughput is not capped by
+one key's per-minute quota. Each request draws the key with the most quota
+left: the server's own count when its responses report one (e.g. RapidAPI's
+`x-ratelimit-requests-remaining`), otherwise the configured per-minute limit
+minus the requests sent in the last minute. A key answered with 429 is
+quarantined until its quota resets and the others carry the load meanwhile.
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from collections.abc import Sequence
+from dataclasses import asdict, dataclass
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+# Seconds a throttled key is skipped when the server gives no reset time
+DEFAULT_QUARANTINE = 60.0
+
+
+class QuotaExhaustedError(ConnectionError):
+    """Raised when every key of a pool is throttled or out of quota."""
+
+    def __init__(self, retry_after: float) -> None:
+        super().__init__(f"All API keys are rate limited, retry in {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+
+@dataclass
+class KeyUsage:
+    """Request counters of one key"""
+
+    requests: int = 0
+    throttled: int = 0
+    errors: int = 0
+
+
+class KeyPool:
+    """
+    Quota-aware scheduler over a set of API keys.
+
+    Safe to use from several threads (the Twitter bot runs in its own).
+
+    Attributes:
+        keys (list[str]): Distinct keys, in configuration order
+        requests_per_minute (float | None): Per-key quota assumed when the
+            server does not report one, unlimited if None
+        usage (dict[str, KeyUsage]): Counters per key
+    """
+
+    def __init__(
+        self,
+        keys: Sequence[str],
+        requests_per_minute: float | None = None,
+        window: float = 60.0,
+    ) -> None:
+        """
+        Initialize the pool.
+
+        Args:
+            keys: API keys; empty and duplicate entries are ignored
+            requests_per_minute: Per-key quota assumed when the server does
+                not report one, unlimited if None or 0
+            window: Seconds over which requests are counted against the quota
+
+        Raises:
+            ValueError: If no key is given
+        """
+        self.keys = list(dict.fromkeys(key for key in keys if key))
+        if not self.keys:
+            msg = "KeyPool needs at least one API key"
+            raise ValueError(msg)
+        self.requests_per_minute = requests_per_minute or None
+        self.window = window
+        self.usage = {key: KeyUsage() for key in self.keys}
+        self._sent: dict[str, deque[float]] = {key: deque() for key in self.keys}
+        # Quota reported by the server: (requests remaining, monotonic reset time)
+        self._reported: dict[str, tuple[int, float]] = {}
+        self._quarantined_until: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def remaining(self, key: str, now: float | None = None) -> float:
+        """Requests the key can still make in the current quota window."""
+        now = time.monotonic() if now is None else now
+        reported = self._reported.get(key)
+        if reported is not None and reported[1] > now:
+            return reported[0]
+        if self.requests_per_minute is None:
+            return float("inf")
+        sent = self._sent[key]
+        while sent and sent[0] <= now - self.window:
+            sent.popleft()
+        return self.requests_per_minute * self.window / 60 - len(sent)
+
+    def acquire(self) -> str:
+        """
+        Take the key with the most quota left for one request.
+
+        Returns:
+            str: The key to use
+
+        Raises:
+            QuotaExhaustedError: If every key is quarantined or out of quota
+        """
+        with self._lock:
+            now = time.monotonic()
+            available = [
+                key
+                for key in self.keys
+                if self._quarantined_until.get(key, 0.0) <= now
+                and self.remaining(key, now) >= 1
+            ]
+            if not available:
+                raise QuotaExhaustedError(self._next_free(now))
+            key = max(
+                available,
+                key=lambda k: (self.remaining(k, now), -self.usage[k].requests),
+            )
+            self._sent[key].append(now)
+            if key in self._reported:
+                remaining, reset_at = self._reported[key]
+                self._reported[key] = (remaining - 1, reset_at)
+            self.usage[key].requests += 1
+            return key
+
+    async def acquire_async(self, max_wait: float = 60.0) -> str:
+        """
+        Take a key, waiting up to `max_wait` seconds for one to free up.
+
+        Raises:
+            QuotaExhaustedError: If no key frees up in time
+        """
+        deadline = time.monotonic() + max_wait
+        while True:
+            try:
+                return self.acquire()
+            except QuotaExhaustedError as e:
+                if time.monotonic() + e.retry_after > deadline:
+                    raise
+                await asyncio.sleep(e.retry_after)
+
+    def update(
+        self, key: str, remaining: int | None, reset_after: float | None
+    ) -> None:
+        """
+        Record the quota a response reported for a key.
+
+        Args:
+            key: Key the request was made with
+            remaining: Requests left in the server's quota window
+            reset_after: Seconds until the server's quota resets
+        """
+        if remaining is None:
+            return
+        with self._lock:
+            reset_at = time.monotonic() + (
+                reset_after if reset_after is not None else self.window
+            )
+            self._reported[key] = (remaining, reset_at)
+
+    def throttled(self, key: str, retry_after: float | None = None) -> None:
+        """
+        Quarantine a key that was answered with 429.
+
+        Args:
+            key: Key the request was made with
+            retry_after: Seconds until the key may be used again; defaults to
+                the reported reset time, else `DEFAULT_QUARANTINE`
+        """
+        with self._lock:
+            now = time.monotonic()
+            if retry_after is None:
+                reported = self._reported.get(key)
+                retry_after = (
+                    reported[1] - now
+                    if reported is not None and reported[1] > now
+                    else DEFAULT_QUARANTINE
+                )
+            self._quarantined_until[key] = now + retry_after
+            self.usage[key].throttled += 1
+        logger.warning(
+            "API key throttled", key=mask(key), quarantine=round(retry_after, 1)
+        )
+
+    def failed(self, key: str) -> None:
+        """Count a request that failed for a reason other than throttling."""
+        with self._lock:
+            self.usage[key].errors += 1
+
+    def stats(self) -> dict[str, dict[str, float]]:
+        """Usage counters and remaining quota per (masked) key."""
+        now = time.monotonic()
+        with self._lock:
+            return {
+                mask(key): {
+                    **asdict(self.usage[key]),
+                    "remaining": self.remaining(key, now),
+                    "quarantined": self._quarantined_until.get(key, 0.0) > now,
+                }
+                for key in self.keys
+            }
+
+    def _next_free(self, now: float) -> float:
+        """Seconds until some key is usable again."""
+        waits: list[float] = []
+        for key in self.keys:
+            wait = self._quarantined_until.get(key, 0.0) - now
+            reported = self._reported.get(key)
+            if reported is not None and reported[1] > now and reported[0] < 1:
+                wait = max(wait, reported[1] - now)
+            elif self.remaining(key, now) < 1 and self._sent[key]:
+                wait = max(wait, self._sent[key][0] + self.window - now)
+            waits.append(max(wait, 0.0))
+        return min(waits)
+
+
+def mask(key: str) -> str:
+    """Identify a key in logs without revealing it."""
+    return f"...{key[-4:]}"
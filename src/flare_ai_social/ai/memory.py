@@ -0,0 +1,374 @@
+"""
+Conversation Memory Module
+
+This module keeps bounded per-conversation context for stateless providers.
+Each conversation holds a window of recent turns capped by turn count and an
+estimated token budget; turns that fall out of the window are folded into a
+running summary in the background. Conversations are kept in an LRU map and
+the least recently used ones are evicted, optionally spilling to disk so they
+can be restored when the conversation resumes.
+"""
+
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict, deque
+from collections.abc import Awaitable, Callable
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+import structlog
+
+from flare_ai_social.ai.base import BaseAIProvider
+from flare_ai_social.prompts import CONVERSATION_SUMMARY_PROMPT
+
+logger = structlog.get_logger(__name__)
+
+# Rough average for English text with the Gemini/OpenAI tokenizers
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of tokens in a piece of text without a tokenizer."""
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+@dataclass
+class Turn:
+    """A single message in a conversation"""
+
+    role: str  # "user" or "model"
+    text: str
+    tokens: int
+    author: str | None = None
+
+    def render(self) -> str:
+        """Format the turn as a transcript line."""
+        if self.role == "model":
+            return f"Assistant: {self.text}"
+        if self.author:
+            return f"User ({self.author}): {self.text}"
+        return f"User: {self.text}"
+
+
+Summarizer = Callable[[str, list[Turn]], Awaitable[str]]
+
+
+class ConversationMemory:
+    """
+    Bounded context of a single conversation.
+
+    Attributes:
+        turns (deque[Turn]): Most recent turns, oldest first
+        summary (str): Running summary of turns evicted from the window
+        token_count (int): Estimated tokens held by the turns and the summary
+        pending (list[Turn]): Evicted turns waiting to be folded into the
+            summary, oldest first, capped at the token budget
+        pending_tokens (int): Estimated tokens held by the pending turns
+        last_active (float): Unix timestamp of the last recorded turn
+    """
+
+    def __init__(self, max_turns: int = 20, max_tokens: int = 2000) -> None:
+        self.max_turns = max_turns
+        self.max_tokens = max_tokens
+        self.turns: deque[Turn] = deque()
+        self.summary = ""
+        self.token_count = 0
+        self.last_active = time.time()
+        self.pending: list[Turn] = []
+        self.pending_tokens = 0
+
+    def add(self, role: str, text: str, author: str | None = None) -> list[Turn]:
+        """
+        Append a turn and evict the oldest turns beyond the caps.
+
+        Args:
+            role: "user" or "model"
+            text: Message text, truncated to the token budget if larger
+            author: Optional display name of the user (used in group chats)
+
+        Returns:
+            list[Turn]: Turns evicted from the window, oldest first
+        """
+        max_chars = self.max_tokens * CHARS_PER_TOKEN
+        if len(text) > max_chars:
+            text = text[:max_chars]
+        turn = Turn(role=role, text=text, tokens=estimate_tokens(text), author=author)
+        self.turns.append(turn)
+        self.token_count += turn.tokens
+        self.last_active = time.time()
+
+        evicted: list[Turn] = []
+        while len(self.turns) > 1 and (
+            len(self.turns) > self.max_turns or self.token_count > self.max_tokens
+        ):
+            old = self.turns.popleft()
+            self.token_count -= old.tokens
+            evicted.append(old)
+        return evicted
+
+    def defer(self, turns: list[Turn], *, retry: bool = False) -> int:
+        """
+        Queue evicted turns for the summary within the token budget.
+
+        The oldest pending turns beyond the budget are dropped, so memory
+        stays bounded while the summarizer is failing.
+
+        Args:
+            turns: Turns to summarize, oldest first
+            retry: The turns come back from a failed summary and are older
+                than the pending ones
+
+        Returns:
+            int: Number of pending turns dropped
+        """
+        self.pending = [*turns, *self.pending] if retry else [*self.pending, *turns]
+        self.pending_tokens = sum(turn.tokens for turn in self.pending)
+        dropped = 0
+        while self.pending and self.pending_tokens > self.max_tokens:
+            self.pending_tokens -= self.pending.pop(0).tokens
+            dropped += 1
+        return dropped
+
+    def take_pending(self) -> list[Turn]:
+        """Remove and return the pending turns."""
+        turns, self.pending, self.pending_tokens = self.pending, [], 0
+        return turns
+
+    def set_summary(self, summary: str) -> None:
+        """Replace the running summary, keeping the token count in sync."""
+        if self.summary:
+            self.token_count -= estimate_tokens(self.summary)
+        self.summary = summary.strip()
+        if self.summary:
+            self.token_count += estimate_tokens(self.summary)
+
+    def render(self, prompt: str) -> str:
+        """
+        Build a prompt that carries the conversation context.
+
+        Args:
+            prompt: The new message to respond to
+
+        Returns:
+            str: The prompt prefixed with the summary and recent turns, or the
+                prompt unchanged if there is no context yet
+        """
+        if not self.turns and not self.summary:
+            return prompt
+        sections: list[str] = []
+        if self.summary:
+            sections.append(f"Summary of the earlier conversation:\n{self.summary}")
+        if self.turns:
+            transcript = "\n".join(turn.render() for turn in self.turns)
+            sections.append(f"Recent conversation:\n{transcript}")
+        sections.append(f"Reply to this message:\n{prompt}")
+        return "\n\n".join(sections)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Serialize the conversation for the on-disk tier."""
+        return {
+            "summary": self.summary,
+            "last_active": self.last_active,
+            "turns": [asdict(turn) for turn in (*self.pending, *self.turns)],
+            "pending": len(self.pending),
+        }
+
+    @classmethod
+    def from_dict(
+        cls, data: dict[str, Any], max_turns: int, max_tokens: int
+    ) -> "ConversationMemory":
+        """Restore a conversation written by `to_dict`."""
+        memory = cls(max_turns=max_turns, max_tokens=max_tokens)
+        turns = [Turn(**turn) for turn in data.get("turns", [])]
+        pending = int(data.get("pending", 0))
+        memory.defer(turns[:pending])
+        for turn in turns[pending:]:
+            memory.turns.append(turn)
+            memory.token_count += turn.tokens
+        memory.set_summary(data.get("summary", ""))
+        memory.last_active = float(data.get("last_active", memory.last_active))
+        return memory
+
+
+class ConversationStore:
+    """
+    LRU map of conversation memories with an optional on-disk spill tier.
+
+    Attributes:
+        max_conversations (int): Number of conversations kept in memory
+        spill_dir (Path | None): Directory evicted conversations are written to
+        summarizer (Summarizer | None): Folds evicted turns into the summary;
+            evicted turns are dropped when unset
+    """
+
+    def __init__(
+        self,
+        max_conversations: int = 1000,
+        max_turns: int = 20,
+        max_tokens: int = 2000,
+        spill_dir: Path | None = None,
+        summarizer: Summarizer | None = None,
+    ) -> None:
+        self.max_conversations = max_conversations
+        self.max_turns = max_turns
+        self.max_tokens = max_tokens
+        self.spill_dir = spill_dir
+        self.summarizer = summarizer
+        self._conversations: OrderedDict[str, ConversationMemory] = OrderedDict()
+        self._summarizing: set[str] = set()
+        self._tasks: set[asyncio.Task[None]] = set()
+        if self.spill_dir:
+            self.spill_dir.mkdir(parents=True, exist_ok=True)
+
+    def __len__(self) -> int:
+        return len(self._conversations)
+
+    def __contains__(self, key: object) -> bool:
+        return str(key) in self._conversations
+
+    def get(self, key: str | int) -> ConversationMemory:
+        """
+        Return the memory of a conversation, creating or restoring it.
+
+        Args:
+            key: Conversation identifier (chat ID, session ID, ...)
+
+        Returns:
+            ConversationMemory: The conversation, marked most recently used
+        """
+        key = str(key)
+        memory = self._conversations.get(key)
+        if memory is not None:
+            self._conversations.move_to_end(key)
+            return memory
+
+        memory = self._load(key) or ConversationMemory(
+            max_turns=self.max_turns, max_tokens=self.max_tokens
+        )
+        self._conversations[key] = memory
+        while len(self._conversations) > self.max_conversations:
+            old_key, old_memory = self._conversations.popitem(last=False)
+            self._spill(old_key, old_memory)
+        return memory
+
+    def render(self, key: str | int, prompt: str) -> str:
+        """Build a prompt carrying the context of a conversation."""
+        return self.get(key).render(prompt)
+
+    def record(
+        self,
+        key: str | int,
+        user_text: str,
+        reply_text: str,
+        author: str | None = None,
+    ) -> None:
+        """
+        Record a completed exchange in a conversation.
+
+        Args:
+            key: Conversation identifier
+            user_text: The user's message
+            reply_text: The assistant's reply
+            author: Optional display name of the user
+        """
+        memory = self.get(key)
+        evicted = memory.add("user", user_text, author=author)
+        evicted += memory.add("model", reply_text)
+        if not evicted or self.summarizer is None:
+            return
+        key = str(key)
+        if dropped := memory.defer(evicted):
+            logger.warning("conversation_turns_dropped", key=key, dropped=dropped)
+        if key not in self._summarizing:
+            self._summarizing.add(key)
+            task = asyncio.create_task(self._summarize(key, memory))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    def reset(self, key: str | int) -> None:
+        """Forget a conversation, including any spilled copy."""
+        key = str(key)
+        self._conversations.pop(key, None)
+        if self.spill_dir:
+            self._spill_path(key).unlink(missing_ok=True)
+
+    async def aclose(self) -> None:
+        """Wait for pending summaries and spill all conversations to disk."""
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        for key, memory in self._conversations.items():
+            self._spill(key, memory)
+
+    async def _summarize(self, key: str, memory: ConversationMemory) -> None:
+        """
+        Fold pending turns into the running summary off the request path.
+
+        If the summarizer fails or is cancelled, the turns are put back in
+        front of `pending` so the next eviction retries them.
+        """
+        try:
+            while memory.pending and self.summarizer is not None:
+                turns = memory.take_pending()
+                try:
+                    summary = await self.summarizer(memory.summary, turns)
+                except Exception:
+                    memory.defer(turns, retry=True)
+                    logger.exception("conversation_summary_failed", key=key)
+                    return
+                except asyncio.CancelledError:
+                    memory.defer(turns, retry=True)
+                    raise
+                memory.set_summary(summary)
+        finally:
+            self._summarizing.discard(key)
+
+    def _spill_path(self, key: str) -> Path:
+        if self.spill_dir is None:
+            msg = "spill_dir is not configured"
+            raise RuntimeError(msg)
+        digest = hashlib.sha256(key.encode()).hexdigest()[:32]
+        return self.spill_dir / f"{digest}.json"
+
+    def _spill(self, key: str, memory: ConversationMemory) -> None:
+        if self.spill_dir is None:
+            return
+        try:
+            self._spill_path(key).write_text(json.dumps(memory.to_dict()))
+        except OSError:
+            logger.exception("conversation_spill_failed", key=key)
+
+    def _load(self, key: str) -> ConversationMemory | None:
+        if self.spill_dir is None:
+            return None
+        path = self._spill_path(key)
+        if not path.exists():
+            return None
+        try:
+            data = json.loads(path.read_text())
+        except (OSError, json.JSONDecodeError):
+            logger.exception("conversation_restore_failed", key=key)
+            return None
+        path.unlink(missing_ok=True)
+        return ConversationMemory.from_dict(
+            data, max_turns=self.max_turns, max_tokens=self.max_tokens
+        )
+
+
+class ProviderSummarizer:
+    """Summarizer that asks an AI provider to update the running summary."""
+
+    def __init__(self, provider: BaseAIProvider, max_words: int = 150) -> None:
+        self.provider = provider
+        self.max_words = max_words
+
+    async def __call__(self, summary: str, turns: list[Turn]) -> str:
+        prompt = CONVERSATION_SUMMARY_PROMPT.format(
+            max_words=self.max_words,
+            summary=summary or "(empty)",
+            transcript="\n".join(turn.render() for turn in turns),
+        )
+        response = await self.provider.agenerate_content(prompt)
+        return response.text
@@ -0,0 +1,461 @@
+"""
+Model Router Module
+
+Routes OpenRouter traffic to the fastest acceptable model for each kind of
+request. The router keeps live latency (EWMA and p95) and error-rate
+statistics per model and per serving endpoint, and combines them with the
+pricing, context length and supported parameters from OpenRouter's model
+catalogue. The catalogue is refreshed in the background on a fixed interval
+rather than fetched per call.
+
+Requests are grouped into classes (short chat, long context, JSON output)
+whose constraints decide which models are eligible; among those the model
+with the best observed latency wins, and models without samples yet are
+tried first so every candidate gets measured. Models excluded for their
+error rate get a single probe request once per probe interval, so a model
+that recovers is routed to again.
+"""
+
+import asyncio
+import contextlib
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Any, override
+
+import structlog
+
+from flare_ai_social.ai.base import ChatRequest, ModelResponse
+from flare_ai_social.ai.hedged import LatencyTracker
+from flare_ai_social.ai.memory import estimate_tokens
+from flare_ai_social.ai.openrouter import (
+    OPENROUTER_BASE_URL,
+    AsyncOpenRouterProvider,
+    OpenRouterAIProvider,
+)
+from flare_ai_social.ai.transport import TransportConfig
+
+logger = structlog.get_logger(__name__)
+
+# Prompts above this many estimated tokens are routed as long-context requests
+LONG_PROMPT_TOKENS = 4000
+
+
+@dataclass
+class EndpointInfo:
+    """A provider serving a model on OpenRouter"""
+
+    provider: str
+    prompt_price: float  # USD per token
+    completion_price: float
+    context_length: int
+    supported_parameters: frozenset[str]
+
+
+@dataclass
+class ModelInfo:
+    """Catalogue entry of an OpenRouter model"""
+
+    id: str
+    prompt_price: float  # USD per token
+    completion_price: float
+    context_length: int
+    supported_parameters: frozenset[str]
+    endpoints: list[EndpointInfo] = field(default_factory=list)
+
+
+@dataclass(frozen=True)
+class RequestClass:
+    """Constraints a model must meet to serve a kind of request"""
+
+    name: str
+    min_context: int = 0
+    max_prompt_price: float = math.inf  # USD per million prompt tokens
+    required_parameters: frozenset[str] = frozenset()
+    max_error_rate: float = 0.5
+
+
+DEFAULT_REQUEST_CLASSES = {
+    "chat": RequestClass("chat", max_prompt_price=1.0),
+    "long": RequestClass("long", min_context=32_000),
+    "json": RequestClass("json", required_parameters=frozenset({"response_format"})),
+}
+
+
+def classify_request(payload: ChatRequest) -> str:
+    """Assign a chat completion request to a request class."""
+    if "response_format" in payload:
+        return "json"
+    tokens = sum(estimate_tokens(m["content"]) for m in payload["messages"])
+    return "long" if tokens > LONG_PROMPT_TOKENS else "chat"
+
+
+class LatencyStats:
+    """
+    Live latency and error statistics of a model or endpoint.
+
+    Attributes:
+        ewma (float | None): Exponentially weighted mean latency in seconds
+        error_rate (float): Exponentially weighted share of failed calls
+        calls (int): Calls observed
+        last_attempt (float): Monotonic time of the last call or probe
+    """
+
+    def __init__(self, alpha: float = 0.2) -> None:
+        self.alpha = alpha
+        self.ewma: float | None = None
+        self.error_rate = 0.0
+        self.calls = 0
+        self.last_attempt = 0.0
+        self._latency = LatencyTracker()
+
+    def observe(self, latency: float | None, *, error: bool) -> None:
+        """Record a call; failed calls carry no latency."""
+        self.calls += 1
+        self.last_attempt = time.monotonic()
+        self.error_rate += self.alpha * (float(error) - self.error_rate)
+        if latency is not None:
+            self._latency.observe(latency)
+            self.ewma = (
+                latency
+                if self.ewma is None
+                else self.ewma + self.alpha * (latency - self.ewma)
+            )
+
+    @property
+    def p95(self) -> float | None:
+        """95th percentile of recent latencies."""
+        return self._latency.quantile(0.95)
+
+    def score(self) -> float:
+        """
+        Lower is better; unmeasured targets score 0 so they get tried, and
+        targets that have only ever failed score infinity.
+        """
+        if self.ewma is None:
+            return math.inf if self.calls else 0.0
+        return self.ewma * (1 + self.error_rate)
+
+
+def _price(pricing: dict[str, Any], key: str) -> float:
+    try:
+        return float(pricing.get(key) or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class ModelRouter:
+    """
+    Chooses the model and endpoint order for OpenRouter requests.
+
+    Attributes:
+        models (list[str]): Candidate model IDs, in order of preference
+        classes (dict[str, RequestClass]): Request classes by name
+        refresh_interval (float): Seconds between catalogue refreshes
+        probe_interval (float): Seconds after its last call before a model
+            excluded for its error rate is tried again
+        catalogue (dict[str, ModelInfo]): Metadata of the candidate models
+    """
+
+    def __init__(
+        self,
+        client: AsyncOpenRouterProvider,
+        models: list[str],
+        classes: dict[str, RequestClass] | None = None,
+        refresh_interval: float = 3600.0,
+        probe_interval: float = 60.0,
+    ) -> None:
+        """
+        Initialize the router.
+
+        Args:
+            client: OpenRouter client used to fetch the catalogue
+            models: Candidate model IDs, in order of preference
+            classes: Request classes, DEFAULT_REQUEST_CLASSES by default
+            refresh_interval: Seconds between catalogue refreshes
+            probe_interval: Seconds after its last call before a model
+                excluded for its error rate is tried again
+        """
+        self.client = client
+        self.models = models
+        self.classes = classes or DEFAULT_REQUEST_CLASSES
+        self.refresh_interval = refresh_interval
+        self.probe_interval = probe_interval
+        self.catalogue: dict[str, ModelInfo] = {}
+        self._model_stats: dict[str, LatencyStats] = {}
+        self._endpoint_stats: dict[tuple[str, str], LatencyStats] = {}
+        self._refresh_task: asyncio.Task[None] | None = None
+
+    async def refresh(self) -> None:
+        """Fetch pricing and endpoint metadata of the candidate models."""
+        try:
+            listing = await self.client.get_available_models()
+            by_id = {m["id"]: m for m in listing.get("data", [])}
+            endpoints = await asyncio.gather(
+                *(
+                    self.client.get_model_endpoints(*model.split("/", 1))
+                    for model in self.models
+                ),
+                return_exceptions=True,
+            )
+        except Exception:
+            logger.exception("Failed to refresh OpenRouter model catalogue")
+            return
+
+        catalogue: dict[str, ModelInfo] = {}
+        for model, model_endpoints in zip(self.models, endpoints, strict=True):
+            data = by_id.get(model)
+            if data is None:
+                logger.warning("Routed model not offered by OpenRouter", model=model)
+                continue
+            pricing = data.get("pricing", {})
+            info = ModelInfo(
+                id=model,
+                prompt_price=_price(pricing, "prompt"),
+                completion_price=_price(pricing, "completion"),
+                context_length=data.get("context_length") or 0,
+                supported_parameters=frozenset(data.get("supported_parameters") or []),
+            )
+            if isinstance(model_endpoints, dict):
+                for endpoint in model_endpoints.get("data", {}).get("endpoints", []):
+                    endpoint_pricing = endpoint.get("pricing", {})
+                    info.endpoints.append(
+                        EndpointInfo(
+                            provider=endpoint.get("provider_name", ""),
+                            prompt_price=_price(endpoint_pricing, "prompt"),
+                            completion_price=_price(endpoint_pricing, "completion"),
+                            context_length=endpoint.get("context_length") or 0,
+                            supported_parameters=frozenset(
+                                endpoint.get("supported_parameters") or []
+                            ),
+                        )
+                    )
+            catalogue[model] = info
+        self.catalogue = catalogue
+        logger.info("OpenRouter model catalogue refreshed", models=list(catalogue))
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            await self.refresh()
+            await asyncio.sleep(self.refresh_interval)
+
+    def start(self) -> None:
+        """Start refreshing the catalogue in the background if not running."""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh_loop())
+
+    def _eligible(self, model: str, request_class: RequestClass) -> bool:
+        info = self.catalogue.get(model)
+        if info is None:
+            # Unknown until the catalogue is loaded; only constrain by stats
+            return not self.catalogue
+        return (
+            info.context_length >= request_class.min_context
+            and info.prompt_price * 1e6 <= request_class.max_prompt_price
+            and request_class.required_parameters <= info.supported_parameters
+        )
+
+    def _endpoint_order(self, model: str, request_class: RequestClass) -> list[str]:
+        info = self.catalogue.get(model)
+        if info is None:
+            return []
+        endpoints = [
+            e
+            for e in info.endpoints
+            if e.context_length >= request_class.min_context
+            and request_class.required_parameters <= e.supported_parameters
+        ]
+        endpoints.sort(
+            key=lambda e: (
+                self._endpoint_stats.get((model, e.provider), LatencyStats()).score(),
+                e.prompt_price,
+            )
+        )
+        return [e.provider for e in endpoints if e.provider]
+
+    def choose(self, request_class: str) -> tuple[str, list[str]]:
+        """
+        Pick the model and endpoint order for a request.
+
+        Args:
+            request_class: Name of the request class
+
+        Returns:
+            tuple[str, list[str]]: Model ID and the providers to try, fastest
+                first (empty to let OpenRouter decide)
+        """
+        rc = self.classes.get(request_class, self.classes["chat"])
+        eligible = [m for m in self.models if self._eligible(m, rc)] or self.models
+        probe = self._probe(eligible, rc)
+        if probe is not None:
+            return probe, self._endpoint_order(probe, rc)
+        healthy = [
+            m for m in eligible if self.stats_for(m).error_rate <= rc.max_error_rate
+        ] or eligible
+        model = min(
+            healthy,
+            key=lambda m: (
+                self.stats_for(m).score(),
+                self.catalogue[m].prompt_price if m in self.catalogue else 0.0,
+            ),
+        )
+        return model, self._endpoint_order(model, rc)
+
+    def _probe(self, models: list[str], request_class: RequestClass) -> str | None:
+        """
+        Return an excluded model due for a probe, marking it as tried so
+        concurrent requests do not probe it too.
+        """
+        now = time.monotonic()
+        for model in models:
+            stats = self.stats_for(model)
+            if (
+                stats.error_rate > request_class.max_error_rate
+                and now - stats.last_attempt >= self.probe_interval
+            ):
+                stats.last_attempt = now
+                logger.info("Probing excluded model", model=model)
+                return model
+        return None
+
+    def stats_for(self, model: str) -> LatencyStats:
+        """Return the live statistics of a model."""
+        return self._model_stats.setdefault(model, LatencyStats())
+
+    def observe(
+        self,
+        model: str,
+        provider: str | None,
+        latency: float | None,
+        *,
+        error: bool,
+    ) -> None:
+        """Record the outcome of a call to a model and serving provider."""
+        self.stats_for(model).observe(latency, error=error)
+        if provider:
+            self._endpoint_stats.setdefault((model, provider), LatencyStats()).observe(
+                latency, error=error
+            )
+
+    def stats(self) -> dict[str, dict[str, float | None]]:
+        """Return per-model statistics for logging."""
+        return {
+            model: {
+                "ewma": stats.ewma,
+                "p95": stats.p95,
+                "error_rate": round(stats.error_rate, 3),
+                "calls": stats.calls,
+            }
+            for model, stats in self._model_stats.items()
+        }
+
+    async def aclose(self) -> None:
+        """Stop the background refresh."""
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._refresh_task
+
+
+class RoutedOpenRouterProvider(OpenRouterAIProvider):
+    """
+    OpenRouter provider that lets a ModelRouter pick the model per request.
+
+    Attributes:
+        router (ModelRouter): Chooses models and records their latency
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        api_key: str,
+        models: list[str],
+        system_instruction: str | None = None,
+        *,
+        base_url: str = OPENROUTER_BASE_URL,
+        max_tokens: int = 1024,
+        temperature: float = 0.7,
+        timeout: float | None = None,
+        transport: TransportConfig | None = None,
+        refresh_interval: float = 3600.0,
+    ) -> None:
+        """
+        Initialize the routed provider.
+
+        Args:
+            api_key: OpenRouter API key
+            models: Candidate model IDs, in order of preference
+            system_instruction: Optional system prompt sent with every request
+            base_url: OpenRouter API base URL
+            max_tokens: Maximum number of tokens to generate
+            temperature: Sampling temperature
+            timeout: Default timeout in seconds for async requests
+            transport: Pool, retry and timeout settings of the HTTP clients
+            refresh_interval: Seconds between model catalogue refreshes
+        """
+        super().__init__(
+            api_key,
+            models[0],
+            system_instruction,
+            base_url=base_url,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            timeout=timeout,
+            transport=transport,
+        )
+        self.router = ModelRouter(
+            self.async_client, models, refresh_interval=refresh_interval
+        )
+
+    @override
+    def _build_request(
+        self, messages: list[Any], response_mime_type: str | None = None
+    ) -> ChatRequest:
+        payload = super()._build_request(messages, response_mime_type)
+        model, endpoints = self.router.choose(classify_request(payload))
+        payload["model"] = model
+        if endpoints:
+            payload["provider"] = {"order": endpoints, "allow_fallbacks": True}
+        return payload
+
+    @override
+    def _complete(self, payload: ChatRequest) -> ModelResponse:
+        started = time.monotonic()
+        try:
+            response = super()._complete(payload)
+        except Exception:
+            self.router.observe(payload["model"], None, None, error=True)
+            raise
+        self.router.observe(
+            payload["model"],
+            response.metadata.get("provider"),
+            time.monotonic() - started,
+            error=False,
+        )
+        return response
+
+    @override
+    async def _acomplete(
+        self,
+        payload: ChatRequest,
+        timeout: float | None = None,  # noqa: ASYNC109
+    ) -> ModelResponse:
+        self.router.start()
+        started = time.monotonic()
+        try:
+            response = await super()._acomplete(payload, timeout)
+        except Exception:
+            self.router.observe(payload["model"], None, None, error=True)
+            raise
+        self.router.observe(
+            payload["model"],
+            response.metadata.get("provider"),
+            time.monotonic() - started,
+            error=False,
+        )
+        return response
+
+    @override
+    async def aclose(self) -> None:
+        logger.info("Model router stats", models=self.router.stats())
+        await self.router.aclose()
+        await super().aclose()
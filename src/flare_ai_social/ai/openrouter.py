@@ -1,16 +1,33 @@
+import asyncio
+from collections.abc import AsyncIterator
+from typing import Any, override
+
+import structlog
+
 from flare_ai_social.ai.base import (
     AsyncBaseRouter,
+    BaseAIProvider,
     BaseRouter,
     ChatRequest,
     CompletionRequest,
+    Message,
+    ModelResponse,
 )
+from flare_ai_social.ai.transport import TransportConfig
+
+logger = structlog.get_logger(__name__)
+
+OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1"
 
 
 class OpenRouterProvider(BaseRouter):
     """Sync Client to interact with the OpenRouter API."""
 
     def __init__(
-        self, api_key: str | None = None, base_url: str = "https://openrouter.ai/api/v1"
+        self,
+        api_key: str | None = None,
+        base_url: str = OPENROUTER_BASE_URL,
+        transport: TransportConfig | None = None,
     ) -> None:
         """
         Initialize the OpenRouter client.
@@ -20,8 +37,9 @@ class OpenRouterProvider(BaseRouter):
         :param api_key: Optional API key for authentication.
         :param base_url: Optional custom base URL.
             Defaults to "https://openrouter.ai/api/v1"
+        :param transport: Optional pool, retry and timeout settings.
         """
-        super().__init__(base_url, api_key)
+        super().__init__(base_url, api_key, transport)
 
     def get_available_models(self) -> dict:
         """
@@ -81,15 +99,41 @@ class AsyncOpenRouterProvider(AsyncBaseRouter):
     """Asynchronous client to interact with the OpenRouter API."""
 
     def __init__(
-        self, api_key: str | None = None, base_url: str = "https://openrouter.ai/api/v1"
+        self,
+        api_key: str | None = None,
+        base_url: str = OPENROUTER_BASE_URL,
+        transport: TransportConfig | None = None,
     ) -> None:
         """
         Initialize the AsyncOpenRouterClient.
 
         :param api_key: Optional API key for authentication.
         :param base_url: Optional custom base URL.
+        :param transport: Optional pool, retry and timeout settings.
         """
-        super().__init__(base_url, api_key)
+        super().__init__(base_url, api_key, transport)
+
+    async def get_available_models(self) -> dict:
+        """
+        List available models.
+
+        API Reference: https://openrouter.ai/docs/api-reference/list-available-models
+        :return: A dictionary containing the list of available models.
+        """
+        endpoint = "/models"
+        return await self._get(endpoint)
+
+    async def get_model_endpoints(self, author: str, slug: str) -> dict:
+        """
+        List endpoints for a specific model.
+
+        API Reference: https://openrouter.ai/docs/api-reference/list-endpoints-for-a-model
+        :param author: The model author.
+        :param slug: The model slug.
+        :return: A dictionary containing the endpoints for the specified model.
+        """
+        endpoint = f"/models/{author}/{slug}/endpoints"
+        return await self._get(endpoint)
 
     async def send_completion(self, payload: CompletionRequest) -> dict:
         """
@@ -101,12 +145,236 @@ class AsyncOpenRouterProvider(AsyncBaseRouter):
         endpoint = "/completions"
         return await self._post(endpoint, payload)
 
-    async def send_chat_completion(self, payload: ChatRequest) -> dict:
+    async def send_chat_completion(
+        self,
+        payload: ChatRequest,
+        timeout: float | None = None,  # noqa: ASYNC109
+    ) -> dict:
         """
         Send a prompt to the chat completions endpoint.
 
         :param payload: The JSON payload.
+        :param timeout: Optional deadline in seconds, retries included.
         :return: The JSON response from the API.
         """
         endpoint = "/chat/completions"
-        return await self._post(endpoint, payload)
+        return await self._post(endpoint, payload, timeout)
+
+    async def stream_chat_completion(self, payload: ChatRequest) -> AsyncIterator[dict]:
+        """
+        Stream a chat completion as server-sent events.
+
+        API Reference: https://openrouter.ai/docs/api-reference/streaming
+        :param payload: The JSON payload; `stream` is set automatically.
+        :return: Async iterator over the completion chunks.
+        """
+        endpoint = "/chat/completions"
+        async for chunk in self._stream_post(endpoint, {**payload, "stream": True}):
+            yield chunk
+
+
+class OpenRouterAIProvider(BaseAIProvider):
+    """
+    AI provider backed by a model served through OpenRouter.
+
+    Wraps the sync and async OpenRouter clients in the BaseAIProvider
+    interface so OpenRouter models can be used wherever a Gemini model is.
+
+    Attributes:
+        client (OpenRouterProvider): Sync client used by the sync methods
+        async_client (AsyncOpenRouterProvider): Client used by the async methods
+        model (str): OpenRouter model identifier, e.g. "google/gemini-flash-1.5"
+        chat_history (list[Message]): History of chat interactions
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        api_key: str,
+        model: str,
+        system_instruction: str | None = None,
+        *,
+        base_url: str = OPENROUTER_BASE_URL,
+        max_tokens: int = 1024,
+        temperature: float = 0.7,
+        timeout: float | None = None,
+        transport: TransportConfig | None = None,
+    ) -> None:
+        """
+        Initialize the OpenRouter provider.
+
+        Args:
+            api_key: OpenRouter API key
+            model: OpenRouter model identifier
+            system_instruction: Optional system prompt sent with every request
+            base_url: OpenRouter API base URL
+            max_tokens: Maximum number of tokens to generate
+            temperature: Sampling temperature
+            timeout: Default timeout in seconds for async requests
+            transport: Pool, retry and timeout settings of the HTTP clients
+        """
+        self.api_key = api_key
+        self.model = model
+        self.model_name = model
+        self.system_instruction = system_instruction
+        self.max_tokens = max_tokens
+        self.temperature = temperature
+        self.timeout = timeout
+        self.client = OpenRouterProvider(
+            api_key=api_key, base_url=base_url, transport=transport
+        )
+        self.async_client = AsyncOpenRouterProvider(
+            api_key=api_key, base_url=base_url, transport=transport
+        )
+        self.chat_history: list[Message] = []
+        self.logger = logger.bind(service="openrouter", model=model)
+
+    @override
+    def reset(self) -> None:
+        """Reset the conversation history."""
+        self.chat_history = []
+
+    def _build_request(
+        self, messages: list[Message], response_mime_type: str | None = None
+    ) -> ChatRequest:
+        """Build a chat completion request, prepending the system instruction."""
+        if self.system_instruction:
+            messages = [
+                Message(role="system", content=self.system_instruction),
+                *messages,
+            ]
+        payload = ChatRequest(
+            model=self.model,
+            messages=messages,
+            max_tokens=self.max_tokens,
+            temperature=self.temperature,
+        )
+        if response_mime_type == "application/json":
+            payload["response_format"] = {"type": "json_object"}
+        return payload
+
+    @override
+    def generate_content(
+        self,
+        prompt: str,
+        response_mime_type: str | None = None,
+        response_schema: Any | None = None,
+    ) -> ModelResponse:
+        """
+        Generate a response without conversation context.
+
+        `response_schema` is not supported by OpenRouter and is ignored; a
+        JSON `response_mime_type` requests JSON output.
+        """
+        payload = self._build_request(
+            [Message(role="user", content=prompt)], response_mime_type
+        )
+        return self._complete(payload)
+
+    @override
+    async def agenerate_content(
+        self,
+        prompt: str,
+        response_mime_type: str | None = None,
+        response_schema: Any | None = None,
+        *,
+        timeout: float | None = None,  # noqa: ASYNC109
+    ) -> ModelResponse:
+        """Generate a response without conversation context asynchronously."""
+        payload = self._build_request(
+            [Message(role="user", content=prompt)], response_mime_type
+        )
+        return await self._acomplete(payload, timeout)
+
+    @override
+    def send_message(self, msg: str) -> ModelResponse:
+        """Send a message in the conversation and record the exchange."""
+        messages = [*self.chat_history, Message(role="user", content=msg)]
+        response = self._complete(self._build_request(messages))
+        self._record(messages, response)
+        return response
+
+    @override
+    async def asend_message(
+        self,
+        msg: str,
+        *,
+        timeout: float | None = None,  # noqa: ASYNC109
+    ) -> ModelResponse:
+        """Send a message in the conversation asynchronously."""
+        messages = [*self.chat_history, Message(role="user", content=msg)]
+        response = await self._acomplete(self._build_request(messages), timeout)
+        self._record(messages, response)
+        return response
+
+    @override
+    async def stream_content(self, prompt: str) -> AsyncIterator[str]:
+        """Stream a response without conversation context."""
+        payload = self._build_request([Message(role="user", content=prompt)])
+        async for text in self._stream(payload):
+            yield text
+
+    @override
+    async def stream_message(self, msg: str) -> AsyncIterator[str]:
+        """
+        Stream a response in the conversation.
+
+        The exchange is recorded once the stream has been fully consumed.
+        """
+        messages = [*self.chat_history, Message(role="user", content=msg)]
+        parts: list[str] = []
+        async for text in self._stream(self._build_request(messages)):
+            parts.append(text)
+            yield text
+        self._record(messages, ModelResponse("".join(parts), None, {}))
+
+    def _complete(self, payload: ChatRequest) -> ModelResponse:
+        """Send a chat completion request."""
+        return _to_model_response(self.client.send_chat_completion(payload))
+
+    async def _acomplete(
+        self,
+        payload: ChatRequest,
+        timeout: float | None = None,  # noqa: ASYNC109
+    ) -> ModelResponse:
+        """Send a chat completion request asynchronously."""
+        timeout = timeout or self.timeout
+        async with asyncio.timeout(timeout):
+            data = await self.async_client.send_chat_completion(payload, timeout)
+        return _to_model_response(data)
+
+    async def _stream(self, payload: ChatRequest) -> AsyncIterator[str]:
+        async for chunk in self.async_client.stream_chat_completion(payload):
+            if "error" in chunk:
+                msg = f"OpenRouter stream error: {chunk['error']}"
+                raise ConnectionError(msg)
+            choices = chunk.get("choices") or [{}]
+            text = choices[0].get("delta", {}).get("content")
+            if text:
+                yield text
+
+    def _record(self, messages: list[Message], response: ModelResponse) -> None:
+        self.chat_history = [
+            *messages,
+            Message(role="assistant", content=response.text),
+        ]
+        self.logger.debug("send_message", response_text=response.text)
+
+    async def aclose(self) -> None:
+        """Close the underlying HTTP clients."""
+        self.client.close()
+        await self.async_client.close()
+
+
+def _to_model_response(data: dict[str, Any]) -> ModelResponse:
+    """Wrap an OpenRouter chat completion in the standardized response format."""
+    choice = data["choices"][0]
+    return ModelResponse(
+        text=choice["message"]["content"] or "",
+        raw_response=data,
+        metadata={
+            "model": data.get("model"),
+            "provider": data.get("provider"),
+            "finish_reason": choice.get("finish_reason"),
+            "usage": data.get("usage"),
+        },
+    )
@@ -0,0 +1,328 @@
+"""
+Model Registry Module
+
+Serves several model variants behind one provider and lets operators change
+which variant gets the traffic while the service runs. Each one-shot call is
+routed to a variant drawn by weight, so traffic can be swapped to a new model
+at once or split between variants for an A/B comparison. Weight changes
+replace the routing table atomically: calls already running finish on the
+variant they started on, and a removed variant is closed only once its
+in-flight calls have drained.
+
+Conversational calls (`send_message`) always go to the primary variant, the
+one with the highest weight, because each variant keeps its own chat session.
+Every call reports the model of the variant serving it to the response caches
+(see `report_served_model`), which store answers under that model.
+
+Latency quantiles, request and error counts are tracked per variant for
+comparison (see `stats`).
+"""
+
+import asyncio
+import random
+import threading
+import time
+from collections.abc import AsyncIterator, Callable, Iterator, Mapping
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, override
+
+import structlog
+
+from flare_ai_social.ai.base import BaseAIProvider, ModelResponse
+from flare_ai_social.ai.cache import report_served_model
+from flare_ai_social.ai.hedged import LatencyTracker
+
+logger = structlog.get_logger(__name__)
+
+ERR_NO_FACTORY = "ModelRegistry was created without a provider factory"
+ERR_NO_TRAFFIC = "No model variant has traffic"
+
+
+@dataclass
+class Variant:
+    """A model variant and its traffic counters"""
+
+    name: str
+    provider: BaseAIProvider
+    weight: float = 0.0
+    requests: int = 0
+    errors: int = 0
+    in_flight: int = 0
+    latency: LatencyTracker = field(default_factory=LatencyTracker)
+
+    @property
+    def model_name(self) -> str:
+        return getattr(self.provider, "model_name", type(self.provider).__name__)
+
+
+class ModelRegistry(BaseAIProvider):
+    """
+    Weighted router over named model variants, reconfigurable at runtime.
+
+    Safe to use from several threads (the Twitter bot runs in its own).
+
+    Attributes:
+        variants (dict[str, Variant]): Registered variants by name
+        factory (Callable[[str], BaseAIProvider] | None): Builds the provider
+            of a variant added by model name
+        drain_timeout (float): Seconds a removed variant's in-flight calls
+            are awaited before it is closed anyway
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[str], BaseAIProvider] | None = None,
+        drain_timeout: float = 30.0,
+    ) -> None:
+        """
+        Initialize an empty registry.
+
+        Args:
+            factory: Builds a provider from a model name, used by `add`
+            drain_timeout: Seconds a removed variant's in-flight calls are
+                awaited before it is closed anyway
+        """
+        self.factory = factory
+        self.drain_timeout = drain_timeout
+        self.variants: dict[str, Variant] = {}
+        # Routing table: (variants, weights), replaced as a whole
+        self._table: tuple[list[Variant], list[float]] = ([], [])
+        self._lock = threading.Lock()
+
+    @property
+    def primary(self) -> Variant:
+        """The variant with the highest weight."""
+        variants, weights = self._table
+        if not variants:
+            raise LookupError(ERR_NO_TRAFFIC)
+        return max(zip(variants, weights, strict=True), key=lambda vw: vw[1])[0]
+
+    @property
+    def model_name(self) -> str:
+        """Model identifier of the primary variant."""
+        return self.primary.model_name
+
+    @property
+    def system_instruction(self) -> str | None:
+        """System instruction of the primary variant, if any."""
+        return getattr(self.primary.provider, "system_instruction", None)
+
+    @property
+    @override
+    def chat_history(self) -> list[Any]:  # pyright: ignore [reportIncompatibleVariableOverride]
+        """Chat history of the primary variant."""
+        return self.primary.provider.chat_history
+
+    def register(
+        self, name: str, provider: BaseAIProvider, weight: float = 0.0
+    ) -> Variant:
+        """
+        Add a variant; it receives traffic once it has a weight.
+
+        Raises:
+            ValueError: If the name is taken or the weight negative
+        """
+        if weight < 0:
+            msg = f"Weight of {name} must not be negative"
+            raise ValueError(msg)
+        with self._lock:
+            if name in self.variants:
+                msg = f"Model variant {name} already exists"
+                raise ValueError(msg)
+            self.variants[name] = Variant(name, provider, weight)
+            self._publish()
+        logger.info("Model variant registered", variant=name, weight=weight)
+        return self.variants[name]
+
+    def add(self, name: str, model_name: str, weight: float = 0.0) -> Variant:
+        """
+        Build a provider for `model_name` with the factory and register it.
+
+        Raises:
+            RuntimeError: If the registry has no factory
+            ValueError: If the name is taken or the weight negative
+        """
+        if self.factory is None:
+            raise RuntimeError(ERR_NO_FACTORY)
+        return self.register(name, self.factory(model_name), weight)
+
+    def set_weights(self, weights: Mapping[str, float]) -> None:
+        """
+        Replace the traffic split; variants not listed get no traffic.
+
+        Raises:
+            ValueError: If a name is unknown, a weight negative or all zero
+        """
+        unknown = set(weights) - set(self.variants)
+        if unknown:
+            msg = f"Unknown model variants: {', '.join(sorted(unknown))}"
+            raise ValueError(msg)
+        if any(weight < 0 for weight in weights.values()):
+            msg = "Weights must not be negative"
+            raise ValueError(msg)
+        if not any(weights.values()):
+            msg = "At least one variant needs a positive weight"
+            raise ValueError(msg)
+        with self._lock:
+            for variant in self.variants.values():
+                variant.weight = weights.get(variant.name, 0.0)
+            self._publish()
+        logger.info("Model traffic split changed", weights=dict(weights))
+
+    def swap(self, name: str) -> None:
+        """Send all traffic to one variant."""
+        self.set_weights({name: 1.0})
+
+    async def remove(self, name: str) -> None:
+        """
+        Unregister a variant without traffic and close it once drained.
+
+        Raises:
+            KeyError: If the variant does not exist
+            ValueError: If the variant still has a weight
+        """
+        with self._lock:
+            variant = self.variants[name]
+            if variant.weight > 0:
+                msg = f"Move the traffic off {name} before removing it"
+                raise ValueError(msg)
+            del self.variants[name]
+            self._publish()
+        deadline = time.monotonic() + self.drain_timeout
+        # Polled: the calls may be running on other threads' event loops
+        while variant.in_flight and time.monotonic() < deadline:  # noqa: ASYNC110
+            await asyncio.sleep(0.05)
+        if variant.in_flight:
+            logger.warning(
+                "Closing model variant with calls in flight",
+                variant=name,
+                in_flight=variant.in_flight,
+            )
+        aclose = getattr(variant.provider, "aclose", None)
+        if aclose is not None:
+            await aclose()
+        logger.info("Model variant removed", variant=name)
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        """Weight, model, traffic, error rate and latency per variant."""
+        with self._lock:
+            variants = list(self.variants.values())
+        return {
+            variant.name: {
+                "model": variant.model_name,
+                "weight": variant.weight,
+                "requests": variant.requests,
+                "errors": variant.errors,
+                "error_rate": (
+                    variant.errors / variant.requests if variant.requests else 0.0
+                ),
+                "in_flight": variant.in_flight,
+                "p50_latency": variant.latency.quantile(0.5),
+                "p95_latency": variant.latency.quantile(0.95),
+            }
+            for variant in variants
+        }
+
+    def _publish(self) -> None:
+        """Rebuild the routing table from the variants' weights (lock held)."""
+        active = [v for v in self.variants.values() if v.weight > 0]
+        self._table = (active, [v.weight for v in active])
+
+    def _pick(self) -> Variant:
+        """Draw a variant in proportion to the weights."""
+        variants, weights = self._table
+        if not variants:
+            raise LookupError(ERR_NO_TRAFFIC)
+        return random.choices(variants, weights)[0]  # noqa: S311
+
+    @contextmanager
+    def _track(self, variant: Variant) -> Iterator[None]:
+        """Count a call to a variant, time it and report it to the caches."""
+        report_served_model(variant.model_name)
+        with self._lock:
+            variant.in_flight += 1
+            variant.requests += 1
+        started = time.monotonic()
+        try:
+            yield
+        except Exception:
+            with self._lock:
+                variant.errors += 1
+            raise
+        else:
+            variant.latency.observe(time.monotonic() - started)
+        finally:
+            with self._lock:
+                variant.in_flight -= 1
+
+    @override
+    def reset(self) -> None:
+        for variant in list(self.variants.values()):
+            variant.provider.reset()
+
+    @override
+    def generate_content(
+        self,
+        prompt: str,
+        response_mime_type: str | None = None,
+        response_schema: Any | None = None,
+    ) -> ModelResponse:
+        variant = self._pick()
+        with self._track(variant):
+            return variant.provider.generate_content(
+                prompt, response_mime_type, response_schema
+            )
+
+    @override
+    def send_message(self, msg: str) -> ModelResponse:
+        variant = self.primary
+        with self._track(variant):
+            return variant.provider.send_message(msg)
+
+    @override
+    async def agenerate_content(
+        self,
+        prompt: str,
+        response_mime_type: str | None = None,
+        response_schema: Any | None = None,
+        *,
+        timeout: float | None = None,  # noqa: ASYNC109
+    ) -> ModelResponse:
+        variant = self._pick()
+        with self._track(variant):
+            return await variant.provider.agenerate_content(
+                prompt, response_mime_type, response_schema, timeout=timeout
+            )
+
+    @override
+    async def asend_message(
+        self,
+        msg: str,
+        *,
+        timeout: float | None = None,  # noqa: ASYNC109
+    ) -> ModelResponse:
+        variant = self.primary
+        with self._track(variant):
+            return await variant.provider.asend_message(msg, timeout=timeout)
+
+    @override
+    async def stream_content(self, prompt: str) -> AsyncIterator[str]:
+        variant = self._pick()
+        with self._track(variant):
+            async for chunk in variant.provider.stream_content(prompt):
+                yield chunk
+
+    @override
+    async def stream_message(self, msg: str) -> AsyncIterator[str]:
+        variant = self.primary
+        with self._track(variant):
+            async for chunk in variant.provider.stream_message(msg):
+                yield chunk
+
+    async def aclose(self) -> None:
+        """Close every variant's provider."""
+        for variant in list(self.variants.values()):
+            aclose = getattr(variant.provider, "aclose", None)
+            if aclose is not None:
+                await aclose()
@@ -0,0 +1,157 @@
+"""
+Retrieval-Augmented Prompting Module
+
+Wraps a provider and prefixes one-shot prompts with the documentation
+passages most relevant to them, so answers about FTSO, FDC or FAssets can
+quote the docs instead of relying on what the model remembers. Passages come
+from a PassageStore built offline by the ingestion CLI; at request time only
+the query is embedded and the memory-mapped matrix searched.
+
+The query is the prompt itself unless the caller names the user's question
+with `retrieval_query()`: rendered prompts carry the conversation history
+and thread, which would pull passages toward earlier topics. Inner layers
+that judge the question rather than the expanded prompt (the model cascade)
+read it with `current_query()`. Async calls
+embed and search in a worker thread so remote embedders never block the
+event loop.
+"""
+
+import asyncio
+from collections.abc import AsyncIterator, Iterator, Sequence
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, override
+
+import structlog
+
+from flare_ai_social.ai.base import BaseAIProvider, ModelResponse
+from flare_ai_social.ai.semantic_cache import Embedder
+from flare_ai_social.ai.wrapper import ProviderWrapper
+from flare_ai_social.rag.store import Passage, PassageStore
+
+logger = structlog.get_logger(__name__)
+
+_query: ContextVar[str | None] = ContextVar("retrieval_query", default=None)
+
+
+@contextmanager
+def retrieval_query(question: str) -> Iterator[None]:
+    """Retrieve passages for `question` instead of the prompts in the block."""
+    token = _query.set(question)
+    try:
+        yield
+    finally:
+        _query.reset(token)
+
+
+def current_query() -> str | None:
+    """Return the question named by the enclosing `retrieval_query()`, if any."""
+    return _query.get()
+
+
+def render_passages(passages: Sequence[Passage]) -> str:
+    """Format passages as a numbered reference block."""
+    if not passages:
+        return ""
+    blocks = [
+        f"[{i}] {passage.title} ({passage.source}):\n{passage.text}"
+        for i, passage in enumerate(passages, start=1)
+    ]
+    return (
+        "Relevant passages from the Flare documentation, use them if they "
+        "help answer the message:\n\n" + "\n\n".join(blocks)
+    )
+
+
+class RetrievalProvider(ProviderWrapper):
+    """
+    Provider that prefixes one-shot prompts with retrieved passages.
+
+    Conversational calls are passed through unchanged so the passages do
+    not accumulate in the chat history.
+
+    Attributes:
+        store (PassageStore): Passages searched for each prompt
+        embedder (Embedder): Embedder the store was built with
+        k (int): Maximum passages added to a prompt
+        min_score (float): Minimum cosine similarity of an added passage
+    """
+
+    def __init__(
+        self,
+        provider: BaseAIProvider,
+        store: PassageStore,
+        embedder: Embedder,
+        k: int = 3,
+        min_score: float = 0.2,
+    ) -> None:
+        """
+        Initialize the provider.
+
+        Args:
+            provider: Provider generating the responses
+            store: Passages searched for each prompt
+            embedder: Embedder the store was built with
+            k: Maximum passages added to a prompt
+            min_score: Minimum cosine similarity of an added passage
+
+        Raises:
+            ValueError: If the embedder and store dimensions differ
+        """
+        if embedder.dim != store.dim:
+            msg = f"Embedder dimension {embedder.dim} != store dimension {store.dim}"
+            raise ValueError(msg)
+        super().__init__(provider)
+        self.store = store
+        self.embedder = embedder
+        self.k = k
+        self.min_score = min_score
+
+    def retrieve(self, prompt: str) -> list[Passage]:
+        """Return the passages relevant to a prompt, most similar first."""
+        query = self.embedder.embed([prompt])[0]
+        hits = self.store.search(query, self.k)
+        return [passage for passage, score in hits if score >= self.min_score]
+
+    def build_prompt(self, prompt: str) -> str:
+        """Prefix a prompt with the passages relevant to it or to the query."""
+        try:
+            passages = render_passages(self.retrieve(current_query() or prompt))
+        except Exception:
+            # Retrieval only improves an answer; never fail the call over it
+            logger.exception("Passage retrieval failed")
+            return prompt
+        return f"{passages}\n\n{prompt}" if passages else prompt
+
+    @override
+    def generate_content(
+        self,
+        prompt: str,
+        response_mime_type: str | None = None,
+        response_schema: Any | None = None,
+    ) -> ModelResponse:
+        return super().generate_content(
+            self.build_prompt(prompt), response_mime_type, response_schema
+        )
+
+    @override
+    async def agenerate_content(
+        self,
+        prompt: str,
+        response_mime_type: str | None = None,
+        response_schema: Any | None = None,
+        *,
+        timeout: float | None = None,  # noqa: ASYNC109
+    ) -> ModelResponse:
+        return await super().agenerate_content(
+            await asyncio.to_thread(self.build_prompt, prompt),
+            response_mime_type,
+            response_schema,
+            timeout=timeout,
+        )
+
+    @override
+    async def stream_content(self, prompt: str) -> AsyncIterator[str]:
+        prompt = await asyncio.to_thread(self.build_prompt, prompt)
+        async for chunk in super().stream_content(prompt):
+            yield chunk
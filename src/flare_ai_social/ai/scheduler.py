@@ -0,0 +1,448 @@
+"""
+Request Scheduler Module
+
+Arbitrates the provider quota between the traffic sources sharing it (web
+chat, Telegram DMs and group mentions, tweet replies, batch runs). Calls run
+in at most `max_concurrency` slots; the rest wait in a queue served by:
+
+- strict priority: interactive traffic is always served before normal
+  traffic, which is served before background traffic;
+- weighted fair queuing across the sources of one priority, so a busy group
+  chat cannot starve DMs;
+- earliest deadline first among the requests of one source.
+
+While requests are queued, those whose deadline has passed are dropped, and
+non-interactive requests that have waited longer than `stale_after` are shed
+with OverloadedError. A full queue sheds its lowest-priority request to make
+room, or rejects the newcomer if nothing queued ranks below it.
+
+The source of a call is taken from the context (see `traffic`), and the
+scheduler is shared safely by bots running their own event loops in other
+threads.
+"""
+
+import asyncio
+import heapq
+import itertools
+import math
+import threading
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Callable, Iterator, Mapping
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Any, override
+
+import numpy as np
+import structlog
+
+from flare_ai_social.ai.base import BaseAIProvider, ModelResponse
+from flare_ai_social.ai.deadline import DeadlineExceededError, record_miss, remaining
+from flare_ai_social.ai.wrapper import ProviderWrapper
+
+logger = structlog.get_logger(__name__)
+
+
+class Priority(IntEnum):
+    """Scheduling priority, lower values are served first"""
+
+    INTERACTIVE = 0
+    NORMAL = 1
+    BACKGROUND = 2
+
+
+@dataclass(frozen=True)
+class TrafficClass:
+    """Priority and fair-share weight of a traffic source"""
+
+    priority: Priority
+    weight: float = 1.0
+
+
+# Source of calls made outside any `traffic` block
+DEFAULT_SOURCE = "default"
+
+DEFAULT_CLASSES: dict[str, TrafficClass] = {
+    "api": TrafficClass(Priority.INTERACTIVE, weight=2.0),
+    "telegram.dm": TrafficClass(Priority.INTERACTIVE, weight=2.0),
+    "telegram.group": TrafficClass(Priority.INTERACTIVE, weight=1.0),
+    "twitter": TrafficClass(Priority.NORMAL, weight=1.0),
+    DEFAULT_SOURCE: TrafficClass(Priority.NORMAL, weight=1.0),
+    "batch": TrafficClass(Priority.BACKGROUND, weight=1.0),
+}
+
+# Stage deadline misses of queued calls are counted under
+QUEUE_STAGE = "scheduler.queue"
+
+_source: ContextVar[str] = ContextVar("traffic_source", default=DEFAULT_SOURCE)
+
+
+@contextmanager
+def traffic(source: str) -> Iterator[None]:
+    """Attribute the provider calls made in the block to `source`."""
+    token = _source.set(source)
+    try:
+        yield
+    finally:
+        _source.reset(token)
+
+
+def traffic_source() -> str:
+    """Return the source the current provider calls are attributed to."""
+    return _source.get()
+
+
+class OverloadedError(ConnectionError):
+    """Raised when the scheduler sheds a request instead of running it."""
+
+    def __init__(self, source: str, reason: str) -> None:
+        super().__init__(f"Request from {source} shed: {reason}")
+        self.source = source
+        self.reason = reason
+
+
+@dataclass(order=True)
+class _Waiter:
+    deadline: float  # monotonic, inf without one
+    seq: int
+    source: str = field(compare=False)
+    priority: Priority = field(compare=False)
+    enqueued: float = field(compare=False)
+    # Called with None when a slot is granted, else with the shedding error
+    wake: Callable[[BaseException | None], None] = field(compare=False)
+    state: str = field(default="queued", compare=False)
+
+
+@dataclass
+class _SourceStats:
+    admitted: int = 0
+    shed: int = 0
+    waits: deque[float] = field(default_factory=lambda: deque(maxlen=1024))
+
+
+class RequestScheduler:
+    """
+    Priority, fair-share and deadline aware admission of provider calls.
+
+    Attributes:
+        max_concurrency (int): Calls running at most
+        max_queue (int): Calls waiting at most
+        stale_after (float): Seconds a non-interactive call may wait while
+            the scheduler is saturated before it is shed
+        classes (dict[str, TrafficClass]): Priority and weight per source
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 16,
+        max_queue: int = 256,
+        stale_after: float = 30.0,
+        classes: Mapping[str, TrafficClass] | None = None,
+    ) -> None:
+        """
+        Initialize the scheduler.
+
+        Args:
+            max_concurrency: Calls running at most
+            max_queue: Calls waiting at most
+            stale_after: Seconds a non-interactive call may wait while the
+                scheduler is saturated before it is shed
+            classes: Priority and weight per source, merged over
+                `DEFAULT_CLASSES`
+        """
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.stale_after = stale_after
+        self.classes = {**DEFAULT_CLASSES, **(classes or {})}
+        self._active = 0
+        self._queues: dict[str, list[_Waiter]] = {}
+        self._queued = 0
+        # Weighted fair queuing: per-source virtual finish time of the last
+        # dispatched request, and the system virtual time
+        self._finish: dict[str, float] = {}
+        self._virtual_time = 0.0
+        self._seq = itertools.count()
+        self._stats: dict[str, _SourceStats] = {}
+        self._lock = threading.Lock()
+
+    def traffic_class(self, source: str) -> TrafficClass:
+        """Priority and weight of a source; unknown sources get the default."""
+        return self.classes.get(source) or self.classes[DEFAULT_SOURCE]
+
+    @asynccontextmanager
+    async def slot(self, source: str | None = None) -> AsyncIterator[None]:
+        """
+        Hold one call slot for the duration of the block.
+
+        Args:
+            source: Traffic source, defaults to the one set with `traffic`
+
+        Raises:
+            OverloadedError: If the call is shed while queued
+            DeadlineExceededError: If the call's deadline passed while queued
+        """
+        await self._acquire(source or _source.get())
+        try:
+            yield
+        finally:
+            self._release()
+
+    @contextmanager
+    def blocking_slot(self, source: str | None = None) -> Iterator[None]:
+        """Version of `slot` for blocking calls, waiting in the calling thread."""
+        self._acquire_blocking(source or _source.get())
+        try:
+            yield
+        finally:
+            self._release()
+
+    def stats(self) -> dict[str, dict[str, str | float]]:
+        """Priority, queue length, admissions, sheds and queue waits per source."""
+        with self._lock:
+            return {
+                source: {
+                    "priority": self.traffic_class(source).priority.name.lower(),
+                    "queued": len(self._queues.get(source, ())),
+                    "admitted": stats.admitted,
+                    "shed": stats.shed,
+                    "p50_wait": _quantile(stats.waits, 0.5),
+                    "p95_wait": _quantile(stats.waits, 0.95),
+                }
+                for source, stats in self._stats.items()
+            }
+
+    async def _acquire(self, source: str) -> None:
+        loop = asyncio.get_running_loop()
+        granted: asyncio.Future[None] = loop.create_future()
+
+        def wake(error: BaseException | None) -> None:
+            loop.call_soon_threadsafe(_settle, granted, error)
+
+        waiter = self._enqueue(source, wake)
+        if waiter is None:
+            return
+        try:
+            await granted
+        except asyncio.CancelledError:
+            if self._withdraw(waiter) == "granted":
+                self._release()
+            raise
+
+    def _acquire_blocking(self, source: str) -> None:
+        event = threading.Event()
+        errors: list[BaseException] = []
+
+        def wake(error: BaseException | None) -> None:
+            if error is not None:
+                errors.append(error)
+            event.set()
+
+        waiter = self._enqueue(source, wake)
+        if waiter is None:
+            return
+        if not event.wait(remaining()) and self._withdraw(waiter) == "queued":
+            record_miss(QUEUE_STAGE)
+            raise DeadlineExceededError(QUEUE_STAGE)
+        if errors:
+            raise errors[0]
+
+    def _enqueue(
+        self, source: str, wake: Callable[[BaseException | None], None]
+    ) -> _Waiter | None:
+        """Queue a call, returning None if it got a slot straight away."""
+        now = time.monotonic()
+        left = remaining()
+        priority = self.traffic_class(source).priority
+        with self._lock:
+            stats = self._stats.setdefault(source, _SourceStats())
+            self._shed_stale(now)
+            if self._active < self.max_concurrency and not self._queued:
+                self._active += 1
+                stats.admitted += 1
+                stats.waits.append(0.0)
+                return None
+            waiter = _Waiter(
+                deadline=math.inf if left is None else now + left,
+                seq=next(self._seq),
+                source=source,
+                priority=priority,
+                enqueued=now,
+                wake=wake,
+            )
+            if self._queued >= self.max_queue:
+                victim = max(
+                    (w for queue in self._queues.values() for w in queue),
+                    key=lambda w: (w.priority, w.deadline, w.seq),
+                )
+                if victim.priority <= priority:
+                    stats.shed += 1
+                    raise OverloadedError(source, "queue full")
+                self._shed(victim, OverloadedError(victim.source, "queue full"))
+            queue = self._queues.setdefault(source, [])
+            if not queue:
+                # A source joining the backlog starts at the current virtual
+                # time, so idle periods do not bank credit
+                self._finish[source] = max(
+                    self._finish.get(source, 0.0), self._virtual_time
+                )
+            heapq.heappush(queue, waiter)
+            self._queued += 1
+            return waiter
+
+    def _release(self) -> None:
+        with self._lock:
+            self._active -= 1
+            now = time.monotonic()
+            self._shed_stale(now)
+            while self._active < self.max_concurrency and self._queued:
+                waiter = self._next()
+                waiter.state = "granted"
+                self._active += 1
+                stats = self._stats[waiter.source]
+                stats.admitted += 1
+                stats.waits.append(now - waiter.enqueued)
+                waiter.wake(None)
+
+    def _next(self) -> _Waiter:
+        """Pop the next call: top priority, fairest source, earliest deadline."""
+        backlogged = [source for source, queue in self._queues.items() if queue]
+        top = min(self.traffic_class(source).priority for source in backlogged)
+        source = min(
+            (s for s in backlogged if self.traffic_class(s).priority == top),
+            key=lambda s: self._finish[s],
+        )
+        self._virtual_time = self._finish[source]
+        self._finish[source] += 1 / self.traffic_class(source).weight
+        self._queued -= 1
+        return heapq.heappop(self._queues[source])
+
+    def _withdraw(self, waiter: _Waiter) -> str:
+        """Remove a call that stopped waiting; returns its state beforehand."""
+        with self._lock:
+            state = waiter.state
+            if state == "queued":
+                self._remove(waiter)
+                waiter.state = "withdrawn"
+            return state
+
+    def _shed_stale(self, now: float) -> None:
+        """Drop queued calls that missed their deadline or waited too long."""
+        if not self._queued:
+            return
+        for queue in list(self._queues.values()):
+            for waiter in list(queue):
+                if waiter.deadline <= now:
+                    record_miss(QUEUE_STAGE)
+                    self._shed(waiter, DeadlineExceededError(QUEUE_STAGE))
+                elif (
+                    waiter.priority > Priority.INTERACTIVE
+                    and now - waiter.enqueued > self.stale_after
+                ):
+                    self._shed(waiter, OverloadedError(waiter.source, "stale"))
+
+    def _shed(self, waiter: _Waiter, error: BaseException) -> None:
+        self._remove(waiter)
+        waiter.state = "shed"
+        self._stats[waiter.source].shed += 1
+        logger.warning(
+            "Request shed",
+            source=waiter.source,
+            waited=round(time.monotonic() - waiter.enqueued, 3),
+            reason=str(error),
+        )
+        waiter.wake(error)
+
+    def _remove(self, waiter: _Waiter) -> None:
+        queue = self._queues[waiter.source]
+        queue.remove(waiter)
+        heapq.heapify(queue)
+        self._queued -= 1
+
+
+class SchedulerProvider(ProviderWrapper):
+    """
+    Provider whose calls are admitted by a RequestScheduler.
+
+    Streams hold their slot until they are fully consumed.
+
+    Attributes:
+        scheduler (RequestScheduler): Scheduler admitting the calls
+    """
+
+    def __init__(self, provider: BaseAIProvider, scheduler: RequestScheduler) -> None:
+        """
+        Initialize the provider.
+
+        Args:
+            provider: Provider that handles the admitted calls
+            scheduler: Scheduler admitting the calls
+        """
+        super().__init__(provider)
+        self.scheduler = scheduler
+
+    @override
+    def generate_content(
+        self,
+        prompt: str,
+        response_mime_type: str | None = None,
+        response_schema: Any | None = None,
+    ) -> ModelResponse:
+        with self.scheduler.blocking_slot():
+            return super().generate_content(prompt, response_mime_type, response_schema)
+
+    @override
+    def send_message(self, msg: str) -> ModelResponse:
+        with self.scheduler.blocking_slot():
+            return super().send_message(msg)
+
+    @override
+    async def agenerate_content(
+        self,
+        prompt: str,
+        response_mime_type: str | None = None,
+        response_schema: Any | None = None,
+        *,
+        timeout: float | None = None,  # noqa: ASYNC109
+    ) -> ModelResponse:
+        async with self.scheduler.slot():
+            return await super().agenerate_content(
+                prompt, response_mime_type, response_schema, timeout=timeout
+            )
+
+    @override
+    async def asend_message(
+        self,
+        msg: str,
+        *,
+        timeout: float | None = None,  # noqa: ASYNC109
+    ) -> ModelResponse:
+        async with self.scheduler.slot():
+            return await super().asend_message(msg, timeout=timeout)
+
+    @override
+    async def stream_content(self, prompt: str) -> AsyncIterator[str]:
+        async with self.scheduler.slot():
+            async for chunk in super().stream_content(prompt):
+                yield chunk
+
+    @override
+    async def stream_message(self, msg: str) -> AsyncIterator[str]:
+        async with self.scheduler.slot():
+            async for chunk in super().stream_message(msg):
+                yield chunk
+
+
+def _settle(future: asyncio.Future[None], error: BaseException | None) -> None:
+    """Resolve a waiter's future unless the waiter gave up meanwhile."""
+    if future.done():
+        return
+    if error is None:
+        future.set_result(None)
+    else:
+        future.set_exception(error)
+
+
+def _quantile(values: deque[float], q: float) -> float:
+    return round(float(np.quantile(list(values), q)), 3) if values else 0.0
@@ -0,0 +1,461 @@
+"""
+Semantic Response Cache Module
+
+Answers paraphrased questions ("what is FAssets?" / "explain FAssets pls")
+from earlier generations. Prompts are embedded into unit vectors and searched
+in a fixed-capacity NumPy index, optionally memory-mapped to disk; a cached
+answer is returned when the most similar earlier prompt clears a cosine
+similarity threshold. The index evicts the least recently used entry when
+full, and entries expire after a TTL.
+
+Two embedders are provided: `HashingEmbedder`, a deterministic local feature
+hasher that needs no network access, and `GeminiEmbedder`, which uses the
+Gemini embedding API.
+"""
+
+import asyncio
+import hashlib
+import json
+import re
+import threading
+import time
+from collections.abc import AsyncIterator
+from pathlib import Path
+from typing import Any, Protocol, override
+
+import google.generativeai as genai
+import numpy as np
+import structlog
+
+from flare_ai_social.ai.base import BaseAIProvider, ModelResponse
+from flare_ai_social.ai.cache import cache_bypassed, served_models
+from flare_ai_social.ai.wrapper import ProviderWrapper
+
+logger = structlog.get_logger(__name__)
+
+_WORD = re.compile(r"\w+")
+# Question filler that carries no topic; dropped before hashing so paraphrases
+# of the same question are compared on the words that matter
+STOPWORDS = frozenset(
+    {
+        "a",
+        "about",
+        "an",
+        "and",
+        "are",
+        "can",
+        "could",
+        "do",
+        "does",
+        "explain",
+        "for",
+        "how",
+        "i",
+        "in",
+        "is",
+        "it",
+        "me",
+        "my",
+        "of",
+        "on",
+        "or",
+        "please",
+        "pls",
+        "tell",
+        "the",
+        "to",
+        "what",
+        "whats",
+        "which",
+        "why",
+        "would",
+        "you",
+    }
+)
+
+
+class Embedder(Protocol):
+    """Turns texts into L2-normalized float32 vectors of a fixed dimension."""
+
+    dim: int
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        """Return a `(len(texts), dim)` matrix of unit vectors."""
+        ...
+
+
+def _normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+class HashingEmbedder:
+    """
+    Deterministic bag-of-features embedder.
+
+    Hashes lowercase content words and their character trigrams into a fixed
+    number of signed buckets, skipping `STOPWORDS`. Paraphrases that share
+    key terms land close together, which is enough for near-duplicate
+    detection and makes the cache testable offline.
+
+    Attributes:
+        dim (int): Number of hash buckets
+    """
+
+    def __init__(self, dim: int = 512) -> None:
+        self.dim = dim
+
+    def _features(self, text: str) -> list[str]:
+        words = [w for w in _WORD.findall(text.casefold()) if w not in STOPWORDS]
+        features = list(words)
+        for word in words:
+            padded = f" {word} "
+            features.extend(padded[i : i + 3] for i in range(len(padded) - 2))
+        return features
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        """Return the normalized feature-hash vectors of the texts."""
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                digest = hashlib.blake2b(feature.encode(), digest_size=8).digest()
+                value = int.from_bytes(digest, "little")
+                sign = 1.0 if value & 1 else -1.0
+                vectors[row, (value >> 1) % self.dim] += sign
+        return _normalize_rows(vectors)
+
+
+class GeminiEmbedder:
+    """
+    Embedder backed by the Gemini embedding API.
+
+    Attributes:
+        model (str): Embedding model name
+        dim (int): Dimension of the returned vectors
+    """
+
+    def __init__(
+        self, model: str = "models/text-embedding-004", dim: int = 768
+    ) -> None:
+        self.model = model
+        self.dim = dim
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        """Embed the texts with the Gemini API and normalize the vectors."""
+        result = genai.embed_content(
+            model=self.model,
+            content=texts,
+            task_type="semantic_similarity",
+            output_dimensionality=self.dim,
+        )
+        return _normalize_rows(np.asarray(result["embedding"], dtype=np.float32))
+
+
+class VectorIndex:
+    """
+    Fixed-capacity cosine-similarity index with LRU eviction.
+
+    Vectors live in a `(capacity, dim)` float32 matrix, memory-mapped when a
+    path is given so the index survives restarts. Entries belong to a scope
+    and only match queries from the same scope.
+
+    Attributes:
+        dim (int): Vector dimension
+        capacity (int): Maximum number of entries
+    """
+
+    def __init__(
+        self, dim: int, capacity: int = 4096, path: Path | None = None
+    ) -> None:
+        """
+        Initialize the index.
+
+        Args:
+            dim: Vector dimension
+            capacity: Maximum number of entries before eviction
+            path: File for the memory-mapped vectors; entry data is kept in a
+                JSON file next to it. None keeps the index in memory.
+        """
+        self.dim = dim
+        self.capacity = capacity
+        self.path = path
+        self._lock = threading.Lock()
+        self._clock = 0
+        self._payloads: list[dict[str, Any] | None] = [None] * capacity
+        self._scopes = np.zeros(capacity, dtype=np.uint64)
+        self._expires = np.zeros(capacity, dtype=np.float64)
+        self._last_used = np.zeros(capacity, dtype=np.int64)
+        self._valid = np.zeros(capacity, dtype=bool)
+        if path is None:
+            self._vectors = np.zeros((capacity, dim), dtype=np.float32)
+        else:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            mode = "r+" if path.exists() else "w+"
+            self._vectors = np.memmap(
+                path, dtype=np.float32, mode=mode, shape=(capacity, dim)
+            )
+            self._load()
+
+    def __len__(self) -> int:
+        return int(self._valid.sum())
+
+    @property
+    def _meta_path(self) -> Path | None:
+        return self.path.with_suffix(".json") if self.path is not None else None
+
+    def _load(self) -> None:
+        meta_path = self._meta_path
+        if meta_path is None or not meta_path.exists():
+            return
+        meta = json.loads(meta_path.read_text())
+        for entry in meta["entries"]:
+            slot = entry["slot"]
+            self._payloads[slot] = entry["payload"]
+            self._scopes[slot] = entry["scope"]
+            self._expires[slot] = entry["expires_at"]
+            self._last_used[slot] = entry["last_used"]
+            self._valid[slot] = True
+        self._clock = int(self._last_used.max(initial=0))
+
+    def flush(self) -> None:
+        """Write the memory-mapped vectors and entry data to disk."""
+        meta_path = self._meta_path
+        if meta_path is None or not isinstance(self._vectors, np.memmap):
+            return
+        with self._lock:
+            self._vectors.flush()
+            entries = [
+                {
+                    "slot": int(slot),
+                    "payload": self._payloads[slot],
+                    "scope": int(self._scopes[slot]),
+                    "expires_at": float(self._expires[slot]),
+                    "last_used": int(self._last_used[slot]),
+                }
+                for slot in np.flatnonzero(self._valid)
+            ]
+            meta_path.write_text(json.dumps({"entries": entries}))
+
+    def _tick(self) -> int:
+        self._clock += 1
+        return self._clock
+
+    def add(
+        self, vector: np.ndarray, payload: dict[str, Any], scope: int, ttl: float
+    ) -> None:
+        """
+        Insert an entry, evicting the least recently used one if full.
+
+        Args:
+            vector: Unit vector of the prompt
+            payload: JSON-serializable data returned on a match
+            scope: Entries only match queries with the same scope
+            ttl: Seconds the entry stays valid
+        """
+        with self._lock:
+            free = np.flatnonzero(~self._valid)
+            slot = int(free[0]) if free.size else int(np.argmin(self._last_used))
+            self._vectors[slot] = vector
+            self._payloads[slot] = payload
+            self._scopes[slot] = scope
+            self._expires[slot] = time.time() + ttl
+            self._last_used[slot] = self._tick()
+            self._valid[slot] = True
+
+    def search(
+        self, vector: np.ndarray, scope: int, threshold: float
+    ) -> tuple[float, dict[str, Any]] | None:
+        """
+        Find the most similar live entry in a scope.
+
+        Args:
+            vector: Unit vector of the query
+            scope: Scope the entry must belong to
+            threshold: Minimum cosine similarity of a match
+
+        Returns:
+            tuple[float, dict[str, Any]] | None: Similarity and payload of the
+                best match, or None if nothing clears the threshold
+        """
+        with self._lock:
+            self._valid &= self._expires > time.time()
+            mask = self._valid & (self._scopes == scope)
+            if not mask.any():
+                return None
+            scores = np.where(mask, self._vectors @ vector, -np.inf)
+            slot = int(np.argmax(scores))
+            score = float(scores[slot])
+            if score < threshold:
+                return None
+            self._last_used[slot] = self._tick()
+            payload = self._payloads[slot]
+            return (score, payload) if payload is not None else None
+
+
+def _scope(model_name: str, system_instruction: str | None, config: str) -> int:
+    """Hash the generation settings into an index scope."""
+    key = "\0".join([model_name, system_instruction or "", config])
+    return int.from_bytes(
+        hashlib.blake2b(key.encode(), digest_size=8).digest(), "little"
+    )
+
+
+class SemanticCacheProvider(ProviderWrapper):
+    """
+    Provider that answers near-duplicate one-shot prompts from a vector index.
+
+    Like `CachedProvider`, only `generate_content`, `agenerate_content` and
+    `stream_content` are cached, `no_cache()` bypasses the lookup, and answers
+    are stored under the model reported to serve them.
+
+    Attributes:
+        embedder (Embedder): Embeds prompts
+        index (VectorIndex): Nearest-neighbour index of earlier prompts
+        threshold (float): Minimum cosine similarity for a hit
+        ttl (float): Seconds an answer stays valid
+        hits (int): Prompts answered from the index
+        misses (int): Prompts sent to the wrapped provider
+    """
+
+    def __init__(
+        self,
+        provider: BaseAIProvider,
+        embedder: Embedder | None = None,
+        index: VectorIndex | None = None,
+        *,
+        threshold: float = 0.9,
+        ttl: float = 3600.0,
+    ) -> None:
+        """
+        Initialize the semantic cache.
+
+        Args:
+            provider: Provider that handles cache misses
+            embedder: Prompt embedder, a HashingEmbedder by default
+            index: Index to search, an in-memory index by default
+            threshold: Minimum cosine similarity for a hit
+            ttl: Seconds an answer stays valid
+        """
+        super().__init__(provider)
+        self.embedder = embedder if embedder is not None else HashingEmbedder()
+        self.index = index if index is not None else VectorIndex(self.embedder.dim)
+        self.threshold = threshold
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    def _scope(
+        self,
+        response_mime_type: str | None,
+        response_schema: Any | None,
+        served: list[str] | None = None,
+    ) -> int:
+        return _scope(
+            served[-1] if served else self.model_name,
+            self.system_instruction,
+            f"{response_mime_type}|{response_schema!r}",
+        )
+
+    def lookup(self, vector: np.ndarray, scope: int) -> ModelResponse | None:
+        """Return the cached answer closest to a prompt vector, if any."""
+        match = self.index.search(vector, scope, self.threshold)
+        if match is None:
+            self.misses += 1
+            return None
+        score, payload = match
+        self.hits += 1
+        logger.debug("Semantic cache hit", similarity=round(score, 3))
+        return ModelResponse(
+            text=payload["text"],
+            raw_response=None,
+            metadata={
+                "cached": True,
+                "similarity": score,
+                "cached_prompt": payload["prompt"],
+            },
+        )
+
+    def store(self, vector: np.ndarray, scope: int, prompt: str, text: str) -> None:
+        """Add an answer to the index."""
+        if text:
+            self.index.add(vector, {"prompt": prompt, "text": text}, scope, self.ttl)
+
+    @override
+    def generate_content(
+        self,
+        prompt: str,
+        response_mime_type: str | None = None,
+        response_schema: Any | None = None,
+    ) -> ModelResponse:
+        if cache_bypassed():
+            return super().generate_content(prompt, response_mime_type, response_schema)
+        vector = self.embedder.embed([prompt])[0]
+        cached = self.lookup(vector, self._scope(response_mime_type, response_schema))
+        if cached is not None:
+            return cached
+        with served_models() as served:
+            response = super().generate_content(
+                prompt, response_mime_type, response_schema
+            )
+        scope = self._scope(response_mime_type, response_schema, served)
+        self.store(vector, scope, prompt, response.text)
+        return response
+
+    @override
+    async def agenerate_content(
+        self,
+        prompt: str,
+        response_mime_type: str | None = None,
+        response_schema: Any | None = None,
+        *,
+        timeout: float | None = None,  # noqa: ASYNC109
+    ) -> ModelResponse:
+        if cache_bypassed():
+            return await super().agenerate_content(
+                prompt, response_mime_type, response_schema, timeout=timeout
+            )
+        vector = (await asyncio.to_thread(self.embedder.embed, [prompt]))[0]
+        cached = self.lookup(vector, self._scope(response_mime_type, response_schema))
+        if cached is not None:
+            return cached
+        with served_models() as served:
+            response = await super().agenerate_content(
+                prompt, response_mime_type, response_schema, timeout=timeout
+            )
+        scope = self._scope(response_mime_type, response_schema, served)
+        self.store(vector, scope, prompt, response.text)
+        return response
+
+    @override
+    async def stream_content(self, prompt: str) -> AsyncIterator[str]:
+        if cache_bypassed():
+            async for chunk in super().stream_content(prompt):
+                yield chunk
+            return
+        vector = (await asyncio.to_thread(self.embedder.embed, [prompt]))[0]
+        cached = self.lookup(vector, self._scope(None, None))
+        if cached is not None:
+            yield cached.text
+            return
+        parts: list[str] = []
+        with served_models() as served:
+            async for chunk in super().stream_content(prompt):
+                parts.append(chunk)
+                yield chunk
+        self.store(vector, self._scope(None, None, served), prompt, "".join(parts))
+
+    def stats(self) -> dict[str, float]:
+        """Return cache counters for logging."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.index),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+    @override
+    async def aclose(self) -> None:
+        logger.info("Semantic cache stats", **self.stats())
+        self.index.flush()
+        await super().aclose()
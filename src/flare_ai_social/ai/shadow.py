@@ -0,0 +1,325 @@
+"""
+Shadow Traffic Module
+
+Mirrors a sampled fraction of live one-shot prompts to a candidate model so it
+can be compared with the production model on real traffic before it is given
+any. The candidate's answer is never returned to the caller: the mirrored call
+runs as a background task, outside the request's deadline and traffic source,
+and under its own concurrency budget. A sample arriving while the budget is
+used up is dropped rather than queued, so a slow candidate cannot build up a
+backlog.
+
+Each mirrored prompt is stored with both responses, their latencies and a
+text similarity score in a ShadowStore, in memory and optionally appended to
+a JSON Lines file for offline review (see `stats` for the aggregates).
+
+Conversational calls are not mirrored, since the candidate has no copy of the
+chat session.
+"""
+
+import asyncio
+import contextvars
+import difflib
+import json
+import random
+import threading
+import time
+from collections import deque
+from collections.abc import AsyncIterator
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, override
+
+import numpy as np
+import structlog
+
+from flare_ai_social.ai.base import BaseAIProvider, ModelResponse
+from flare_ai_social.ai.scheduler import traffic_source
+from flare_ai_social.ai.wrapper import ProviderWrapper
+
+logger = structlog.get_logger(__name__)
+
+
+@dataclass
+class ShadowRecord:
+    """A mirrored prompt with the production and candidate responses"""
+
+    prompt: str
+    source: str
+    production_model: str
+    candidate_model: str
+    production: str | None
+    candidate: str | None
+    production_latency: float | None
+    candidate_latency: float | None
+    production_error: str | None = None
+    candidate_error: str | None = None
+    similarity: float | None = None
+    timestamp: float = field(default_factory=time.time)
+
+
+class ShadowStore:
+    """
+    Recent shadow records and their aggregate statistics.
+
+    Attributes:
+        path (Path | None): JSON Lines file every record is appended to
+        max_records (int): Records kept in memory
+    """
+
+    def __init__(self, path: Path | None = None, max_records: int = 500) -> None:
+        """
+        Initialize the store.
+
+        Args:
+            path: Optional JSON Lines file every record is appended to
+            max_records: Records kept in memory
+        """
+        self.path = path
+        self.max_records = max_records
+        self._records: deque[ShadowRecord] = deque(maxlen=max_records)
+        self._lock = threading.Lock()
+        self.mirrored = 0
+        self.dropped = 0
+        if path is not None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+
+    def add(self, record: ShadowRecord) -> None:
+        """Score a finished record, keep it and append it to the file."""
+        if record.production is not None and record.candidate is not None:
+            record.similarity = round(
+                difflib.SequenceMatcher(
+                    None, record.production, record.candidate
+                ).ratio(),
+                3,
+            )
+        with self._lock:
+            self._records.append(record)
+            self.mirrored += 1
+            if self.path is not None:
+                with self.path.open("a", encoding="utf-8") as f:
+                    f.write(json.dumps(asdict(record)) + "\n")
+
+    def drop(self) -> None:
+        """Count a sample skipped because the shadow budget was used up."""
+        with self._lock:
+            self.dropped += 1
+
+    def records(self, limit: int | None = None) -> list[ShadowRecord]:
+        """Return the most recent records, newest last."""
+        with self._lock:
+            records = list(self._records)
+        return records[-limit:] if limit else records
+
+    def stats(self) -> dict[str, Any]:
+        """Mirrored and dropped counts, error rates, latencies and similarity."""
+        records = self.records()
+        similarities = [r.similarity for r in records if r.similarity is not None]
+        return {
+            "mirrored": self.mirrored,
+            "dropped": self.dropped,
+            "production_errors": sum(r.production_error is not None for r in records),
+            "candidate_errors": sum(r.candidate_error is not None for r in records),
+            **_latencies("production", [r.production_latency for r in records]),
+            **_latencies("candidate", [r.candidate_latency for r in records]),
+            "mean_similarity": (
+                round(sum(similarities) / len(similarities), 3)
+                if similarities
+                else None
+            ),
+        }
+
+
+class ShadowProvider(ProviderWrapper):
+    """
+    Provider that mirrors sampled one-shot calls to a candidate provider.
+
+    Attributes:
+        candidate (BaseAIProvider): Provider the sampled prompts are mirrored to
+        store (ShadowStore): Store of the mirrored calls
+        sample_rate (float): Fraction of calls mirrored
+        concurrency (int): Mirrored calls allowed to run at once
+        timeout (float): Seconds a mirrored call may take
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        provider: BaseAIProvider,
+        candidate: BaseAIProvider,
+        store: ShadowStore,
+        *,
+        sample_rate: float = 0.05,
+        concurrency: int = 2,
+        timeout: float = 30.0,
+    ) -> None:
+        """
+        Initialize the provider.
+
+        Args:
+            provider: Production provider, whose responses are returned
+            candidate: Provider the sampled prompts are mirrored to
+            store: Store of the mirrored calls
+            sample_rate: Fraction of calls mirrored
+            concurrency: Mirrored calls allowed to run at once
+            timeout: Seconds a mirrored call may take
+        """
+        super().__init__(provider)
+        self.candidate = candidate
+        self.store = store
+        self.sample_rate = sample_rate
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        # Strong references, the event loop only keeps weak ones
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    def _mirror(self, prompt: str) -> asyncio.Future[tuple[Any, float]] | None:
+        """
+        Start mirroring a prompt if it is sampled and the budget allows.
+
+        Returns:
+            asyncio.Future | None: Future to settle with the production
+                outcome and latency, None if the prompt is not mirrored
+        """
+        if random.random() >= self.sample_rate:  # noqa: S311
+            return None
+        with self._lock:
+            if self._in_flight >= self.concurrency:
+                self.store.drop()
+                return None
+            self._in_flight += 1
+        production: asyncio.Future[tuple[Any, float]] = (
+            asyncio.get_running_loop().create_future()
+        )
+        record = ShadowRecord(
+            prompt=prompt,
+            source=traffic_source(),
+            production_model=self.model_name,
+            candidate_model=getattr(
+                self.candidate, "model_name", type(self.candidate).__name__
+            ),
+            production=None,
+            candidate=None,
+            production_latency=None,
+            candidate_latency=None,
+        )
+        # Fresh context: no request deadline or traffic source applies
+        task = asyncio.create_task(
+            self._shadow(record, production), context=contextvars.Context()
+        )
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return production
+
+    async def _shadow(
+        self, record: ShadowRecord, production: asyncio.Future[tuple[Any, float]]
+    ) -> None:
+        """Run the candidate call and store it next to the production one."""
+        started = time.monotonic()
+        try:
+            async with asyncio.timeout(self.timeout):
+                response = await self.candidate.agenerate_content(record.prompt)
+            record.candidate = response.text
+            record.candidate_latency = round(time.monotonic() - started, 3)
+        except Exception as e:  # noqa: BLE001
+            record.candidate_error = f"{type(e).__name__}: {e}"
+            logger.debug("Shadow call failed", error=record.candidate_error)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+        try:
+            outcome, latency = await production
+        except asyncio.CancelledError:
+            return
+        if isinstance(outcome, BaseException):
+            record.production_error = f"{type(outcome).__name__}: {outcome}"
+        else:
+            record.production = outcome
+            record.production_latency = round(latency, 3)
+        await asyncio.to_thread(self.store.add, record)
+
+    @override
+    async def agenerate_content(
+        self,
+        prompt: str,
+        response_mime_type: str | None = None,
+        response_schema: Any | None = None,
+        *,
+        timeout: float | None = None,  # noqa: ASYNC109
+    ) -> ModelResponse:
+        production = self._mirror(prompt)
+        if production is None:
+            return await super().agenerate_content(
+                prompt, response_mime_type, response_schema, timeout=timeout
+            )
+        started = time.monotonic()
+        try:
+            response = await super().agenerate_content(
+                prompt, response_mime_type, response_schema, timeout=timeout
+            )
+        except asyncio.CancelledError:
+            production.cancel()
+            raise
+        except Exception as e:
+            _settle(production, e, started)
+            raise
+        _settle(production, response.text, started)
+        return response
+
+    @override
+    async def stream_content(self, prompt: str) -> AsyncIterator[str]:
+        production = self._mirror(prompt)
+        if production is None:
+            async for chunk in super().stream_content(prompt):
+                yield chunk
+            return
+        started = time.monotonic()
+        chunks: list[str] = []
+        try:
+            async for chunk in super().stream_content(prompt):
+                chunks.append(chunk)
+                yield chunk
+        except (asyncio.CancelledError, GeneratorExit):
+            # Abandoned by the consumer: nothing to compare against
+            production.cancel()
+            raise
+        except Exception as e:
+            _settle(production, e, started)
+            raise
+        _settle(production, "".join(chunks), started)
+
+    @override
+    async def aclose(self) -> None:
+        """Finish the mirrored calls of this event loop and close both providers."""
+        loop = asyncio.get_running_loop()
+        pending = [task for task in self._tasks if task.get_loop() is loop]
+        if pending:
+            _, unfinished = await asyncio.wait(pending, timeout=self.timeout)
+            for task in unfinished:
+                task.cancel()
+        await super().aclose()
+        aclose = getattr(self.candidate, "aclose", None)
+        if aclose is not None:
+            await aclose()
+
+
+def _settle(
+    production: asyncio.Future[tuple[Any, float]], outcome: Any, started: float
+) -> None:
+    """Hand the production outcome to the shadow task unless it is gone."""
+    if not production.done():
+        production.set_result((outcome, time.monotonic() - started))
+
+
+def _latencies(side: str, values: list[float | None]) -> dict[str, float | None]:
+    """p50 and p95 of the recorded latencies of one side."""
+    samples = [v for v in values if v is not None]
+    if not samples:
+        return {f"{side}_p50_latency": None, f"{side}_p95_latency": None}
+    p50, p95 = np.quantile(samples, [0.5, 0.95])
+    return {
+        f"{side}_p50_latency": round(float(p50), 3),
+        f"{side}_p95_latency": round(float(p95), 3),
+    }
@@ -0,0 +1,160 @@
+"""
+HTTP Transport Module
+
+Connection pooling, retry and timeout configuration shared by the sync
+(`requests`) and async (`httpx`) API routers.
+
+Retries cover connection errors and the statuses that signal a transient
+condition (429 and 5xx gateway errors). Requests that are not idempotent,
+such as a POST that starts a generation, are only retried when the server
+cannot have acted on them: when no connection was made, or on 429 and 503.
+A read error or a 500/502/504 may come after the work was done, and
+retrying it would run (and bill) the generation twice.
+
+Delays grow exponentially with full jitter so clients backing off together
+do not retry in lockstep, and a `Retry-After` header from the server takes
+precedence. HTTP/2 is used by the
+async client when the optional `h2` package is installed.
+"""
+
+import email.utils
+import importlib.util
+import random
+import time
+from dataclasses import dataclass
+from typing import override
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Statuses worth retrying: rate limited or a transient upstream failure
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+# Statuses sent before the server acted on the request, safe for any method
+UNPROCESSED_STATUSES = frozenset({429, 503})
+# Methods that can be repeated without repeating their effect
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+# Errors raised before the request reached the server
+UNSENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+# httpx negotiates HTTP/2 only with the optional `h2` package (httpx[http2])
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+def retry_statuses(method: str) -> frozenset[int]:
+    """Statuses after which a request with this method may be retried."""
+    if method.upper() in IDEMPOTENT_METHODS:
+        return RETRY_STATUSES
+    return UNPROCESSED_STATUSES
+
+
+def is_retryable_error(method: str, error: httpx.TransportError) -> bool:
+    """Whether a request that failed with `error` may be sent again."""
+    if isinstance(error, UNSENT_ERRORS):
+        return True
+    # Read timeouts are left to the caller's deadline
+    return method.upper() in IDEMPOTENT_METHODS and not isinstance(
+        error, httpx.TimeoutException
+    )
+
+
+class _Retry(Retry):
+    """urllib3 retry policy that only retries unprocessed non-idempotent calls."""
+
+    @override
+    def is_retry(
+        self,
+        method: str,
+        status_code: int,
+        has_retry_after: bool = False,
+    ) -> bool:
+        if status_code not in retry_statuses(method):
+            return False
+        return super().is_retry(method, status_code, has_retry_after)
+
+
+@dataclass(frozen=True)
+class TransportConfig:
+    """Pool, retry and timeout settings of an API client"""
+
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0  # seconds an idle connection is kept
+    timeout: float = 30.0  # default deadline of a request, retries included
+    connect_timeout: float = 5.0
+    retries: int = 3
+    backoff: float = 0.5  # base of the exponential backoff in seconds
+    max_backoff: float = 8.0
+    http2: bool = HTTP2_AVAILABLE
+
+    def retry_delay(self, attempt: int, retry_after: str | None = None) -> float:
+        """
+        Seconds to wait before retry number `attempt` (0-based).
+
+        Args:
+            attempt: Number of retries already made
+            retry_after: Value of the response's `Retry-After` header, if any
+
+        Returns:
+            float: The server's requested delay if given, else a full-jitter
+                exponential backoff
+        """
+        requested = parse_retry_after(retry_after)
+        if requested is not None:
+            return requested
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2**attempt))  # noqa: S311
+
+    def requests_session(self) -> requests.Session:
+        """Create a pooled `requests` session that retries transient errors."""
+        retry = _Retry(
+            total=self.retries,
+            connect=self.retries,
+            # A read error may come after the server acted on the request
+            read=0,
+            status=self.retries,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=None,
+            backoff_factor=self.backoff,
+            backoff_max=self.max_backoff,
+            backoff_jitter=self.backoff,
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=self.max_keepalive_connections,
+            pool_maxsize=self.max_keepalive_connections,
+            max_retries=retry,
+        )
+        session = requests.Session()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def httpx_client(self) -> httpx.AsyncClient:
+        """Create a pooled async client; status retries are left to the caller."""
+        limits = httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+        return httpx.AsyncClient(
+            http2=self.http2,
+            limits=limits,
+            timeout=httpx.Timeout(self.timeout, connect=self.connect_timeout),
+        )
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Seconds requested by a `Retry-After` header (delta or HTTP date)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
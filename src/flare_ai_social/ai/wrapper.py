@@ -0,0 +1,103 @@
+"""
+Provider Wrapper Module
+
+Base class for providers that add behaviour (caching, routing, failover, ...)
+around another provider. Every call is delegated to the wrapped provider, so a
+subclass only overrides the methods it changes and wrappers can be stacked.
+"""
+
+from collections.abc import AsyncIterator
+from typing import Any, override
+
+from flare_ai_social.ai.base import BaseAIProvider, ModelResponse
+
+
+class ProviderWrapper(BaseAIProvider):
+    """
+    Provider that delegates every call to a wrapped provider.
+
+    Attributes:
+        provider (BaseAIProvider): The wrapped provider
+    """
+
+    def __init__(self, provider: BaseAIProvider) -> None:
+        """
+        Initialize the wrapper.
+
+        Args:
+            provider: Provider that handles the delegated calls
+        """
+        self.provider = provider
+
+    @property
+    def model_name(self) -> str:
+        """Model identifier of the wrapped provider."""
+        return getattr(self.provider, "model_name", type(self.provider).__name__)
+
+    @property
+    def system_instruction(self) -> str | None:
+        """System instruction of the wrapped provider, if any."""
+        return getattr(self.provider, "system_instruction", None)
+
+    @property
+    @override
+    def chat_history(self) -> list[Any]:  # pyright: ignore [reportIncompatibleVariableOverride]
+        """Chat history of the wrapped provider."""
+        return self.provider.chat_history
+
+    @override
+    def reset(self) -> None:
+        self.provider.reset()
+
+    @override
+    def generate_content(
+        self,
+        prompt: str,
+        response_mime_type: str | None = None,
+        response_schema: Any | None = None,
+    ) -> ModelResponse:
+        return self.provider.generate_content(
+            prompt, response_mime_type, response_schema
+        )
+
+    @override
+    def send_message(self, msg: str) -> ModelResponse:
+        return self.provider.send_message(msg)
+
+    @override
+    async def agenerate_content(
+        self,
+        prompt: str,
+        response_mime_type: str | None = None,
+        response_schema: Any | None = None,
+        *,
+        timeout: float | None = None,  # noqa: ASYNC109
+    ) -> ModelResponse:
+        return await self.provider.agenerate_content(
+            prompt, response_mime_type, response_schema, timeout=timeout
+        )
+
+    @override
+    async def asend_message(
+        self,
+        msg: str,
+        *,
+        timeout: float | None = None,  # noqa: ASYNC109
+    ) -> ModelResponse:
+        return await self.provider.asend_message(msg, timeout=timeout)
+
+    @override
+    async def stream_content(self, prompt: str) -> AsyncIterator[str]:
+        async for chunk in self.provider.stream_content(prompt):
+            yield chunk
+
+    @override
+    async def stream_message(self, msg: str) -> AsyncIterator[str]:
+        async for chunk in self.provider.stream_message(msg):
+            yield chunk
+
+    async def aclose(self) -> None:
+        """Close the wrapped provider if it holds resources."""
+        aclose = getattr(self.provider, "aclose", None)
+        if aclose is not None:
+            await aclose()
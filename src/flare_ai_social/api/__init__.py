@@ -1,3 +1,4 @@
+from .routes.admin import AdminRouter
 from .routes.chat import ChatMessage, ChatRouter, router
 
-__all__ = ["ChatMessage", "ChatRouter", "router"]
+__all__ = ["AdminRouter", "ChatMessage", "ChatRouter", "router"]
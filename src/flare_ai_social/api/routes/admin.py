@@ -0,0 +1,232 @@
+"""
+Admin Router Module
+
+Runtime control of the model variants served by a ModelRegistry: list the
+variants with their traffic, latency and error statistics, add a variant by
+model name, change the traffic split, swap all traffic to one variant, and
+remove a variant once its traffic has been moved off. When a candidate model
+is shadowed, its mirrored calls can be compared with production's, and the
+FAQ hit counts show which curated answers are in use.
+
+Every route requires the admin token in the `X-Admin-Token` header.
+"""
+
+import secrets
+from dataclasses import asdict
+from typing import Annotated, Any
+
+import structlog
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from pydantic import BaseModel, Field
+
+from flare_ai_social.ai import FAQIndex, ModelRegistry, ShadowStore
+
+logger = structlog.get_logger(__name__)
+
+ADMIN_TOKEN_HEADER = "X-Admin-Token"
+
+
+class VariantCreate(BaseModel):
+    """
+    Pydantic model of a variant to add.
+
+    Attributes:
+        name (str): Name the variant is addressed by
+        model (str): Model identifier, e.g. "gemini-1.5-pro"
+        weight (float): Initial traffic weight, no traffic by default
+    """
+
+    name: str = Field(..., min_length=1, max_length=64)
+    model: str = Field(..., min_length=1)
+    weight: float = Field(0.0, ge=0)
+
+
+class TrafficSplit(BaseModel):
+    """
+    Pydantic model of a traffic split.
+
+    Attributes:
+        weights (dict[str, float]): Relative weight per variant; variants
+            not listed get no traffic
+    """
+
+    weights: dict[str, float]
+
+
+class AdminRouter:
+    """
+    Router exposing the model registry to operators.
+
+    Attributes:
+        registry (ModelRegistry): Registry the routes act on
+        shadow (ShadowStore | None): Mirrored calls of the shadowed candidate
+        faq (FAQIndex | None): FAQ answered without calling the model
+    """
+
+    def __init__(
+        self,
+        registry: ModelRegistry,
+        token: str,
+        shadow: ShadowStore | None = None,
+        faq: FAQIndex | None = None,
+    ) -> None:
+        """
+        Initialize the AdminRouter.
+
+        Args:
+            registry: Registry the routes act on
+            token: Secret expected in the `X-Admin-Token` header
+            shadow: Mirrored calls of the shadowed candidate, if any
+            faq: FAQ answered without calling the model, if any
+
+        Raises:
+            ValueError: If the token is empty
+        """
+        if not token:
+            msg = "AdminRouter requires a token"
+            raise ValueError(msg)
+        self.registry = registry
+        self.shadow = shadow
+        self.faq = faq
+        self._token = token
+        self._router = APIRouter(dependencies=[Depends(self._authorize)])
+        self.logger = logger.bind(router="admin")
+        self._setup_routes()
+        self._setup_variant_routes()
+        self._setup_shadow_routes()
+        self._setup_faq_routes()
+
+    @property
+    def router(self) -> APIRouter:
+        """Get the FastAPI router with registered routes."""
+        return self._router
+
+    def _authorize(self, request: Request) -> None:
+        """Reject requests without the admin token."""
+        token = request.headers.get(ADMIN_TOKEN_HEADER, "")
+        if not secrets.compare_digest(token.encode(), self._token.encode()):
+            raise HTTPException(status_code=401, detail="Invalid admin token")
+
+    def _setup_routes(self) -> None:
+        """Set up FastAPI routes for the variant collection."""
+
+        @self._router.get("/models")
+        async def list_models() -> dict[str, dict]:  # pyright: ignore [reportUnusedFunction]
+            """
+            List the variants with their weight and traffic statistics.
+
+            Returns:
+                dict[str, dict]: Per variant: model, weight, requests, errors,
+                    error rate, calls in flight and p50/p95 latency
+            """
+            return {"variants": self.registry.stats()}
+
+        @self._router.post("/models")
+        async def add_model(variant: VariantCreate) -> dict[str, dict]:  # pyright: ignore [reportUnusedFunction]
+            """
+            Add a variant serving another model.
+
+            Raises:
+                HTTPException: If the name is taken
+            """
+            try:
+                self.registry.add(variant.name, variant.model, variant.weight)
+            except ValueError as e:
+                raise HTTPException(status_code=409, detail=str(e)) from e
+            self.logger.info("variant_added", variant=variant.name, model=variant.model)
+            return {"variants": self.registry.stats()}
+
+        @self._router.put("/models/weights")
+        async def set_weights(split: TrafficSplit) -> dict[str, dict]:  # pyright: ignore [reportUnusedFunction]
+            """
+            Replace the traffic split between the variants.
+
+            Raises:
+                HTTPException: If a variant is unknown or the weights invalid
+            """
+            try:
+                self.registry.set_weights(split.weights)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e)) from e
+            self.logger.info("traffic_split_changed", weights=split.weights)
+            return {"variants": self.registry.stats()}
+
+    def _setup_variant_routes(self) -> None:
+        """Set up FastAPI routes acting on a single variant."""
+
+        @self._router.post("/models/{name}/swap")
+        async def swap_model(name: str) -> dict[str, dict]:  # pyright: ignore [reportUnusedFunction]
+            """
+            Send all traffic to one variant.
+
+            Raises:
+                HTTPException: If the variant is unknown
+            """
+            try:
+                self.registry.swap(name)
+            except ValueError as e:
+                raise HTTPException(status_code=404, detail=str(e)) from e
+            self.logger.info("traffic_swapped", variant=name)
+            return {"variants": self.registry.stats()}
+
+        @self._router.delete("/models/{name}")
+        async def remove_model(name: str) -> dict[str, dict]:  # pyright: ignore [reportUnusedFunction]
+            """
+            Remove a variant without traffic once its calls have finished.
+
+            Raises:
+                HTTPException: If the variant is unknown or still has traffic
+            """
+            try:
+                await self.registry.remove(name)
+            except KeyError as e:
+                raise HTTPException(status_code=404, detail=f"Unknown {name}") from e
+            except ValueError as e:
+                raise HTTPException(status_code=409, detail=str(e)) from e
+            self.logger.info("variant_removed", variant=name)
+            return {"variants": self.registry.stats()}
+
+    def _setup_shadow_routes(self) -> None:
+        """Set up FastAPI routes comparing the shadowed candidate."""
+
+        @self._router.get("/shadow")
+        async def shadow_calls(  # pyright: ignore [reportUnusedFunction]
+            limit: Annotated[int, Query(ge=1)] = 20,
+        ) -> dict[str, Any]:
+            """
+            Compare the shadowed candidate with production.
+
+            Args:
+                limit: Most recent mirrored calls to return side by side
+
+            Returns:
+                dict[str, Any]: Aggregate statistics and the recent calls
+
+            Raises:
+                HTTPException: If no candidate is shadowed
+            """
+            if self.shadow is None:
+                raise HTTPException(status_code=404, detail="No shadow model set")
+            return {
+                "stats": self.shadow.stats(),
+                "records": [asdict(r) for r in self.shadow.records(limit)],
+            }
+
+    def _setup_faq_routes(self) -> None:
+        """Set up FastAPI routes reporting the FAQ usage."""
+
+        @self._router.get("/faq")
+        async def faq_hits() -> dict[str, dict[str, int]]:  # pyright: ignore [reportUnusedFunction]
+            """
+            Report how often each FAQ entry answered a chat message.
+
+            Returns:
+                dict[str, dict[str, int]]: Hits per question, most asked
+                    first, and the messages that went to the model
+
+            Raises:
+                HTTPException: If the FAQ is disabled
+            """
+            if self.faq is None:
+                raise HTTPException(status_code=404, detail="FAQ disabled")
+            return {"hits": self.faq.stats()}
@@ -4,6 +4,15 @@ Chat Router Module
 This module implements the main chat routing system for the AI Agent API.
 It handles message routing, blockchain interactions, attestations, and AI responses.
 
+Each client gets its own conversation, identified by the `X-Session-ID` header
+or the `session_id` cookie (issued on the first request). Conversations live
+in a bounded ConversationStore: histories are capped by turns and estimated
+tokens, idle sessions are evicted least recently used first and can spill to
+disk, and requests of one session are serialized by a per-session lock.
+
+Every request runs under a deadline: generation still running when it passes
+is cancelled and the request is answered with 504 (or an `error` event).
+
 The module provides a ChatRouter class that integrates various services:
 - AI capabilities through GeminiProvider
 - Blockchain operations through FlareProvider
@@ -11,15 +20,40 @@ The module provides a ChatRouter class that integrates various services:
 - Prompt management through PromptService
 """
 
+import asyncio
+import json
+import secrets
+import time
+import weakref
+from collections.abc import AsyncGenerator, AsyncIterator
+from contextlib import aclosing
+
 import structlog
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 
-from flare_ai_social.ai import GeminiProvider
+from flare_ai_social.ai import (
+    BaseAIProvider,
+    ConversationStore,
+    DeadlineExceededError,
+    FAQIndex,
+    deadline,
+    retrieval_query,
+    traffic,
+)
 
 logger = structlog.get_logger(__name__)
 router = APIRouter()
 
+SESSION_HEADER = "X-Session-ID"
+SESSION_COOKIE = "session_id"
+# Longer client-supplied IDs are replaced with a fresh one
+MAX_SESSION_ID_LENGTH = 128
+
+# Disable caching and proxy buffering so events reach the client immediately
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
 
 class ChatMessage(BaseModel):
     """
@@ -41,21 +75,40 @@ class ChatRouter:
     conversation.
 
     Attributes:
-        ai (GenerativeModel): Provider for AI capabilities
+        ai (BaseAIProvider): Provider for AI capabilities
+        conversations (ConversationStore): Per-session conversation memory
+        reply_deadline (float | None): Seconds allowed to answer a message
     """
 
     def __init__(
         self,
-        ai: GeminiProvider,
+        ai: BaseAIProvider,
+        conversations: ConversationStore | None = None,
+        reply_deadline: float | None = 30.0,
+        faq: FAQIndex | None = None,
     ) -> None:
         """
         Initialize the ChatRouter with required service providers.
 
         Args:
             ai: Provider for AI capabilities
+            conversations: Per-session conversation memory. Defaults to an
+                           in-memory store without summarization.
+            reply_deadline: Seconds allowed to answer a message, None for no
+                            deadline
+            faq: Curated answers given instead of calling the model
         """
         self._router = APIRouter()
         self.ai = ai
+        self.reply_deadline = reply_deadline
+        self.faq = faq
+        self.conversations = (
+            conversations if conversations is not None else ConversationStore()
+        )
+        # Locks are dropped once no request of the session holds or awaits one
+        self._locks: weakref.WeakValueDictionary[str, asyncio.Lock] = (
+            weakref.WeakValueDictionary()
+        )
         self.logger = logger.bind(router="chat")
         self._setup_routes()
 
@@ -66,30 +119,71 @@ class ChatRouter:
         """
 
         @self._router.post("/")
-        async def chat(message: ChatMessage) -> dict[str, str]:  # pyright: ignore [reportUnusedFunction]
+        async def chat(  # pyright: ignore [reportUnusedFunction]
+            message: ChatMessage, request: Request, response: Response
+        ) -> dict[str, str]:
             """
             Process incoming chat messages and route them to appropriate handlers.
 
             Args:
                 message: Validated chat message
+                request: Incoming request carrying the session ID
+                response: Outgoing response the session ID is attached to
 
             Returns:
                 dict[str, str]: Response containing handled message result
 
             Raises:
-                HTTPException: If message handling fails
+                HTTPException: 504 if no answer was ready by the deadline, 500
+                    if message handling fails
             """
+            session_id = self.session_id(request)
+            _attach_session(response, session_id)
             try:
-                self.logger.debug("received_message", message=message.message)
+                self.logger.debug(
+                    "received_message", message=message.message, session=session_id
+                )
 
                 if message.message.startswith("/"):
-                    return await self.handle_command(message.message)
-                return await self.handle_conversation(message.message)
+                    return await self.handle_command(message.message, session_id)
+                return await self.handle_conversation(message.message, session_id)
 
+            except DeadlineExceededError as e:
+                raise HTTPException(status_code=504, detail=str(e)) from e
             except Exception as e:
                 self.logger.exception("message_handling_failed", error=str(e))
                 raise HTTPException(status_code=500, detail=str(e)) from e
 
+        @self._router.post("/stream")
+        async def chat_stream(  # pyright: ignore [reportUnusedFunction]
+            message: ChatMessage, request: Request
+        ) -> StreamingResponse:
+            """
+            Process a chat message and relay the response as server-sent events.
+
+            Each text chunk is sent as a `data` event holding `{"text": ...}`,
+            followed by a `done` event. Errors raised after the stream has
+            started are reported as an `error` event.
+
+            Args:
+                message: Validated chat message
+                request: Incoming request carrying the session ID
+
+            Returns:
+                StreamingResponse: `text/event-stream` response
+            """
+            session_id = self.session_id(request)
+            self.logger.debug(
+                "received_stream_message", message=message.message, session=session_id
+            )
+            response = StreamingResponse(
+                self.stream_events(message.message, session_id),
+                media_type="text/event-stream",
+                headers=SSE_HEADERS,
+            )
+            _attach_session(response, session_id)
+            return response
+
         @self._router.get("/ping")
         async def ping() -> dict[str, str]:  # pyright: ignore [reportUnusedFunction]
             """
@@ -105,30 +199,179 @@ class ChatRouter:
         """Get the FastAPI router with registered routes."""
         return self._router
 
-    async def handle_command(self, command: str) -> dict[str, str]:
+    def session_id(self, request: Request) -> str:
+        """
+        Return the session ID of a request, issuing a new one if missing.
+
+        Args:
+            request: Incoming request
+
+        Returns:
+            str: The `X-Session-ID` header, else the `session_id` cookie,
+                else a fresh random ID
+        """
+        session_id = request.headers.get(SESSION_HEADER) or request.cookies.get(
+            SESSION_COOKIE
+        )
+        if not session_id or len(session_id) > MAX_SESSION_ID_LENGTH:
+            session_id = secrets.token_urlsafe(16)
+        return session_id
+
+    def _lock(self, session_id: str) -> asyncio.Lock:
+        """Lock serializing the requests of a session."""
+        lock = self._locks.get(session_id)
+        if lock is None:
+            lock = self._locks[session_id] = asyncio.Lock()
+        return lock
+
+    async def handle_command(self, command: str, session_id: str) -> dict[str, str]:
         """
         Handle special command messages starting with '/'.
 
         Args:
             command: Command string to process
+            session_id: Session the command applies to
 
         Returns:
             dict[str, str]: Response containing command result
         """
         if command == "/reset":
-            self.ai.reset()
+            async with self._lock(session_id):
+                self.conversations.reset(session_id)
             return {"response": "Reset complete"}
         return {"response": "Unknown command"}
 
-    async def handle_conversation(self, message: str) -> dict[str, str]:
+    async def handle_conversation(
+        self, message: str, session_id: str
+    ) -> dict[str, str]:
         """
         Handle general conversation messages.
 
         Args:
             message: Message to process
+            session_id: Session whose history is used and extended
 
         Returns:
             dict[str, str]: Response from AI provider
+
+        Raises:
+            DeadlineExceededError: If no answer was ready by the deadline
         """
-        response = self.ai.send_message(message)
+        with traffic("api"), retrieval_query(message):
+            async with (
+                deadline(self.reply_deadline, "api.chat"),
+                self._lock(session_id),
+            ):
+                if (answer := self._faq_answer(message)) is not None:
+                    self.conversations.record(session_id, message, answer)
+                    return {"response": answer}
+                prompt = self.conversations.render(session_id, message)
+                response = await self.ai.agenerate_content(prompt)
+                self.conversations.record(session_id, message, response.text)
         return {"response": response.text}
+
+    def _faq_answer(self, message: str) -> str | None:
+        """Curated answer to the message, None if the model should answer."""
+        if self.faq is None:
+            return None
+        entry = self.faq.match(message)
+        return entry.answer if entry is not None else None
+
+    async def stream_events(self, message: str, session_id: str) -> AsyncIterator[str]:
+        """
+        Generate the server-sent events answering a chat message.
+
+        Args:
+            message: Message to process
+            session_id: Session whose history is used and extended
+
+        Yields:
+            str: Encoded server-sent events
+        """
+        try:
+            if message.startswith("/"):
+                result = await self.handle_command(message, session_id)
+                yield _sse({"text": result["response"]})
+            else:
+                with traffic("api"), retrieval_query(message):
+                    async with aclosing(
+                        self._stream_answer(message, session_id)
+                    ) as chunks:
+                        async for chunk in chunks:
+                            yield _sse({"text": chunk})
+        except Exception as e:
+            self.logger.exception("stream_handling_failed", error=str(e))
+            yield _sse({"detail": str(e)}, event="error")
+            return
+        yield _sse({}, event="done")
+
+    async def _stream_answer(
+        self, message: str, session_id: str
+    ) -> AsyncGenerator[str, None]:
+        """
+        Yield the answer to a message chunk by chunk within the reply deadline.
+
+        The deadline is armed only while the session lock is awaited and while
+        each chunk is produced, all sharing one budget. When it passes, the
+        generation is cancelled. Otherwise the cancellation could land in
+        the caller while it sends an earlier chunk.
+
+        Raises:
+            DeadlineExceededError: If the answer was not complete by the deadline
+        """
+        expires = (
+            None
+            if self.reply_deadline is None
+            else time.monotonic() + self.reply_deadline
+        )
+        lock = self._lock(session_id)
+        async with deadline(_seconds_left(expires), "api.stream"):
+            await lock.acquire()
+        try:
+            answer = self._faq_answer(message)
+            if answer is not None:
+                yield answer
+                self.conversations.record(session_id, message, answer)
+                return
+            prompt = self.conversations.render(session_id, message)
+            chunks: list[str] = []
+            stream = self.ai.stream_content(prompt)
+            try:
+                while True:
+                    async with deadline(_seconds_left(expires), "api.stream"):
+                        chunk = await anext(stream, None)
+                    if chunk is None:
+                        break
+                    chunks.append(chunk)
+                    yield chunk
+            finally:
+                aclose = getattr(stream, "aclose", None)
+                if aclose is not None:
+                    await aclose()
+            self.conversations.record(session_id, message, "".join(chunks))
+        finally:
+            lock.release()
+
+    async def aclose(self) -> None:
+        """Persist the sessions and release the provider's connections."""
+        await self.conversations.aclose()
+        aclose = getattr(self.ai, "aclose", None)
+        if aclose is not None:
+            await aclose()
+
+
+def _attach_session(response: Response, session_id: str) -> None:
+    """Echo the session ID as header and cookie so either kind of client keeps it."""
+    response.headers[SESSION_HEADER] = session_id
+    response.set_cookie(SESSION_COOKIE, session_id, httponly=True, samesite="lax")
+
+
+def _sse(data: dict[str, str], event: str | None = None) -> str:
+    """Encode a server-sent event."""
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+
+def _seconds_left(expires: float | None) -> float | None:
+    """Seconds until a `time.monotonic()` deadline, None without one."""
+    return None if expires is None else expires - time.monotonic()
@@ -1,16 +1,24 @@
 import asyncio
 import contextlib
 import threading
+import time
 
-import google.generativeai as genai
 import structlog
 from anyio import Event
-from google.api_core.exceptions import InvalidArgument, NotFound
 
-from flare_ai_social.ai import BaseAIProvider, GeminiProvider
-from flare_ai_social.prompts import FEW_SHOT_PROMPT
+from flare_ai_social.ai import (
+    BaseAIProvider,
+    ConversationStore,
+    FAQIndex,
+    ModelRegistry,
+    ProviderSummarizer,
+    RequestScheduler,
+    ShadowStore,
+    deadline_misses,
+)
+from flare_ai_social.providers import ProviderStack, build_faq, build_provider_stack
 from flare_ai_social.settings import settings
-from flare_ai_social.telegram import TelegramBot
+from flare_ai_social.telegram import MessageCache, TelegramBot
 from flare_ai_social.twitter import TwitterBot, TwitterConfig
 
 logger = structlog.get_logger(__name__)
@@ -18,6 +26,9 @@ logger = structlog.get_logger(__name__)
 # Error messages
 ERR_AI_PROVIDER_NOT_INITIALIZED = "AI provider must be initialized"
 
+# Seconds between logs of the scheduler, model variant, shadow and FAQ statistics
+STATS_INTERVAL = 60.0
+
 
 class BotManager:
     """Manager class for handling multiple social media bots."""
@@ -25,55 +36,34 @@ class BotManager:
     def __init__(self) -> None:
         """Initialize the BotManager."""
         self.ai_provider: BaseAIProvider | None = None
+        self.registry: ModelRegistry | None = None
+        self.scheduler: RequestScheduler | None = None
+        self.shadow: ShadowStore | None = None
+        self.faq: FAQIndex | None = None
         self.telegram_bot: TelegramBot | None = None
         self.twitter_thread: threading.Thread | None = None
         self.active_bots: list[str] = []
         self.running = False
+        self.owns_provider = True
         self._telegram_polling_task: asyncio.Task | None = None
-
-    def initialize_ai_provider(self) -> None:
-        """Initialize the AI provider with either tuned model or default model."""
-        genai.configure(api_key=settings.gemini_api_key)
-        tuned_model_id = settings.tuned_model_name
-
-        try:
-            # Check available tuned models
-            tuned_models = [m.name for m in genai.list_tuned_models()]
-            logger.info("Available tuned models", tuned_models=tuned_models)
-
-            # Try to get tuned model if it exists
-            if tuned_models and any(tuned_model_id in model for model in tuned_models):
-                try:
-                    model_info = genai.get_tuned_model(
-                        name=f"tunedModels/{tuned_model_id}"
-                    )
-                    # Initialize AI provider with tuned model
-                    self.ai_provider = GeminiProvider(
-                        settings.gemini_api_key,
-                        model_name=f"tunedModels/{tuned_model_id}",
-                        system_instruction=FEW_SHOT_PROMPT,
-                    )
-                    logger.info("Tuned model info", model_info=model_info)
-                except (InvalidArgument, NotFound):
-                    logger.warning("Failed to load tuned model.")
-                    self._initialize_default_model()
-            else:
-                logger.warning(
-                    "Tuned model not found in available models. Using default model."
-                )
-                self._initialize_default_model()
-        except Exception:
-            logger.exception("Error accessing tuned models")
-            self._initialize_default_model()
-
-    def _initialize_default_model(self) -> None:
-        """Initialize the default Gemini model."""
-        logger.info("Using default Gemini Flash model with few-shot prompting")
-        self.ai_provider = GeminiProvider(
-            settings.gemini_api_key,
-            model_name="gemini-1.5-flash",
-            system_instruction=FEW_SHOT_PROMPT,
-        )
+        self._monitor_task: asyncio.Task | None = None
+
+    def initialize_ai_provider(
+        self, stack: ProviderStack | None = None, faq: FAQIndex | None = None
+    ) -> None:
+        """
+        Build the AI provider stack, or use the API server's `stack` and `faq`
+        so its admin routes also manage the bots' model registry. A shared
+        stack is left open on shutdown for its owner to close.
+        """
+        self.owns_provider = stack is None
+        if stack is None:
+            stack = build_provider_stack()
+        self.ai_provider = stack.provider
+        self.registry = stack.registry
+        self.scheduler = stack.scheduler
+        self.shadow = stack.shadow
+        self.faq = build_faq() if faq is None else faq
 
     def _check_ai_provider_initialized(self) -> BaseAIProvider:
         """Check if AI provider is initialized and raise error if not."""
@@ -113,14 +103,19 @@ class BotManager:
                 access_token=settings.x_access_token,
                 access_secret=settings.x_access_token_secret,
                 rapidapi_key=settings.rapidapi_key or "",
+                rapidapi_keys=settings.rapidapi_keys,
+                rapidapi_requests_per_minute=settings.rapidapi_requests_per_minute,
                 rapidapi_host=settings.rapidapi_host,
                 accounts_to_monitor=settings.accounts_to_monitor,
                 polling_interval=settings.twitter_polling_interval,
+                reply_deadline=settings.twitter_reply_deadline,
+                delivery_deadline=settings.twitter_delivery_deadline,
             )
 
             twitter_bot = TwitterBot(
                 ai_provider=ai_provider,
                 config=config,
+                faq=self.faq,
             )
 
             self.twitter_thread = threading.Thread(
@@ -158,6 +153,26 @@ class BotManager:
                 api_token=settings.telegram_api_token,
                 allowed_user_ids=allowed_users,
                 polling_interval=settings.telegram_polling_interval,
+                stream_replies=settings.telegram_stream_replies,
+                stream_edit_interval=settings.telegram_stream_edit_interval,
+                concurrent_updates=settings.telegram_concurrent_updates,
+                reply_deadline=settings.telegram_reply_deadline,
+                faq=self.faq,
+                message_cache=MessageCache(
+                    per_chat=settings.telegram_message_cache_size,
+                    max_chats=settings.telegram_memory_max_chats,
+                ),
+                conversations=ConversationStore(
+                    max_conversations=settings.telegram_memory_max_chats,
+                    max_turns=settings.telegram_memory_max_turns,
+                    max_tokens=settings.telegram_memory_max_tokens,
+                    spill_dir=settings.telegram_memory_spill_dir,
+                    summarizer=(
+                        ProviderSummarizer(self.registry or ai_provider)
+                        if settings.telegram_memory_summarize
+                        else None
+                    ),
+                ),
             )
 
             await self.telegram_bot.initialize()
@@ -222,6 +237,7 @@ class BotManager:
     async def monitor_bots(self) -> None:
         """Monitor active bots and handle unexpected terminations."""
         self.running = True
+        next_stats = time.monotonic() + STATS_INTERVAL
 
         try:
             while self.running and self.active_bots:
@@ -231,6 +247,10 @@ class BotManager:
                 if "Twitter" in self.active_bots:
                     self._check_twitter_status()
 
+                if time.monotonic() >= next_stats:
+                    self._log_stats()
+                    next_stats += STATS_INTERVAL
+
                 if not self.active_bots:
                     logger.error("No active bots remaining")
                     break
@@ -242,6 +262,17 @@ class BotManager:
         finally:
             self.running = False
 
+    def _log_stats(self) -> None:
+        """Log the scheduler's queues, model, shadow and FAQ traffic."""
+        if self.scheduler is not None:
+            logger.info("Scheduler queues", **self.scheduler.stats())
+        if self.registry is not None:
+            logger.info("Model variants", **self.registry.stats())
+        if self.shadow is not None:
+            logger.info("Shadow traffic", **self.shadow.stats())
+        if self.faq is not None:
+            logger.info("FAQ hits", **self.faq.stats())
+
     async def shutdown(self) -> None:
         """Gracefully shutdown all active bots."""
         self.running = False
@@ -257,7 +288,34 @@ class BotManager:
             logger.info(
                 "Twitter bot daemon thread will terminate with main process")
 
-        logger.info("All bots shutdown completed")
+        aclose = getattr(self.ai_provider, "aclose", None)
+        if aclose is not None and self.owns_provider:
+            await aclose()
+
+        logger.info("All bots shutdown completed", deadline_misses=deadline_misses())
+
+    async def start_bots(self) -> bool:
+        """Start the enabled bots and their monitor; return whether any started."""
+        self.start_twitter_bot()
+        await self.start_telegram_bot()
+        if not self.active_bots:
+            logger.info(
+                "No bots active. Configure Twitter and/or Telegram credentials "
+                "and enable them in settings to activate social monitoring."
+            )
+            return False
+        logger.info("Active bots: %s", ", ".join(self.active_bots))
+        self._monitor_task = asyncio.create_task(self.monitor_bots())
+        return True
+
+    async def stop_bots(self) -> None:
+        """Stop the monitor and shut the bots down."""
+        if self._monitor_task is not None:
+            self._monitor_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._monitor_task
+            self._monitor_task = None
+        await self.shutdown()
 
 
 async def async_start() -> None:
@@ -270,27 +328,13 @@ async def async_start() -> None:
             logger.error("Failed to initialize AI provider")
             return
 
-        bot_manager.start_twitter_bot()
-        await bot_manager.start_telegram_bot()
-
-        if bot_manager.active_bots:
-            logger.info("Active bots: %s", ", ".join(bot_manager.active_bots))
-            monitor_task = asyncio.create_task(bot_manager.monitor_bots())
-
+        if await bot_manager.start_bots():
             try:
                 await Event().wait()
             except asyncio.CancelledError:
                 logger.info("Main task cancelled")
             finally:
-                monitor_task.cancel()
-                with contextlib.suppress(asyncio.CancelledError):
-                    await monitor_task
-                await bot_manager.shutdown()
-        else:
-            logger.info(
-                "No bots active. Configure Twitter and/or Telegram credentials "
-                "and enable them in settings to activate social monitoring."
-            )
+                await bot_manager.stop_bots()
     except KeyboardInterrupt:
         logger.info("Application stopped by user")
         await bot_manager.shutdown()
@@ -1,6 +1,15 @@
+import asyncio
+from typing import Any
+
 import structlog
 
-from flare_ai_social.ai import GeminiProvider
+from flare_ai_social.ai import (
+    BaseAIProvider,
+    BatchExecutor,
+    CachedProvider,
+    GeminiProvider,
+    ResponseCache,
+)
 from flare_ai_social.prompts import (
     CHAIN_OF_THOUGHT_PROMPT,
     FEW_SHOT_PROMPT,
@@ -19,14 +28,25 @@ TEST_PROMPTS = [
 ]
 
 
-def test_prompts(model: GeminiProvider, label: str) -> None:
-    for prompt in TEST_PROMPTS:
-        result = model.generate_content(prompt)
-        logger.info(label, prompt=prompt, result=result.text)
+async def test_prompts(
+    model: BaseAIProvider, label: str, executor_options: dict[str, Any]
+) -> None:
+    executor = BatchExecutor(model, **executor_options)
+    for result in await executor.arun(TEST_PROMPTS):
+        if result.response is not None:
+            logger.info(label, prompt=result.prompt, result=result.response.text)
+        else:
+            logger.error(label, prompt=result.prompt, error=str(result.error))
 
 
-def start() -> None:
+async def compare() -> None:
     tuned_model_id = settings.tuned_model_name
+    # Re-runs answer unchanged prompts from the persistent tier when configured
+    cache = ResponseCache(ttl=settings.ai_cache_ttl, db_path=settings.ai_cache_db_path)
+    executor_options: dict[str, Any] = {
+        "concurrency": settings.ai_batch_concurrency,
+        "requests_per_minute": settings.ai_batch_requests_per_minute or None,
+    }
 
     model_tuned = GeminiProvider(
         settings.gemini_api_key,
@@ -34,34 +54,54 @@ def start() -> None:
     )
     logger.info("tuned model info", model_info=model_tuned.model)
 
-    # Test tuned model
-    for prompt in TEST_PROMPTS:
-        result = model_tuned.generate_content(prompt)
-        logger.info("tuned_model", prompt=prompt, result=result.text)
-
     # Compare with zero-shot prompt
     model_zero_shot = GeminiProvider(
         settings.gemini_api_key,
         model_name="gemini-1.5-flash",
         system_instruction=ZERO_SHOT_PROMPT,
     )
-    test_prompts(model=model_zero_shot, label="zero-shot")
 
     # Compare with few-shot prompt
     model_few_shot = GeminiProvider(
         settings.gemini_api_key,
         model_name="gemini-1.5-flash",
         system_instruction=FEW_SHOT_PROMPT,
+        cache_system_instruction=settings.gemini_context_cache,
+        cache_ttl=settings.gemini_context_cache_ttl,
     )
-    test_prompts(model=model_few_shot, label="few-shot")
 
     # Compare with chain-of-thought prompt
     model_chain_of_thought = GeminiProvider(
         settings.gemini_api_key,
         model_name="gemini-1.5-flash",
         system_instruction=CHAIN_OF_THOUGHT_PROMPT,
+        cache_system_instruction=settings.gemini_context_cache,
+        cache_ttl=settings.gemini_context_cache_ttl,
+    )
+
+    models = {
+        "tuned_model": model_tuned,
+        "zero-shot": model_zero_shot,
+        "few-shot": model_few_shot,
+        "chain-of-thought": model_chain_of_thought,
+    }
+    # All models are queried concurrently, each within the batch limits
+    await asyncio.gather(
+        *(
+            test_prompts(CachedProvider(model, cache), label, executor_options)
+            for label, model in models.items()
+        )
     )
-    test_prompts(model=model_chain_of_thought, label="chain-of-thought")
+
+    logger.info("response cache", **cache.stats())
+    cache.close()
+    # Delete the cached system instructions instead of waiting for their TTL
+    for model in (model_few_shot, model_chain_of_thought):
+        await model.aclose()
+
+
+def start() -> None:
+    asyncio.run(compare())
 
     # To be done:
     # - X API integration
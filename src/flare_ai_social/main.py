@@ -17,7 +17,11 @@ import structlog
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from flare_ai_social import ChatRouter, GeminiProvider, start_bot_manager
+from flare_ai_social import ChatRouter, start_bot_manager
+from flare_ai_social.ai import ConversationStore, ProviderSummarizer
+from flare_ai_social.api import AdminRouter
+from flare_ai_social.bot_manager import BotManager
+from flare_ai_social.providers import build_faq, build_provider_stack
 from flare_ai_social.settings import settings
 
 logger = structlog.get_logger(__name__)
@@ -32,11 +36,14 @@ def create_app() -> FastAPI:
     1. Creates a new FastAPI instance
     2. Configures CORS middleware with settings from the configuration
     3. Initializes required service providers:
-       - GeminiProvider for AI capabilities
+       - The AI provider stack (see providers.py), shared with the bots
+         when they run in this process
        - FlareProvider for blockchain interactions
        - Vtpm for attestation services
        - PromptService for managing chat prompts
-    4. Sets up routing for chat endpoints
+    4. Sets up routing for chat endpoints, and for the model admin
+       endpoints if an admin token is configured
+    5. Starts the bots with the server if api_run_bots is set
 
     Returns:
         FastAPI: Configured FastAPI application instance
@@ -60,16 +67,46 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
 
-    # Initialize router with service providers
+    # The admin routes manage this stack's registry. Bots started by
+    # start_bot_manager build their own; set api_run_bots to share this one.
+    stack = build_provider_stack()
     chat = ChatRouter(
-        ai=GeminiProvider(
-            api_key=settings.gemini_api_key,
-            model_name=f"tunedModels/{settings.tuned_model_name}",
-        )
+        ai=stack.provider,
+        conversations=ConversationStore(
+            max_conversations=settings.chat_session_max_sessions,
+            max_turns=settings.chat_session_max_turns,
+            max_tokens=settings.chat_session_max_tokens,
+            spill_dir=settings.chat_session_spill_dir,
+            summarizer=(
+                ProviderSummarizer(stack.registry)
+                if settings.chat_session_summarize
+                else None
+            ),
+        ),
+        reply_deadline=settings.chat_deadline,
+        faq=build_faq(),
     )
 
     # Register chat routes with API
     app.include_router(chat.router, prefix="/api/routes/chat", tags=["chat"])
+    if settings.admin_api_token:
+        admin = AdminRouter(
+            stack.registry,
+            settings.admin_api_token,
+            shadow=stack.shadow,
+            faq=chat.faq,
+        )
+        app.include_router(admin.router, prefix="/api/routes/admin", tags=["admin"])
+    else:
+        logger.info("Admin routes disabled, no admin_api_token set")
+    if settings.api_run_bots:
+        bots = BotManager()
+        bots.initialize_ai_provider(stack, faq=chat.faq)
+        app.add_event_handler("startup", bots.start_bots)
+        # Registered first so the bots stop before the shared provider closes
+        app.add_event_handler("shutdown", bots.stop_bots)
+    # Persist the chat sessions and close provider connections when the server stops
+    app.add_event_handler("shutdown", chat.aclose)
     return app
 
 
@@ -1,3 +1,16 @@
-from .templates import CHAIN_OF_THOUGHT_PROMPT, FEW_SHOT_PROMPT, ZERO_SHOT_PROMPT
+from .selector import FewShotExample, FewShotSelector
+from .templates import (
+    CHAIN_OF_THOUGHT_PROMPT,
+    CONVERSATION_SUMMARY_PROMPT,
+    FEW_SHOT_PROMPT,
+    ZERO_SHOT_PROMPT,
+)
 
-__all__ = ["CHAIN_OF_THOUGHT_PROMPT", "FEW_SHOT_PROMPT", "ZERO_SHOT_PROMPT"]
+__all__ = [
+    "CHAIN_OF_THOUGHT_PROMPT",
+    "CONVERSATION_SUMMARY_PROMPT",
+    "FEW_SHOT_PROMPT",
+    "ZERO_SHOT_PROMPT",
+    "FewShotExample",
+    "FewShotSelector",
+]
@@ -0,0 +1,128 @@
+"""
+Few-Shot Example Selection
+
+Picks the training examples most relevant to an incoming prompt instead of
+sending the same hard-coded examples with every request. Examples are indexed
+once as L2-normalized TF-IDF vectors stored as an inverted index of NumPy
+posting arrays, so scoring a prompt only touches the postings of its own terms.
+"""
+
+import json
+import math
+import re
+from collections import Counter, defaultdict
+from collections.abc import Sequence
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+_TOKEN = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> list[str]:
+    """Split text into lowercase word tokens."""
+    return _TOKEN.findall(text.casefold())
+
+
+@dataclass(frozen=True, slots=True)
+class FewShotExample:
+    """An input and the response given to it"""
+
+    text_input: str
+    output: str
+
+
+class FewShotSelector:
+    """
+    TF-IDF nearest-neighbour selector over a set of examples.
+
+    Attributes:
+        examples (list[FewShotExample]): Indexed examples
+        k (int): Default number of examples returned by `select`
+    """
+
+    def __init__(self, examples: Sequence[FewShotExample], k: int = 3) -> None:
+        """
+        Index the examples.
+
+        Args:
+            examples: Examples to choose from
+            k: Default number of examples to select
+        """
+        self.examples = list(examples)
+        self.k = k
+        docs = [Counter(tokenize(example.text_input)) for example in self.examples]
+        doc_freq = Counter(term for doc in docs for term in doc)
+        n = len(docs)
+        self._idf = {
+            term: math.log((1 + n) / (1 + df)) + 1 for term, df in doc_freq.items()
+        }
+
+        postings: defaultdict[str, tuple[list[int], list[float]]] = defaultdict(
+            lambda: ([], [])
+        )
+        for doc_id, doc in enumerate(docs):
+            weights = {term: self._weight(term, count) for term, count in doc.items()}
+            norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+            for term, weight in weights.items():
+                ids, values = postings[term]
+                ids.append(doc_id)
+                values.append(weight / norm)
+        self._postings = {
+            term: (np.array(ids, dtype=np.int32), np.array(values, dtype=np.float32))
+            for term, (ids, values) in postings.items()
+        }
+
+    @classmethod
+    def from_json(cls, path: Path, k: int = 3) -> "FewShotSelector":
+        """Build a selector from a tuning dataset of text_input/output pairs."""
+        with path.open() as f:
+            data = json.load(f)
+        examples = [FewShotExample(item["text_input"], item["output"]) for item in data]
+        return cls(examples, k=k)
+
+    def _weight(self, term: str, count: int) -> float:
+        return (1 + math.log(count)) * self._idf[term]
+
+    def scores(self, prompt: str) -> np.ndarray:
+        """Return the cosine similarity of the prompt to every example."""
+        scores = np.zeros(len(self.examples), dtype=np.float32)
+        for term, count in Counter(tokenize(prompt)).items():
+            posting = self._postings.get(term)
+            if posting is not None:
+                ids, values = posting
+                scores[ids] += self._weight(term, count) * values
+        return scores
+
+    def select(self, prompt: str, k: int | None = None) -> list[FewShotExample]:
+        """
+        Select the examples most similar to a prompt.
+
+        Args:
+            prompt: Incoming prompt
+            k: Number of examples, defaults to `self.k`
+
+        Returns:
+            list[FewShotExample]: Up to k examples sharing terms with the
+                prompt, most similar first
+        """
+        k = min(self.k if k is None else k, len(self.examples))
+        if k <= 0:
+            return []
+        scores = self.scores(prompt)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [self.examples[i] for i in top if scores[i] > 0]
+
+
+def render_examples(examples: Sequence[FewShotExample]) -> str:
+    """Format examples in the layout used by FEW_SHOT_PROMPT."""
+    if not examples:
+        return ""
+    blocks = [
+        f'**Example {i}:**\n\n*Text Input:*\n"{example.text_input}"\n\n'
+        f'*Response:*\n"{example.output}"'
+        for i, example in enumerate(examples, start=1)
+    ]
+    return "Below are some examples of your style:\n\n" + "\n\n".join(blocks)
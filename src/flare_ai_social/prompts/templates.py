@@ -111,3 +111,16 @@ Input: "W/ all this talk about Dogecoin standard, how did you have the foresight
 5. Response: "DOGE is the original memecoin. Fiat is also a memecoin and therefore in the age of the internet DOGE is money."
 ```
 """
+
+CONVERSATION_SUMMARY_PROMPT: Final = """
+Update the running summary of a conversation between users and an assistant.
+Keep every fact, question and commitment that later messages may refer to, drop small talk, and write plain prose of at most {max_words} words.
+
+Current summary:
+{summary}
+
+Messages to fold into the summary:
+{transcript}
+
+Updated summary:
+"""
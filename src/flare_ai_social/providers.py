@@ -0,0 +1,298 @@
+"""
+Provider Stack Module
+
+Builds the AI provider stack from the settings. The API server and the bot
+manager both build their stack here, so they serve the same models with the
+same caching, failover and scheduling. The FAQ index both answer from before
+calling the stack is built here too.
+
+From the innermost layer outwards:
+
+1. ModelRegistry: the tuned model if it exists, else the default Gemini model;
+   more variants can be added and weighted at runtime (see the admin routes),
+   optionally shadowed by a candidate model receiving a sample of its prompts
+2. HedgedProvider: OpenRouter backup, if an OpenRouter key is set
+3. CascadeProvider: small model answering simple prompts first
+4. SchedulerProvider: priority and fair-share admission of model calls
+5. FewShotProvider, RetrievalProvider (passages from the local documentation
+   index), SemanticCacheProvider, CachedProvider
+"""
+
+from dataclasses import dataclass
+
+import google.generativeai as genai
+import structlog
+from google.api_core.exceptions import InvalidArgument, NotFound
+
+from flare_ai_social.ai import (
+    BaseAIProvider,
+    CachedProvider,
+    CascadePolicy,
+    CascadeProvider,
+    FAQIndex,
+    FewShotProvider,
+    GeminiEmbedder,
+    GeminiProvider,
+    HashingEmbedder,
+    HedgedProvider,
+    KeyPool,
+    ModelRegistry,
+    OpenRouterAIProvider,
+    RequestScheduler,
+    ResponseCache,
+    RetrievalProvider,
+    RoutedOpenRouterProvider,
+    SchedulerProvider,
+    SemanticCacheProvider,
+    ShadowProvider,
+    ShadowStore,
+    TransportConfig,
+    VectorIndex,
+)
+from flare_ai_social.prompts import (
+    FEW_SHOT_PROMPT,
+    ZERO_SHOT_PROMPT,
+    FewShotSelector,
+)
+from flare_ai_social.rag import PassageStore
+from flare_ai_social.rag.ingest import make_embedder
+from flare_ai_social.rag.store import PASSAGES_FILE
+from flare_ai_social.settings import settings
+
+logger = structlog.get_logger(__name__)
+
+# Model served when the tuned model is unavailable
+DEFAULT_MODEL = "gemini-1.5-flash"
+
+
+@dataclass
+class ProviderStack:
+    """The layers of the provider stack that are managed at runtime"""
+
+    provider: BaseAIProvider  # outermost layer, used for all traffic
+    registry: ModelRegistry
+    scheduler: RequestScheduler | None
+    shadow: ShadowStore | None = None
+
+
+def build_provider_stack() -> ProviderStack:
+    """Build the provider stack configured by the settings."""
+    registry = build_registry()
+    provider: BaseAIProvider = registry
+
+    # Mirrors only calls that reach a model, with the prompt the model gets
+    shadow = None
+    if settings.ai_shadow_model:
+        shadow = ShadowStore(
+            settings.ai_shadow_log_path, max_records=settings.ai_shadow_max_records
+        )
+        provider = ShadowProvider(
+            provider,
+            gemini_provider(settings.ai_shadow_model),
+            shadow,
+            sample_rate=settings.ai_shadow_sample_rate,
+            concurrency=settings.ai_shadow_concurrency,
+            timeout=settings.ai_request_timeout,
+        )
+        logger.info(
+            "Shadowing model traffic",
+            candidate=settings.ai_shadow_model,
+            sample_rate=settings.ai_shadow_sample_rate,
+        )
+
+    if settings.openrouter_api_key:
+        provider = HedgedProvider(
+            provider,
+            _openrouter_provider(),
+            quantile=settings.ai_hedge_quantile,
+            min_delay=settings.ai_hedge_min_delay,
+            max_delay=settings.ai_hedge_max_delay,
+            failure_threshold=settings.ai_breaker_failure_threshold,
+            reset_timeout=settings.ai_breaker_reset_timeout,
+        )
+
+    if settings.ai_cascade_model:
+        provider = CascadeProvider(
+            gemini_provider(settings.ai_cascade_model),
+            provider,
+            CascadePolicy(max_prompt_words=settings.ai_cascade_max_prompt_words),
+        )
+
+    # Below the caches, so only calls that reach a model take a slot
+    scheduler = None
+    if settings.ai_scheduler_max_concurrency:
+        scheduler = RequestScheduler(
+            max_concurrency=settings.ai_scheduler_max_concurrency,
+            max_queue=settings.ai_scheduler_max_queue,
+            stale_after=settings.ai_scheduler_stale_after,
+        )
+        provider = SchedulerProvider(provider, scheduler)
+
+    if settings.few_shot_selection:
+        provider = FewShotProvider(
+            provider,
+            FewShotSelector.from_json(
+                settings.few_shot_examples_path, k=settings.few_shot_k
+            ),
+        )
+
+    # Outside FewShotProvider, so passages are retrieved for the caller's prompt
+    if settings.rag_enabled:
+        provider = _retrieval_provider(provider)
+
+    if settings.ai_semantic_cache_enabled:
+        embedder = (
+            GeminiEmbedder()
+            if settings.ai_semantic_cache_embedder == "gemini"
+            else HashingEmbedder()
+        )
+        provider = SemanticCacheProvider(
+            provider,
+            embedder,
+            VectorIndex(
+                embedder.dim,
+                capacity=settings.ai_semantic_cache_max_entries,
+                path=settings.ai_semantic_cache_path,
+            ),
+            threshold=settings.ai_semantic_cache_threshold,
+            ttl=settings.ai_cache_ttl,
+        )
+
+    if settings.ai_cache_enabled:
+        provider = CachedProvider(
+            provider,
+            ResponseCache(
+                max_entries=settings.ai_cache_max_entries,
+                ttl=settings.ai_cache_ttl,
+                db_path=settings.ai_cache_db_path,
+            ),
+        )
+
+    return ProviderStack(provider, registry, scheduler, shadow)
+
+
+def build_registry() -> ModelRegistry:
+    """
+    Registry serving the tuned model, or the default model if it is missing.
+
+    Both are registered when the tuned model exists, so traffic can be moved
+    to the default model and back without a restart.
+    """
+    genai.configure(api_key=settings.gemini_api_key)
+    registry = ModelRegistry(factory=gemini_provider)
+    registry.register("default", gemini_provider(DEFAULT_MODEL))
+    tuned_model_id = settings.tuned_model_name
+
+    try:
+        # Check available tuned models
+        tuned_models = [m.name for m in genai.list_tuned_models()]
+        logger.info("Available tuned models", tuned_models=tuned_models)
+
+        # Try to get tuned model if it exists
+        if tuned_models and any(tuned_model_id in model for model in tuned_models):
+            try:
+                model_info = genai.get_tuned_model(name=f"tunedModels/{tuned_model_id}")
+                registry.register(
+                    "tuned", gemini_provider(f"tunedModels/{tuned_model_id}")
+                )
+                registry.swap("tuned")
+                logger.info("Tuned model info", model_info=model_info)
+            except (InvalidArgument, NotFound):
+                logger.warning("Failed to load tuned model.")
+        else:
+            logger.warning(
+                "Tuned model not found in available models. Using default model."
+            )
+    except Exception:
+        logger.exception("Error accessing tuned models")
+
+    if "tuned" not in registry.variants:
+        logger.info("Using default Gemini Flash model with few-shot prompting")
+        registry.swap("default")
+    return registry
+
+
+def build_faq() -> FAQIndex | None:
+    """FAQ index answering known questions, None when disabled."""
+    if not settings.faq_enabled:
+        return None
+    return FAQIndex.from_json(
+        settings.faq_path,
+        threshold=settings.faq_threshold,
+        max_words=settings.faq_max_words,
+    )
+
+
+def system_instruction() -> str:
+    """Persona-only prompt when examples are selected per request."""
+    return ZERO_SHOT_PROMPT if settings.few_shot_selection else FEW_SHOT_PROMPT
+
+
+def gemini_provider(model_name: str) -> GeminiProvider:
+    """Gemini provider configured from the settings."""
+    return GeminiProvider(
+        settings.gemini_api_key,
+        model_name=model_name,
+        system_instruction=system_instruction(),
+        timeout=settings.ai_request_timeout,
+        cache_system_instruction=settings.gemini_context_cache,
+        cache_ttl=settings.gemini_context_cache_ttl,
+        history_max_tokens=settings.gemini_history_max_tokens,
+        summarize_history=settings.gemini_history_summarize,
+        key_pool=_gemini_key_pool(),
+    )
+
+
+def _retrieval_provider(provider: BaseAIProvider) -> BaseAIProvider:
+    """Wrap a provider with passage retrieval if the index has been built."""
+    index_dir = settings.rag_index_dir
+    if not (index_dir / PASSAGES_FILE).exists():
+        logger.warning("No passage index, run start-ingest", path=str(index_dir))
+        return provider
+    store = PassageStore.load(index_dir, decode=not settings.rag_memory_map)
+    return RetrievalProvider(
+        provider,
+        store,
+        make_embedder(store.embedder, store.dim),
+        k=settings.rag_top_k,
+        min_score=settings.rag_min_score,
+    )
+
+
+def _gemini_key_pool() -> KeyPool | None:
+    """Pool of the Gemini API keys, None when a single key is configured."""
+    keys = [settings.gemini_api_key, *settings.gemini_api_keys]
+    if len({key for key in keys if key}) < 2:  # noqa: PLR2004
+        return None
+    return KeyPool(keys, settings.gemini_requests_per_minute)
+
+
+def _openrouter_provider() -> BaseAIProvider:
+    """OpenRouter backup provider, routed across models if several are set."""
+    if settings.openrouter_router_models:
+        return RoutedOpenRouterProvider(
+            settings.openrouter_api_key,
+            settings.openrouter_router_models,
+            system_instruction=system_instruction(),
+            timeout=settings.ai_request_timeout,
+            transport=_transport(),
+            refresh_interval=settings.openrouter_catalogue_refresh_interval,
+        )
+    return OpenRouterAIProvider(
+        settings.openrouter_api_key,
+        settings.openrouter_model,
+        system_instruction=system_instruction(),
+        timeout=settings.ai_request_timeout,
+        transport=_transport(),
+    )
+
+
+def _transport() -> TransportConfig:
+    """HTTP client configuration from the settings."""
+    return TransportConfig(
+        max_connections=settings.http_max_connections,
+        max_keepalive_connections=settings.http_max_keepalive_connections,
+        timeout=settings.http_timeout,
+        retries=settings.http_retries,
+        backoff=settings.http_retry_backoff,
+    )
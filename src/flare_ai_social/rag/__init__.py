@@ -0,0 +1,10 @@
+from .chunking import chunk_text, document_title, iter_documents
+from .store import Passage, PassageStore
+
+__all__ = [
+    "Passage",
+    "PassageStore",
+    "chunk_text",
+    "document_title",
+    "iter_documents",
+]
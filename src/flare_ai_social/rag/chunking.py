@@ -0,0 +1,70 @@
+"""
+Document Chunking
+
+Splits documentation files into passages small enough to embed and to quote
+in a prompt. Passages are packed from whole paragraphs where possible and
+overlap by a few words, so a sentence cut at a passage boundary still appears
+whole in one of them.
+"""
+
+import re
+from collections.abc import Iterator
+from pathlib import Path
+
+# Files read from the documentation corpus
+DOC_SUFFIXES = frozenset({".md", ".mdx", ".rst", ".txt"})
+
+_PARAGRAPH = re.compile(r"\n\s*\n")
+_HEADING = re.compile(r"^#\s+(.+)$", re.MULTILINE)
+_FRONT_MATTER = re.compile(r"\A---\n.*?\n---\n", re.DOTALL)
+
+
+def chunk_text(text: str, max_words: int = 200, overlap: int = 40) -> list[str]:
+    """
+    Split text into passages of at most `max_words` words.
+
+    Args:
+        text: Document text
+        max_words: Maximum words per passage
+        overlap: Words repeated from the end of a passage at the start of
+            the next one
+
+    Returns:
+        list[str]: Passages in document order
+
+    Raises:
+        ValueError: If the overlap is not smaller than the passage size
+    """
+    if not 0 <= overlap < max_words:
+        msg = "overlap must be non-negative and smaller than max_words"
+        raise ValueError(msg)
+    chunks: list[str] = []
+    current: list[str] = []
+    for paragraph in _PARAGRAPH.split(text):
+        words = paragraph.split()
+        if not words:
+            continue
+        if len(current) > overlap and len(current) + len(words) > max_words:
+            chunks.append(" ".join(current))
+            current = current[len(current) - overlap :]
+        current.extend(words)
+        while len(current) > max_words:
+            chunks.append(" ".join(current[:max_words]))
+            current = current[max_words - overlap :]
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+def document_title(path: Path, text: str) -> str:
+    """First top-level Markdown heading of a document, else its file name."""
+    match = _HEADING.search(text)
+    return match.group(1).strip() if match else path.stem.replace("-", " ")
+
+
+def iter_documents(root: Path) -> Iterator[tuple[Path, str]]:
+    """Yield the path and text of every documentation file under `root`."""
+    for path in sorted(root.rglob("*")):
+        if path.is_file() and path.suffix in DOC_SUFFIXES:
+            text = path.read_text(encoding="utf-8", errors="replace")
+            yield path, _FRONT_MATTER.sub("", text)
@@ -0,0 +1,106 @@
+"""
+Documentation Ingestion
+
+Offline step of the retrieval pipeline: reads a local documentation corpus,
+splits it into passages, embeds them and writes the passage store the
+RetrievalProvider searches at request time. Run it whenever the corpus
+changes:
+
+    RAG_DOCS_DIR=path/to/docs uv run start-ingest
+"""
+
+from pathlib import Path
+
+import google.generativeai as genai
+import numpy as np
+import structlog
+
+from flare_ai_social.ai.semantic_cache import Embedder, GeminiEmbedder, HashingEmbedder
+from flare_ai_social.rag.chunking import chunk_text, document_title, iter_documents
+from flare_ai_social.rag.store import Passage, PassageStore
+from flare_ai_social.settings import settings
+
+logger = structlog.get_logger(__name__)
+
+# Passages embedded per call (the Gemini API takes at most 100)
+EMBED_BATCH_SIZE = 100
+
+
+def make_embedder(name: str, dim: int | None = None) -> Embedder:
+    """Embedder called `name` ("gemini" or "hashing")."""
+    if name == "gemini":
+        return GeminiEmbedder() if dim is None else GeminiEmbedder(dim=dim)
+    return HashingEmbedder() if dim is None else HashingEmbedder(dim)
+
+
+def build_store(
+    root: Path,
+    embedder: Embedder,
+    embedder_name: str,
+    max_words: int = 200,
+    overlap: int = 40,
+) -> PassageStore:
+    """
+    Chunk and embed every documentation file under `root`.
+
+    Args:
+        root: Directory of the documentation corpus
+        embedder: Embedder of the passages
+        embedder_name: Name the embedder is recreated by at query time
+        max_words: Maximum words per passage
+        overlap: Words shared by consecutive passages of a document
+
+    Returns:
+        PassageStore: In-memory store, to be saved to an index directory
+
+    Raises:
+        ValueError: If the corpus holds no text
+    """
+    passages: list[Passage] = []
+    for path, text in iter_documents(root):
+        source = path.relative_to(root).as_posix()
+        title = document_title(path, text)
+        passages.extend(
+            Passage(source, title, chunk)
+            for chunk in chunk_text(text, max_words, overlap)
+        )
+    if not passages:
+        msg = f"No documentation found under {root}"
+        raise ValueError(msg)
+
+    vectors = np.empty((len(passages), embedder.dim), dtype=np.float16)
+    for start in range(0, len(passages), EMBED_BATCH_SIZE):
+        batch = passages[start : start + EMBED_BATCH_SIZE]
+        # The title gives a passage cut from the middle of a page its topic
+        vectors[start : start + len(batch)] = embedder.embed(
+            [f"{passage.title}\n{passage.text}" for passage in batch]
+        )
+        logger.info("Embedded passages", done=start + len(batch), total=len(passages))
+    return PassageStore(vectors, passages, embedder_name)
+
+
+def start() -> None:
+    """Build the passage store configured by the settings."""
+    if settings.rag_docs_dir is None:
+        msg = "Set RAG_DOCS_DIR to the documentation directory to ingest"
+        raise ValueError(msg)
+    genai.configure(api_key=settings.gemini_api_key)
+    embedder = make_embedder(settings.rag_embedder)
+    store = build_store(
+        settings.rag_docs_dir,
+        embedder,
+        settings.rag_embedder,
+        max_words=settings.rag_chunk_words,
+        overlap=settings.rag_chunk_overlap,
+    )
+    store.save(settings.rag_index_dir)
+    logger.info(
+        "Passage store written",
+        passages=len(store),
+        size_bytes=store.vectors.nbytes,
+        path=str(settings.rag_index_dir),
+    )
+
+
+if __name__ == "__main__":
+    start()
@@ -0,0 +1,181 @@
+"""
+Passage Store
+
+Read-only vector store of documentation passages built by the ingestion CLI
+(see `ingest.py`). An index directory holds two files:
+
+- `vectors-<id>.npy`: `(passages, dim)` float16 matrix of L2-normalized
+  embeddings, half the size of float32 and memory-mapped when loaded
+- `passages.json`: the name of that matrix file, the embedder the vectors
+  were built with and the source, title and text of every passage, in
+  matrix row order
+
+Every save writes a new matrix file and then renames `passages.json` over
+the old one, so the rename switches both files at once and a loading
+process sees either the old index or the new one, never a mix.
+
+Search is brute-force cosine similarity, scored in float32. By default the
+matrix is decoded to float32 once at load, because NumPy's float16 to
+float32 conversion costs about ten times the dot product: 20k passages of
+512 dimensions are searched in about 2 ms decoded, against about 20 ms when
+each search decodes the memory-mapped rows block by block. Large corpora can
+stay memory-mapped (`decode=False`) so only the pages a search touches are
+held in memory.
+"""
+
+import json
+import uuid
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+# Matrix file of indexes that do not name one in passages.json
+VECTORS_FILE = "vectors.npy"
+PASSAGES_FILE = "passages.json"
+
+# Rows scored at a time (and decoded to float32 first if memory-mapped)
+_BLOCK_ROWS = 4096
+
+
+@dataclass(frozen=True, slots=True)
+class Passage:
+    """A chunk of a documentation file"""
+
+    source: str
+    title: str
+    text: str
+
+
+class PassageStore:
+    """
+    Embedding matrix with the passages it indexes.
+
+    Attributes:
+        passages (list[Passage]): Passages in matrix row order
+        embedder (str): Name of the embedder the vectors were built with
+        dim (int): Vector dimension
+    """
+
+    def __init__(
+        self, vectors: np.ndarray, passages: list[Passage], embedder: str
+    ) -> None:
+        """
+        Initialize the store.
+
+        Args:
+            vectors: `(len(passages), dim)` matrix of normalized embeddings
+            passages: Passages in matrix row order
+            embedder: Name of the embedder the vectors were built with
+
+        Raises:
+            ValueError: If the matrix and passages do not line up
+        """
+        if vectors.ndim != 2 or len(vectors) != len(passages):  # noqa: PLR2004
+            msg = "Expected one vector per passage"
+            raise ValueError(msg)
+        self.vectors = vectors
+        self.passages = passages
+        self.embedder = embedder
+        self.dim = int(vectors.shape[1])
+
+    def __len__(self) -> int:
+        return len(self.passages)
+
+    @classmethod
+    def load(cls, directory: Path, *, decode: bool = True) -> "PassageStore":
+        """
+        Open an index directory written by `save`.
+
+        Args:
+            directory: Index directory
+            decode: Decode the memory-mapped float16 matrix to float32 in
+                memory for faster search
+        """
+        try:
+            data, vectors = _read_index(directory)
+        except FileNotFoundError:
+            # A save replaced the index and removed its matrix between the reads
+            data, vectors = _read_index(directory)
+        if decode:
+            vectors = np.asarray(vectors, dtype=np.float32)
+        passages = [Passage(**item) for item in data["passages"]]
+        logger.info(
+            "Passage store loaded",
+            passages=len(passages),
+            embedder=data["embedder"],
+            path=str(directory),
+        )
+        return cls(vectors, passages, data["embedder"])
+
+    def save(self, directory: Path) -> None:
+        """
+        Write the store to an index directory.
+
+        The matrix goes to a new file and the passages next to the old ones;
+        renaming the passages over the old ones then switches the index, and
+        the old matrix is removed.
+        """
+        directory.mkdir(parents=True, exist_ok=True)
+        vectors_file = f"vectors-{uuid.uuid4().hex}.npy"
+        passages_tmp = directory / f"{PASSAGES_FILE}.tmp"
+        matrix = np.lib.format.open_memmap(
+            directory / vectors_file,
+            mode="w+",
+            dtype=np.float16,
+            shape=self.vectors.shape,
+        )
+        matrix[:] = self.vectors
+        matrix.flush()
+        del matrix
+        with passages_tmp.open("w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "vectors": vectors_file,
+                    "embedder": self.embedder,
+                    "dim": self.dim,
+                    "passages": [asdict(passage) for passage in self.passages],
+                },
+                f,
+            )
+        passages_tmp.replace(directory / PASSAGES_FILE)
+        for stale in directory.glob("vectors*.npy"):
+            if stale.name != vectors_file:
+                stale.unlink(missing_ok=True)
+
+    def search(self, query: np.ndarray, k: int = 3) -> list[tuple[Passage, float]]:
+        """
+        Find the passages most similar to a normalized query vector.
+
+        Args:
+            query: `(dim,)` or `(1, dim)` normalized query embedding
+            k: Number of passages returned
+
+        Returns:
+            list[tuple[Passage, float]]: Passages and their cosine
+                similarity, most similar first
+        """
+        n = len(self)
+        if not n or k <= 0:
+            return []
+        q = np.asarray(query, dtype=np.float32).reshape(-1)
+        scores = np.empty(n, dtype=np.float32)
+        for start in range(0, n, _BLOCK_ROWS):
+            block = np.asarray(self.vectors[start : start + _BLOCK_ROWS], np.float32)
+            scores[start : start + len(block)] = block @ q
+        k = min(k, n)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(self.passages[i], float(scores[i])) for i in top]
+
+
+def _read_index(directory: Path) -> tuple[dict[str, Any], np.ndarray]:
+    """Read the passages file and memory-map the matrix it names."""
+    with (directory / PASSAGES_FILE).open(encoding="utf-8") as f:
+        data = json.load(f)
+    vectors_file = data.get("vectors", VECTORS_FILE)
+    return data, np.load(directory / vectors_file, mmap_mode="r")
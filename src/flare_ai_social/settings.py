@@ -13,6 +13,11 @@ class Settings(BaseSettings):
 
     # API key for accessing Google's Gemini AI service
     gemini_api_key: str = ""
+    # Additional Gemini API keys requests are spread over by remaining quota
+    # (JSON list, e.g. '["key2", "key3"]')
+    gemini_api_keys: list[str] = []
+    # Per-key Gemini request quota per minute (0 to rely on 429s only)
+    gemini_requests_per_minute: float = 0.0
     # Name of the new tuned model
     tuned_model_name: str = ""
     # Base model to tune upon
@@ -27,6 +32,151 @@ class Settings(BaseSettings):
     tuning_batch_size: int = 4
     # Learning rate
     tuning_learning_rate: float = 0.001
+    # OpenRouter API key; when set, an OpenRouter model backs up Gemini
+    openrouter_api_key: str = ""
+    # OpenRouter model used for hedged requests and failover
+    openrouter_model: str = "openai/gpt-4o-mini"
+    # OpenRouter models to route between by live latency, replacing
+    # openrouter_model when set (JSON list, e.g. '["openai/gpt-4o-mini"]')
+    openrouter_router_models: list[str] = []
+    # Seconds between refreshes of the OpenRouter model catalogue
+    openrouter_catalogue_refresh_interval: float = 3600.0
+    # HTTP clients of the OpenRouter API: pooled connections, retries of
+    # connection errors, 429 and 5xx responses, and default request deadline
+    http_max_connections: int = 100
+    http_max_keepalive_connections: int = 20
+    http_retries: int = 3
+    http_retry_backoff: float = 0.5
+    http_timeout: float = 30.0
+    # Latency quantile of Gemini after which a hedge is sent to OpenRouter
+    ai_hedge_quantile: float = 0.95
+    # Bounds in seconds of the hedge delay
+    ai_hedge_min_delay: float = 1.0
+    ai_hedge_max_delay: float = 10.0
+    # Consecutive failures after which a provider is skipped
+    ai_breaker_failure_threshold: int = 5
+    # Seconds a failing provider is skipped before it is tried again
+    ai_breaker_reset_timeout: float = 30.0
+    # Small model answering simple one-shot prompts before escalating to the
+    # tuned model, e.g. "gemini-1.5-flash-8b" (cascade disabled if empty).
+    # Chat and streamed replies always come from the tuned model
+    ai_cascade_model: str = ""
+    # Prompts longer than this many words go straight to the tuned model
+    ai_cascade_max_prompt_words: int = 40
+    # Pick the most relevant training examples per prompt instead of the fixed
+    # examples in FEW_SHOT_PROMPT
+    few_shot_selection: bool = True
+    # Examples to choose from
+    few_shot_examples_path: Path = (
+        Path(__file__).parent.parent / "data" / "training_data.json"
+    )
+    # Examples added to each prompt
+    few_shot_k: int = 3
+
+    # Answer frequently asked questions from a curated list without calling
+    # the model
+    faq_enabled: bool = True
+    # Curated questions, their aliases and answers
+    faq_path: Path = Path(__file__).parent.parent / "data" / "faq.json"
+    # Minimum share of content words a message must have in common with a
+    # FAQ question (Jaccard) to be answered from it
+    faq_threshold: float = 0.7
+    # Messages with more words than this always go to the model
+    faq_max_words: int = 20
+
+    # Prefix prompts with passages retrieved from the local documentation
+    # index built by `start-ingest`
+    rag_enabled: bool = False
+    # Directory of the documentation corpus read by `start-ingest`
+    rag_docs_dir: Path | None = None
+    # Directory of the passage index (passages.json and its vectors-*.npy matrix)
+    rag_index_dir: Path = Path(__file__).parent.parent / "data" / "rag"
+    # Search the float16 vectors memory-mapped instead of decoding them to
+    # float32 at startup: less memory, roughly ten times slower search
+    rag_memory_map: bool = False
+    # "hashing" for the local embedder or "gemini" for the embedding API;
+    # queries are embedded with the embedder the index was built with
+    rag_embedder: str = "hashing"
+    # Maximum words per passage and words shared by consecutive passages
+    rag_chunk_words: int = 200
+    rag_chunk_overlap: int = 40
+    # Passages added to a prompt and their minimum cosine similarity
+    rag_top_k: int = 3
+    rag_min_score: float = 0.2
+
+    # Seconds to wait for a single async model call before giving up
+    ai_request_timeout: float = 60.0
+    # Requests in flight per model in batch runs (compare, evaluations)
+    ai_batch_concurrency: int = 8
+    # Request rate cap per model in batch runs (unlimited if 0)
+    ai_batch_requests_per_minute: float = 60.0
+    # Send large system instructions as Gemini cached content. Off by default:
+    # prompts below the model's minimum cacheable size are rejected by the API
+    gemini_context_cache: bool = False
+    # Lifetime in seconds of the cached system instruction, renewed while in use
+    gemini_context_cache_ttl: float = 3600.0
+    # Estimated token budget of Gemini chat sessions (unbounded if 0). Only
+    # send_message and friends keep a chat session; the bots and the chat API
+    # send each prompt with its own history through generate_content
+    gemini_history_max_tokens: int = 8000
+    # Replace turns dropped from a chat history with a background summary
+    gemini_history_summarize: bool = True
+    # Cache one-shot generations so repeated prompts skip the model
+    ai_cache_enabled: bool = True
+    # Responses kept in memory by the cache
+    ai_cache_max_entries: int = 1024
+    # Seconds a cached response stays valid
+    ai_cache_ttl: float = 3600.0
+    # SQLite file persisting cached responses across restarts (memory only if unset)
+    ai_cache_db_path: Path | None = None
+    # Answer paraphrases of earlier one-shot prompts from a vector index
+    ai_semantic_cache_enabled: bool = False
+    # Minimum cosine similarity for a paraphrase to reuse a cached answer
+    ai_semantic_cache_threshold: float = 0.9
+    # Prompts kept in the vector index before the least recently used is evicted
+    ai_semantic_cache_max_entries: int = 4096
+    # "hashing" for the local embedder or "gemini" for the embedding API
+    ai_semantic_cache_embedder: str = "hashing"
+    # File memory-mapping the vector index across restarts (memory only if unset)
+    ai_semantic_cache_path: Path | None = None
+
+    # Provider calls running at once across all traffic sources (0 disables
+    # scheduling); further calls queue by priority, fair share and deadline
+    ai_scheduler_max_concurrency: int = 16
+    # Calls allowed to wait; beyond that the lowest-priority one is shed
+    ai_scheduler_max_queue: int = 256
+    # Seconds a non-interactive call may wait while saturated before it is shed
+    ai_scheduler_stale_after: float = 30.0
+
+    # Candidate model mirrored a sample of live prompts for comparison with
+    # the production model, e.g. "tunedModels/<id>" (disabled if empty)
+    ai_shadow_model: str = ""
+    # Fraction of one-shot prompts mirrored to the candidate
+    ai_shadow_sample_rate: float = 0.05
+    # Mirrored calls running at once; samples beyond that are dropped
+    ai_shadow_concurrency: int = 2
+    # Mirrored calls kept in memory for /api/routes/admin/shadow
+    ai_shadow_max_records: int = 500
+    # Optional JSON Lines file every mirrored call is appended to
+    ai_shadow_log_path: Path | None = None
+
+    # Secret for the model admin routes (/api/routes/admin); disabled if empty
+    admin_api_token: str = ""
+    # Run the bots inside the API server process, sharing its provider stack so
+    # the admin routes also control the model variants the bots use
+    api_run_bots: bool = False
+
+    # Web chat sessions: sessions kept in memory (LRU), turns and estimated
+    # tokens of history kept per session
+    chat_session_max_sessions: int = 1000
+    chat_session_max_turns: int = 20
+    chat_session_max_tokens: int = 2000
+    # Optional directory where idle sessions evicted from memory are persisted
+    chat_session_spill_dir: Path | None = None
+    # Fold turns that fall out of a session's history into a running summary
+    chat_session_summarize: bool = True
+    # Seconds a chat API request may take before it is answered with 504
+    chat_deadline: float = 30.0
 
     # Twitter Bot settings
     enable_twitter: bool = True  # Enable Twitter bot
@@ -39,6 +189,10 @@ class Settings(BaseSettings):
 
     # RapidAPI configuration for X/Twitter search (required for the TwitterBot)
     rapidapi_key: str = ""
+    # Additional RapidAPI keys the search quota is spread over (JSON list)
+    rapidapi_keys: list[str] = []
+    # Per-key RapidAPI quota per minute assumed until the API reports its own
+    rapidapi_requests_per_minute: float = 0.0
     rapidapi_host: str = "twitter241.p.rapidapi.com"
 
     # Twitter accounts to monitor (comma-separated list with @ symbols)
@@ -46,6 +200,10 @@ class Settings(BaseSettings):
 
     # Twitter monitoring interval in seconds
     twitter_polling_interval: int = 60
+    # Seconds allowed to generate a mention's reply before the fallback is sent
+    twitter_reply_deadline: float = 45.0
+    # Seconds allowed to post a reply, retries included
+    twitter_delivery_deadline: float = 30.0
 
     # Telegram Bot settings
     enable_telegram: bool = True  # Enable Telegram bot
@@ -54,6 +212,25 @@ class Settings(BaseSettings):
         ""  # Comma-separated list of allowed user IDs (optional)
     )
     telegram_polling_interval: int = 5  # Seconds between checking for updates
+    # Updates handled concurrently (identical concurrent questions are coalesced)
+    telegram_concurrent_updates: int = 64
+    # Stream replies into Telegram via message edits as tokens are generated
+    telegram_stream_replies: bool = True
+    # Minimum seconds between edits of a streamed reply (3s floor in groups)
+    telegram_stream_edit_interval: float = 1.0
+    # Per-chat conversation memory: chats kept in memory (LRU), turns and
+    # estimated tokens of context kept per chat
+    telegram_memory_max_chats: int = 1000
+    telegram_memory_max_turns: int = 20
+    telegram_memory_max_tokens: int = 2000
+    # Optional directory where chats evicted from memory are spilled to disk
+    telegram_memory_spill_dir: Path | None = None
+    # Fold turns that fall out of the context window into a running summary
+    telegram_memory_summarize: bool = True
+    # Recent messages cached per chat to rebuild reply chains as context
+    telegram_message_cache_size: int = 200
+    # Seconds allowed to answer a message before the fallback reply is sent
+    telegram_reply_deadline: float = 30.0
 
     financialmodeling_api_key: str = ""
 
@@ -95,6 +272,8 @@ logger.debug(
     "settings",
     settings=settings.model_dump(
         exclude={"x_api_key_secret",
-                 "x_access_token_secret", "telegram_api_token"}
+                 "x_access_token_secret", "telegram_api_token",
+                 "admin_api_token", "gemini_api_keys", "rapidapi_keys",
+                 "openrouter_api_key"}
     ),
 )
@@ -1,3 +1,4 @@
+from .message_cache import MessageCache
 from .service import TelegramBot
 
-__all__ = ["TelegramBot"]
+__all__ = ["MessageCache", "TelegramBot"]
@@ -0,0 +1,178 @@
+"""
+Recent Message Cache
+
+Keeps a fixed-size ring buffer of recent messages per chat so reply chains can
+be rebuilt locally instead of fetched from Telegram. Records are compact
+slotted dataclasses holding only what is needed to render a thread; the ring
+overwrites the oldest record once full and chats are evicted least recently
+used first.
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from telegram import Message
+
+ERR_CAPACITY = "A chat must cache at least one message"
+
+
+@dataclass(slots=True, frozen=True)
+class CachedMessage:
+    """A message as needed to rebuild reply chains"""
+
+    message_id: int
+    author: str
+    text: str
+    reply_to_id: int | None
+    from_bot: bool
+
+
+class ChatRing:
+    """Fixed-capacity ring buffer of messages in one chat, indexed by ID."""
+
+    __slots__ = ("_index", "_next", "_records")
+
+    def __init__(self, capacity: int) -> None:
+        """
+        Initialize the ring.
+
+        Raises:
+            ValueError: If the capacity is less than one
+        """
+        if capacity < 1:
+            raise ValueError(ERR_CAPACITY)
+        self._records: list[CachedMessage | None] = [None] * capacity
+        self._index: dict[int, int] = {}
+        self._next = 0
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def add(self, record: CachedMessage) -> None:
+        """Store a record, overwriting the oldest one when full."""
+        slot = self._index.get(record.message_id)
+        if slot is None:
+            slot = self._next
+            self._next = (self._next + 1) % len(self._records)
+            old = self._records[slot]
+            if old is not None:
+                del self._index[old.message_id]
+            self._index[record.message_id] = slot
+        self._records[slot] = record
+
+    def get(self, message_id: int) -> CachedMessage | None:
+        """Return the record for a message ID if it is still cached."""
+        slot = self._index.get(message_id)
+        return None if slot is None else self._records[slot]
+
+
+class MessageCache:
+    """
+    Per-chat ring buffers of recent messages.
+
+    Attributes:
+        per_chat (int): Messages kept per chat
+        max_chats (int): Chats kept before the least recently used is evicted
+        bot_id (int | None): ID of this bot, used to label its messages
+    """
+
+    def __init__(self, per_chat: int = 200, max_chats: int = 1000) -> None:
+        """
+        Initialize the cache.
+
+        Raises:
+            ValueError: If fewer than one message per chat would be kept
+        """
+        if per_chat < 1:
+            raise ValueError(ERR_CAPACITY)
+        self.per_chat = per_chat
+        self.max_chats = max_chats
+        self.bot_id: int | None = None
+        self._chats: OrderedDict[int, ChatRing] = OrderedDict()
+
+    def _ring(self, chat_id: int) -> ChatRing:
+        ring = self._chats.get(chat_id)
+        if ring is None:
+            ring = self._chats[chat_id] = ChatRing(self.per_chat)
+            if len(self._chats) > self.max_chats:
+                self._chats.popitem(last=False)
+        else:
+            self._chats.move_to_end(chat_id)
+        return ring
+
+    def add(
+        self,
+        message: Message,
+        text: str | None = None,
+        *,
+        from_bot: bool = False,
+    ) -> None:
+        """
+        Cache a message and the message it replies to.
+
+        Args:
+            message: Received or sent message
+            text: Text to store instead of `message.text`, e.g. the final text
+                of a reply that was edited while streaming
+            from_bot: Whether the message was sent by this bot
+        """
+        ring = self._ring(message.chat_id)
+        parent = message.reply_to_message
+        if parent is not None and parent.text and ring.get(parent.message_id) is None:
+            parent_from_bot = bool(
+                parent.from_user and parent.from_user.id == self.bot_id
+            )
+            ring.add(_record(parent, parent.text, from_bot=parent_from_bot))
+        text = text if text is not None else message.text
+        if text:
+            ring.add(_record(message, text, from_bot=from_bot))
+
+    def chain(
+        self, chat_id: int, message_id: int, max_depth: int = 10
+    ) -> list[CachedMessage]:
+        """
+        Rebuild the reply chain leading to a message.
+
+        Args:
+            chat_id: Chat the message belongs to
+            message_id: Message whose ancestors are wanted
+            max_depth: Maximum number of ancestors returned
+
+        Returns:
+            list[CachedMessage]: Cached ancestors, oldest first, stopping at
+                the first message that is not cached
+        """
+        ring = self._chats.get(chat_id)
+        if ring is None:
+            return []
+        current = ring.get(message_id)
+        chain: list[CachedMessage] = []
+        while current is not None and current.reply_to_id is not None:
+            if len(chain) >= max_depth:
+                break
+            current = ring.get(current.reply_to_id)
+            if current is not None:
+                chain.append(current)
+        chain.reverse()
+        return chain
+
+
+def render_thread(chain: list[CachedMessage]) -> str:
+    """Format a reply chain as transcript lines."""
+    return "\n".join(
+        f"{'Assistant' if record.from_bot else record.author}: {record.text}"
+        for record in chain
+    )
+
+
+def _record(message: Message, text: str, *, from_bot: bool) -> CachedMessage:
+    user = message.from_user
+    author = (user.first_name or user.username or "User") if user else "User"
+    parent = message.reply_to_message
+    return CachedMessage(
+        message_id=message.message_id,
+        author=author,
+        text=text,
+        reply_to_id=parent.message_id if parent is not None else None,
+        from_bot=from_bot,
+    )
@@ -0,0 +1,91 @@
+"""
+Group Chat Pre-filter
+
+In busy groups almost every message is addressed to someone other than the
+bot. This filter runs inside python-telegram-bot's dispatch, before the message
+handler is invoked, and drops group traffic that does not mention or reply to
+the bot. Detection only inspects message entities and the reply target, so an
+unmentioned message is rejected without scanning or copying its text.
+"""
+
+import re
+from typing import override
+
+from telegram import Message, MessageEntity, User
+from telegram.constants import ChatType
+from telegram.ext import filters
+
+
+class GroupMentionFilter(filters.MessageFilter):
+    """
+    Pass private messages and group messages addressed to the bot.
+
+    Until the bot's identity is known every message passes, leaving the
+    decision to the handler.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(name="GroupMentionFilter")
+        self.bot_id: int | None = None
+        self._mention: re.Pattern[str] | None = None
+
+    def set_bot(self, me: User) -> None:
+        """
+        Configure the filter with the bot's own account.
+
+        Args:
+            me: The bot user returned by `get_me`
+        """
+        self.bot_id = me.id
+        if me.username:
+            self._mention = re.compile(rf"@{re.escape(me.username)}\b", re.IGNORECASE)
+
+    @property
+    def ready(self) -> bool:
+        """Whether the bot's identity is known."""
+        return self.bot_id is not None
+
+    @override
+    def filter(self, message: Message) -> bool:
+        if message.chat.type == ChatType.PRIVATE or not self.ready:
+            return True
+        return self.is_addressed(message)
+
+    def is_addressed(self, message: Message) -> bool:
+        """
+        Check whether a message mentions or replies to the bot.
+
+        Args:
+            message: Incoming message
+
+        Returns:
+            bool: True for @username mentions, text mentions of the bot
+                account and replies to one of the bot's messages
+        """
+        reply = message.reply_to_message
+        if (
+            reply is not None
+            and reply.from_user is not None
+            and reply.from_user.id == self.bot_id
+        ):
+            return True
+
+        for entity in message.entities:
+            if entity.type == MessageEntity.MENTION:
+                if self._mention is not None and self._mention.fullmatch(
+                    message.parse_entity(entity)
+                ):
+                    return True
+            elif (
+                entity.type == MessageEntity.TEXT_MENTION
+                and entity.user is not None
+                and entity.user.id == self.bot_id
+            ):
+                return True
+        return False
+
+    def strip_mention(self, text: str) -> str:
+        """Remove @mentions of the bot from a message text."""
+        if self._mention is None:
+            return text.strip()
+        return self._mention.sub("", text).strip()
@@ -1,10 +1,11 @@
-import time
+import asyncio
+import weakref
 from typing import Any, cast
 
 from flare_ai_social.flare.getFLRPrice import FTSOService
 from flare_ai_social.flare.getXRPPrice import FDCService
 import structlog
-from telegram import Bot, Chat, Message, MessageEntity, Update, User
+from telegram import Bot, Chat, Message, Update, User
 from telegram.error import TelegramError
 from telegram.ext import (
     Application,
@@ -14,7 +15,19 @@ from telegram.ext import (
     filters,
 )
 
-from flare_ai_social.ai import BaseAIProvider
+from flare_ai_social.ai import (
+    BaseAIProvider,
+    ConversationStore,
+    FAQIndex,
+    SingleFlight,
+    deadline,
+    normalize_prompt,
+    retrieval_query,
+    traffic,
+)
+from flare_ai_social.telegram.message_cache import MessageCache, render_thread
+from flare_ai_social.telegram.prefilter import GroupMentionFilter
+from flare_ai_social.telegram.streaming import StreamingReply
 
 logger = structlog.get_logger(__name__)
 
@@ -23,14 +36,25 @@ ERR_API_TOKEN_NOT_PROVIDED = "Telegram API token not provided."
 ERR_BOT_NOT_INITIALIZED = "Bot not initialized."
 ERR_UPDATER_NOT_INITIALIZED = "Updater was not initialized"
 
+# Telegram allows roughly 20 messages per minute in a group, edits included
+MIN_GROUP_EDIT_INTERVAL = 3.0
+
 
 class TelegramBot:
-    def __init__(
+    def __init__(  # noqa: PLR0913
         self,
         ai_provider: BaseAIProvider,
         api_token: str,
         allowed_user_ids: list[int] | None = None,
         polling_interval: int = 5,
+        *,
+        stream_replies: bool = True,
+        stream_edit_interval: float = 1.0,
+        conversations: ConversationStore | None = None,
+        concurrent_updates: int = 64,
+        message_cache: MessageCache | None = None,
+        reply_deadline: float | None = 30.0,
+        faq: FAQIndex | None = None,
     ) -> None:
         """
         Initialize the Telegram bot.
@@ -41,6 +65,19 @@ class TelegramBot:
             allowed_user_ids: Optional list of allowed Telegram user.
                               If empty or None, all users are allowed.
             polling_interval: Time between update checks in seconds.
+            stream_replies: Send responses progressively while they are
+                            generated instead of after generation completes.
+            stream_edit_interval: Minimum seconds between message edits while
+                                  streaming (raised to 3s in group chats).
+            conversations: Bounded per-chat conversation memory. Defaults to
+                           an in-memory store without summarization.
+            concurrent_updates: Number of updates handled concurrently.
+            message_cache: Ring buffer of recent messages used to rebuild
+                           reply chains. Defaults to 200 messages per chat.
+            reply_deadline: Seconds allowed to answer a message; generation
+                            still running then is cancelled and the fallback
+                            reply is sent. None disables the deadline.
+            faq: Curated answers sent instead of calling the AI provider.
         """
         self.ai_provider = ai_provider
         self.api_token = api_token
@@ -48,11 +85,34 @@ class TelegramBot:
             allowed_user_ids or []
         )  # Empty list means no restrictions
         self.polling_interval = polling_interval
+        self.stream_replies = stream_replies
+        self.stream_edit_interval = stream_edit_interval
+        self.concurrent_updates = concurrent_updates
+        self.reply_deadline = reply_deadline
+        self.faq = faq
         self.application: Application | None = None
         self.me: User | None = None  # Will store bot's own information
+        # Drops group messages that do not address the bot before dispatch
+        self.mention_filter = GroupMentionFilter()
 
-        # Track last processed update time for each chat
-        self.last_processed_time: dict[int, float] = {}
+        # Recent messages per chat, used to give replies their thread context
+        self.message_cache = (
+            message_cache if message_cache is not None else MessageCache()
+        )
+
+        # Identical in-flight questions share one generation
+        self.coalescer: SingleFlight[str] = SingleFlight()
+
+        # Updates are handled concurrently; messages of one chat take turns
+        # reading and recording its history
+        self._locks: weakref.WeakValueDictionary[int, asyncio.Lock] = (
+            weakref.WeakValueDictionary()
+        )
+
+        # Bounded per-chat context; also tracks when each chat was last active
+        self.conversations = (
+            conversations if conversations is not None else ConversationStore()
+        )
 
         if not self.api_token:
             raise ValueError(ERR_API_TOKEN_NOT_PROVIDED)
@@ -69,6 +129,12 @@ class TelegramBot:
                 polling_interval=polling_interval,
             )
 
+    def _set_me(self, me: User) -> None:
+        """Store the bot's own account and configure components that use it."""
+        self.me = me
+        self.mention_filter.set_bot(me)
+        self.message_cache.bot_id = me.id
+
     def _is_user_allowed(self, user_id: int) -> bool:
         """
         Check if a user is allowed to use the bot.
@@ -183,7 +249,7 @@ class TelegramBot:
 
         if not self.me:
             try:
-                self.me = await context.bot.get_me()
+                self._set_me(await context.bot.get_me())
             except Exception:
                 logger.exception("Failed to get bot info in debug command")
 
@@ -272,6 +338,28 @@ class TelegramBot:
         )
         logger.info("Start command handled", user_id=user_id)
 
+    async def reset_command(
+        self, update: Update, _context: ContextTypes.DEFAULT_TYPE
+    ) -> None:
+        """Handle the /reset command by forgetting the chat's conversation."""
+        if not update.effective_user or not update.message or not update.effective_chat:
+            return
+
+        user_id: int = update.effective_user.id
+
+        if not self._is_user_allowed(user_id):
+            await update.message.reply_text(
+                "Sorry, you're not authorized to use this bot."
+            )
+            logger.warning("Unauthorized reset request", user_id=user_id)
+            return
+
+        self.conversations.reset(update.effective_chat.id)
+        await update.message.reply_text("Conversation history cleared.")
+        logger.info(
+            "Reset command handled", user_id=user_id, chat_id=update.effective_chat.id
+        )
+
     async def help_command(
         self, update: Update, _context: ContextTypes.DEFAULT_TYPE
     ) -> None:
@@ -294,51 +382,21 @@ class TelegramBot:
             "*Available commands:*\n"
             "/start - Start the conversation\n"
             "/help - Show this help message\n"
+            "/reset - Forget our conversation so far\n"
             "/debug - Show diagnostic information\n\n"
             "Simply send me a message, and I'll do my best to assist you!"
         )
         await update.message.reply_text(help_text, parse_mode="Markdown")
 
     async def _process_group_chat_mention(
-        self, text: str, entities: tuple[MessageEntity, ...], update: Update
+        self, text: str, message: Message
     ) -> tuple[bool, str]:
         """Check if bot was mentioned in group chat and return cleaned message text."""
-        if not self.me or not self.me.username:
-            return False, text
-
-        # Check direct mentions using entities
-        for entity in entities:
-            if entity.type == "mention":
-                mention_text = text[entity.offset: entity.offset + entity.length]
-                bot_username = self.me.username.lower()
-                mention_without_at = (
-                    mention_text[1:].lower()
-                    if mention_text.startswith("@")
-                    else mention_text.lower()
-                )
-                if mention_without_at == bot_username:
-                    return True, text.replace(mention_text, "").strip()
-
-        # Check text-based mentions
-        for variation in [f"@{self.me.username}", f"@{self.me.username.lower()}"]:
-            if variation.lower() in text.lower():
-                idx = text.lower().find(variation.lower())
-                if idx >= 0:
-                    actual_length = len(variation)
-                    actual_mention = text[idx: idx + actual_length]
-                    return True, text.replace(actual_mention, "").strip()
-
-        # Check if message is a reply to bot
-        if (
-            update.message
-            and update.message.reply_to_message
-            and update.message.reply_to_message.from_user
-            and self.me
-            and update.message.reply_to_message.from_user.id == self.me.id
+        if not self.mention_filter.ready or not self.mention_filter.is_addressed(
+            message
         ):
-            return True, text
-
-        return False, text
+            return False, text
+        return True, self.mention_filter.strip_mention(text)
 
     async def _handle_unauthorized_access(
         self, update: Update, chat_type: str, user_id: int, chat_id: int | str
@@ -364,8 +422,6 @@ class TelegramBot:
             logger.warning("Missing message, user, or chat; skipping")
             return
 
-        self._dump_update(update)
-
         user: User = update.effective_user
         user_id: int = user.id
         chat: Chat = update.effective_chat
@@ -375,12 +431,13 @@ class TelegramBot:
         # Get bot info if not already available
         if not self.me:
             try:
-                self.me = await context.bot.get_me()
+                me = await context.bot.get_me()
+                self._set_me(me)
                 logger.info(
                     "Bot information retrieved",
-                    bot_id=self.me.id,
-                    bot_username=self.me.username,
-                    bot_first_name=self.me.first_name,
+                    bot_id=me.id,
+                    bot_username=me.username,
+                    bot_first_name=me.first_name,
                 )
             except Exception:
                 logger.exception("Failed to get bot info")
@@ -393,24 +450,11 @@ class TelegramBot:
         var_text: str = update.message.text
         is_group_chat = chat_type in ["group", "supergroup", "channel"]
 
-        # Log message details
-        entities: tuple[MessageEntity, ...] = update.message.entities
-        logger.info(
-            "Received message details",
-            user_id=user_id,
-            chat_id=chat_id,
-            chat_type=chat_type,
-            message_id=update.message.message_id,
-            message_text=var_text,
-            has_entities=bool(entities),
-            entity_count=len(entities),
-            bot_username=self.me.username if self.me else "unknown",
-        )
-
-        # Handle group chat mentions
+        # Handle group chat mentions. Unmentioned group traffic is normally
+        # dropped by mention_filter before this handler runs.
         if is_group_chat:
             is_mentioned, var_text = await self._process_group_chat_mention(
-                var_text, entities, update
+                var_text, update.message
             )
             if not is_mentioned:
                 logger.debug(
@@ -427,6 +471,18 @@ class TelegramBot:
                     user_id=user_id,
                 )
 
+        logger.info(
+            "Received message details",
+            user_id=user_id,
+            chat_id=chat_id,
+            chat_type=chat_type,
+            message_id=update.message.message_id,
+            message_text=var_text,
+            entity_count=len(update.message.entities),
+            bot_username=self.me.username if self.me else "unknown",
+        )
+        logger.debug("Received update", update=self._dump_update(update))
+
         # Check user authorization
         if not self._is_user_allowed(
             user_id
@@ -446,12 +502,12 @@ class TelegramBot:
 
         try:
             await context.bot.send_chat_action(chat_id=chat_id, action="typing")
-            ai_response = self.ai_provider.generate_content(var_text)
-            response_text = ai_response.text
-
-            chat_id_key = int(chat_id) if isinstance(chat_id, str) else chat_id
-            self.last_processed_time[chat_id_key] = time.time()
-            await update.message.reply_text(response_text)
+            await self._answer(
+                update.message,
+                var_text,
+                is_group_chat=is_group_chat,
+                author=user.first_name if is_group_chat else None,
+            )
             logger.info(
                 "Sent AI response",
                 chat_id=chat_id,
@@ -464,6 +520,97 @@ class TelegramBot:
                 "I'm having trouble processing your request. Please try again later."
             )
 
+    async def _answer(
+        self, message: Message, text: str, *, is_group_chat: bool, author: str | None
+    ) -> None:
+        """Reply to a message in its thread and conversation context."""
+        chat_id = message.chat_id
+        self.message_cache.add(message)
+        question = text
+        thread = self.message_cache.chain(chat_id, message.message_id)
+        if thread:
+            question = (
+                f"Earlier messages in this reply thread:\n"
+                f"{render_thread(thread)}\n\nMessage:\n{text}"
+            )
+        # Identical questions on the same history share one generation; the
+        # lock is not held while generating so they can meet in flight
+        async with self._lock(chat_id):
+            history = self.conversations.render(chat_id, "")
+            prompt = self.conversations.render(chat_id, question)
+        key = f"{history}\n{normalize_prompt(question)}"
+        with (
+            traffic("telegram.group" if is_group_chat else "telegram.dm"),
+            retrieval_query(text),
+        ):
+            async with deadline(self.reply_deadline, "telegram.reply"):
+                response_text, shared = await self.coalescer.do(
+                    key, lambda: self._reply(message, text, prompt, is_group_chat)
+                )
+        if shared:
+            sent = await message.reply_text(response_text)
+            self.message_cache.add(sent, response_text, from_bot=True)
+            logger.info(
+                "Answered with coalesced response",
+                chat_id=chat_id,
+                llm_calls_saved=self.coalescer.coalesced,
+            )
+        async with self._lock(chat_id):
+            self.conversations.record(chat_id, text, response_text, author=author)
+
+    def _lock(self, chat_id: int) -> asyncio.Lock:
+        """Lock serializing the replies of a chat."""
+        lock = self._locks.get(chat_id)
+        if lock is None:
+            lock = self._locks[chat_id] = asyncio.Lock()
+        return lock
+
+    async def _reply(
+        self,
+        message: Message,
+        question: str,
+        prompt: str,
+        is_group_chat: bool,  # noqa: FBT001
+    ) -> str:
+        """Reply from the FAQ if it answers the question, else generate a reply."""
+        entry = self.faq.match(question) if self.faq is not None else None
+        if entry is None:
+            return await self._generate_reply(message, prompt, is_group_chat)
+        sent = await message.reply_text(entry.answer)
+        self.message_cache.add(sent, entry.answer, from_bot=True)
+        logger.info(
+            "Answered from FAQ", chat_id=message.chat_id, question=entry.question
+        )
+        return entry.answer
+
+    async def _generate_reply(
+        self, message: Message, prompt: str, is_group_chat: bool  # noqa: FBT001
+    ) -> str:
+        """Generate the AI response and send it as a reply to the message."""
+        if self.stream_replies:
+            return await self._stream_response(message, prompt, is_group_chat)
+        ai_response = await self.ai_provider.agenerate_content(prompt)
+        sent = await message.reply_text(ai_response.text)
+        self.message_cache.add(sent, ai_response.text, from_bot=True)
+        return ai_response.text
+
+    async def _stream_response(
+        self, message: Message, prompt: str, is_group_chat: bool  # noqa: FBT001
+    ) -> str:
+        """Stream the AI response into a reply that is edited as tokens arrive."""
+        edit_interval = self.stream_edit_interval
+        if is_group_chat:
+            edit_interval = max(edit_interval, MIN_GROUP_EDIT_INTERVAL)
+
+        reply = StreamingReply(message, edit_interval=edit_interval)
+        response_text = await reply.run(self.ai_provider.stream_content(prompt))
+        for sent, text in reply.sent:
+            self.message_cache.add(sent, text, from_bot=True)
+        if not response_text.strip():
+            msg = "AI provider returned an empty response"
+            raise ValueError(msg)
+        return response_text
+
     async def error_handler(
         self, update: object, context: ContextTypes.DEFAULT_TYPE
     ) -> None:
@@ -474,17 +621,22 @@ class TelegramBot:
         """Initialize the bot application."""
         logger.info("Initializing Telegram bot")
 
-        # Build the application with default settings
-        builder = Application.builder().token(self.api_token)
+        # Handle updates concurrently so slow generations don't queue the chat
+        builder = (
+            Application.builder()
+            .token(self.api_token)
+            .concurrent_updates(self.concurrent_updates)
+        )
         self.application = builder.build()
 
         try:
-            self.me = await Bot(self.api_token).get_me()
+            me = await Bot(self.api_token).get_me()
+            self._set_me(me)
             logger.info(
                 "Bot information retrieved",
-                bot_id=self.me.id,
-                bot_username=self.me.username,
-                bot_first_name=self.me.first_name,
+                bot_id=me.id,
+                bot_username=me.username,
+                bot_first_name=me.first_name,
             )
         except TelegramError:
             logger.exception("Failed to get bot info")
@@ -496,12 +648,14 @@ class TelegramBot:
         self.application.add_handler(
             CommandHandler("pulse", self.pulse_command))
         self.application.add_handler(CommandHandler("help", self.help_command))
+        self.application.add_handler(
+            CommandHandler("reset", self.reset_command))
         self.application.add_handler(
             CommandHandler("debug", self.debug_command))
 
         # Add message handler for text messages
         self.application.add_handler(
-            MessageHandler(filters.TEXT & ~filters.COMMAND,
+            MessageHandler(filters.TEXT & ~filters.COMMAND & self.mention_filter,
                            self.handle_message)
         )
 
@@ -550,6 +704,8 @@ class TelegramBot:
 
     async def shutdown(self) -> None:
         """Shut down the bot."""
+        logger.info("Request coalescing stats", **self.coalescer.stats())
+        await self.conversations.aclose()
         if self.application:
             logger.info("Shutting down Telegram bot")
             await self.application.stop()
@@ -0,0 +1,140 @@
+"""
+Progressive Telegram replies.
+
+Streams model output into Telegram as it is generated: the first chunk is sent
+as a reply and later chunks are applied with `edit_message_text`, throttled to
+stay inside Telegram's per-chat edit rate limits. Replies longer than a single
+Telegram message continue in a follow-up message.
+"""
+
+import asyncio
+import time
+from collections.abc import AsyncIterator
+from datetime import timedelta
+
+import structlog
+from telegram import Message
+from telegram.error import BadRequest, RetryAfter
+
+logger = structlog.get_logger(__name__)
+
+# Hard limit imposed by the Bot API on the length of a text message
+TELEGRAM_MAX_MESSAGE_LENGTH = 4096
+# Telegram rejects edits that do not change the message; these are harmless
+ERR_NOT_MODIFIED = "message is not modified"
+
+
+def _retry_after_seconds(error: RetryAfter) -> float:
+    """Return the flood-control delay of a RetryAfter error in seconds."""
+    retry_after = error.retry_after
+    if isinstance(retry_after, timedelta):
+        return retry_after.total_seconds()
+    return float(retry_after)
+
+
+class StreamingReply:
+    """
+    Deliver a streamed response to a Telegram message.
+
+    Attributes:
+        message (Message): The incoming message being replied to
+        edit_interval (float): Minimum seconds between two edits of a message
+        sent (list[tuple[Message, str]]): Messages sent so far with their final
+            text, in order
+    """
+
+    def __init__(self, message: Message, edit_interval: float = 1.0) -> None:
+        """
+        Initialize the streaming reply.
+
+        Args:
+            message: The incoming message to reply to.
+            edit_interval: Minimum time between consecutive edits in seconds.
+        """
+        self.message = message
+        self.edit_interval = edit_interval
+        self._sent: Message | None = None
+        self._buffer = ""
+        self._shown = ""
+        self._next_edit_at = 0.0
+        self._parts: list[str] = []
+        self.sent: list[tuple[Message, str]] = []
+
+    async def run(self, chunks: AsyncIterator[str]) -> str:
+        """
+        Consume a stream of text chunks and mirror it into Telegram.
+
+        Args:
+            chunks: Async iterator of generated text chunks.
+
+        Returns:
+            The complete response text, or an empty string if the stream
+            produced no text (in which case nothing was sent).
+        """
+        async for chunk in chunks:
+            self._buffer += chunk
+            while len(self._buffer) > TELEGRAM_MAX_MESSAGE_LENGTH:
+                await self._roll_over()
+            if self._sent is None:
+                if self._buffer.strip():
+                    await self._send_first()
+            elif time.monotonic() >= self._next_edit_at:
+                await self._edit()
+
+        if self._sent is None:
+            if self._buffer.strip():
+                await self._send_first()
+        elif self._buffer != self._shown:
+            await self._edit(final=True)
+        if self._sent is not None:
+            self.sent.append((self._sent, self._buffer))
+
+        return "".join(self._parts) + self._buffer
+
+    async def _send_first(self) -> None:
+        """Send the buffered text as a new reply message."""
+        self._sent = await self.message.reply_text(self._buffer)
+        self._shown = self._buffer
+        self._next_edit_at = time.monotonic() + self.edit_interval
+
+    async def _roll_over(self) -> None:
+        """Finalize the current message and continue in a new one."""
+        head = self._buffer[:TELEGRAM_MAX_MESSAGE_LENGTH]
+        tail = self._buffer[TELEGRAM_MAX_MESSAGE_LENGTH:]
+        self._buffer = head
+        if self._sent is None:
+            await self._send_first()
+        elif self._buffer != self._shown:
+            await self._edit(final=True)
+        if self._sent is not None:
+            self.sent.append((self._sent, head))
+        self._parts.append(head)
+        self._sent = None
+        self._buffer = tail
+        self._shown = ""
+
+    async def _edit(self, *, final: bool = False) -> None:
+        """
+        Replace the text of the sent message with the buffered text.
+
+        Intermediate edits that hit flood control are skipped and postponed;
+        the final edit waits out the delay so the full reply is always shown.
+        """
+        if self._sent is None:
+            return
+        text = self._buffer
+        try:
+            await self._sent.edit_text(text)
+        except RetryAfter as e:
+            delay = _retry_after_seconds(e)
+            logger.warning("Telegram edit rate limited", retry_after=delay)
+            if not final:
+                self._next_edit_at = time.monotonic() + delay
+                return
+            await asyncio.sleep(delay)
+            await self._sent.edit_text(text)
+        except BadRequest as e:
+            if ERR_NOT_MODIFIED not in str(e).lower():
+                raise
+        self._shown = text
+        self._next_edit_at = time.monotonic() + self.edit_interval
@@ -167,6 +167,12 @@ def start() -> None:
     plot_path = save_loss_plot(snapshots, new_model_id)
     logger.info("saved mean_loss plot", save_fig_path=str(plot_path))
 
+    # Compare on live traffic before moving any to it
+    logger.info(
+        "shadow the tuned model before promoting it",
+        env=f"AI_SHADOW_MODEL=tunedModels/{new_model_id}",
+    )
+
 
 if __name__ == "__main__":
     start()
@@ -9,7 +9,18 @@ import aiohttp
 from flare_ai_social.settings import settings
 import structlog
 
-from flare_ai_social.ai import BaseAIProvider
+from flare_ai_social.ai import (
+    BaseAIProvider,
+    DeadlineExceededError,
+    FAQIndex,
+    KeyPool,
+    QuotaExhaustedError,
+    budget,
+    deadline,
+    fits,
+    retrieval_query,
+    traffic,
+)
 
 logger = structlog.get_logger(__name__)
 
@@ -20,6 +31,7 @@ HTTP_SERVER_ERROR = 500
 ERR_TWITTER_CREDENTIALS = "Required Twitter API credentials not provided."
 ERR_RAPIDAPI_KEY = "RapidAPI key not provided. Please check your settings."
 FALLBACK_REPLY = "We're experiencing some difficulties."
+MAX_TWEET_CHARS = 280
 
 
 @dataclass
@@ -32,9 +44,17 @@ class TwitterConfig:
     access_token: str | None = None
     access_secret: str | None = None
     rapidapi_key: str | None = None
+    # Additional RapidAPI keys the search quota is spread over
+    rapidapi_keys: list[str] | None = None
+    # Per-key request quota assumed until RapidAPI reports the remaining count
+    rapidapi_requests_per_minute: float | None = None
     rapidapi_host: str | None = "twitter241.p.rapidapi.com"
     accounts_to_monitor: list[str] | None = None
     polling_interval: int = 30
+    # Seconds allowed to generate a reply before the fallback is sent
+    reply_deadline: float | None = 45.0
+    # Seconds allowed to post a reply, retries included
+    delivery_deadline: float | None = 30.0
 
 
 class TwitterBot:
@@ -42,8 +62,11 @@ class TwitterBot:
         self,
         ai_provider: BaseAIProvider,
         config: TwitterConfig,
+        faq: FAQIndex | None = None,
     ) -> None:
         self.ai_provider = ai_provider
+        # Curated answers posted instead of calling the AI provider
+        self.faq = faq
 
         # Twitter API credentials
         self.bearer_token = config.bearer_token
@@ -62,13 +85,19 @@ class TwitterBot:
         ):
             raise ValueError(ERR_TWITTER_CREDENTIALS)
 
-        if not self.rapidapi_key:
+        if not self.rapidapi_key and not config.rapidapi_keys:
             raise ValueError(ERR_RAPIDAPI_KEY)
+        self.rapidapi_keys = KeyPool(
+            [self.rapidapi_key or "", *(config.rapidapi_keys or [])],
+            config.rapidapi_requests_per_minute,
+        )
 
         # Monitoring parameters
         self.accounts_to_monitor = config.accounts_to_monitor or [
             "@privychatxyz"]
         self.polling_interval = config.polling_interval
+        self.reply_deadline = config.reply_deadline
+        self.delivery_deadline = config.delivery_deadline
 
         # API endpoints
         self.twitter_api_base = "https://api.twitter.com/2"
@@ -168,11 +197,11 @@ class TwitterBot:
             "Content-Type": "application/json",
         }
 
-    def _get_rapidapi_headers(self) -> dict[str, str]:
+    def _get_rapidapi_headers(self, key: str | None = None) -> dict[str, str]:
         """Generate headers for RapidAPI requests"""
         return {
             "x-rapidapi-host": self.rapidapi_host or "",
-            "x-rapidapi-key": self.rapidapi_key or "",
+            "x-rapidapi-key": key or self.rapidapi_key or "",
         }
 
     async def post_tweet(
@@ -265,7 +294,7 @@ class TwitterBot:
                     url,
                     headers=headers,
                     json=payload,
-                    timeout=aiohttp.ClientTimeout(total=30),
+                    timeout=aiohttp.ClientTimeout(total=budget(30)),
                 ) as response,
             ):
                 if response.status in [HTTP_OK, 201]:
@@ -274,15 +303,19 @@ class TwitterBot:
                     return result["data"]["id"]
 
                 error_text = await response.text()
-                should_retry = retry_count < max_retries and (
-                    response.status == HTTP_RATE_LIMIT
-                    or isinstance(response, TimeoutError)
+                delay_multiplier = 10 if response.status == HTTP_RATE_LIMIT else 5
+                retry_delay = (2**retry_count) * delay_multiplier
+                # Retries that would end after the delivery deadline are skipped
+                should_retry = (
+                    retry_count < max_retries
+                    and (
+                        response.status == HTTP_RATE_LIMIT
+                        or isinstance(response, TimeoutError)
+                    )
+                    and fits(retry_delay)
                 )
 
                 if should_retry:
-                    delay_multiplier = 10 if response.status == HTTP_RATE_LIMIT else 5
-
-                    retry_delay = (2**retry_count) * delay_multiplier
                     logger.warning(
                         "Twitter API error, retrying",
                         status=response.status,
@@ -304,9 +337,9 @@ class TwitterBot:
                 )
 
         except Exception as e:
-            should_retry = retry_count < max_retries
+            retry_delay = (2**retry_count) * 3
+            should_retry = retry_count < max_retries and fits(retry_delay)
             if should_retry:
-                retry_delay = (2**retry_count) * 3
                 logger.warning(
                     "Error posting reply, retrying",
                     error=str(e),
@@ -320,7 +353,7 @@ class TwitterBot:
                     retry_count + 1,
                     max_retries,
                 )
-            logger.exception("Failed to post reply after max retries")
+            logger.exception("Failed to post reply, giving up")
 
         return None
 
@@ -331,34 +364,47 @@ class TwitterBot:
         retry_count: int = 0,
         max_retries: int = 3,
     ) -> list[dict[str, Any]]:
-        """Search Twitter using new RapidAPI endpoint with a recent time filter"""
+        """Search Twitter using new RapidAPI endpoint with a recent time filter
+
+        Each attempt draws the RapidAPI key with the most quota left; a key
+        answered with 429 is quarantined until its quota resets and the retry
+        goes to another key, waiting only when every key is throttled.
+        """
         params = {"query": keyword, "count": "20", "type": "Latest"}
 
         logger.info("search_twitter")
+        try:
+            key = await self.rapidapi_keys.acquire_async(
+                max_wait=self.polling_interval
+            )
+        except QuotaExhaustedError as e:
+            logger.warning("All RapidAPI keys are rate limited", error=str(e))
+            return []
         try:
             async with session.get(
                 self.rapidapi_search_endpoint,
-                headers=self._get_rapidapi_headers(),
+                headers=self._get_rapidapi_headers(key),
                 params=params,
                 ssl=False
             ) as response:
+                self.rapidapi_keys.update(key, *_rapidapi_quota(response.headers))
                 if response.status == HTTP_OK:
                     result = await response.json()
                     return self._extract_tweets_from_response(result)
                 if response.status == HTTP_RATE_LIMIT and retry_count < max_retries:
                     error_text = await response.text()
-                    retry_delay = (2**retry_count) * 2
+                    self.rapidapi_keys.throttled(
+                        key, _retry_after(response.headers))
                     logger.warning(
-                        "Rate limit exceeded (429), retrying in %d seconds",
-                        retry_delay,
+                        "Rate limit exceeded (429), retrying with the next key",
                         retry_count=retry_count + 1,
                         max_retries=max_retries,
                         error=error_text,
                     )
-                    await asyncio.sleep(retry_delay)
                     return await self.search_twitter(
                         keyword, session, retry_count + 1, max_retries
                     )
+                self.rapidapi_keys.failed(key)
                 error_text = await response.text()
                 logger.error(
                     "Search failed with status %d: %s",
@@ -486,18 +532,34 @@ class TwitterBot:
                 mention_text = f"@{mention.get('screen_name', '')}"
                 clean_text = clean_text.replace(mention_text, "").strip()
 
-            ai_response = self.ai_provider.generate_content(clean_text)
-            response_text = ai_response.text
-
-            max_chars = 280
-            if len(response_text) > max_chars:
-                response_text = response_text[: max_chars - 3] + "..."
-
-            await self.post_reply(response_text, tweet_id)
+            entry = self.faq.match(clean_text) if self.faq is not None else None
+            if entry is not None:
+                logger.info("Answered from FAQ", question=entry.question)
+                response_text = entry.answer
+            else:
+                with traffic("twitter"), retrieval_query(clean_text):
+                    async with deadline(self.reply_deadline, "twitter.generate"):
+                        ai_response = await self.ai_provider.agenerate_content(
+                            clean_text
+                        )
+                response_text = ai_response.text
+
+            if len(response_text) > MAX_TWEET_CHARS:
+                response_text = response_text[: MAX_TWEET_CHARS - 3] + "..."
         except Exception:
             logger.exception("Error generating AI response")
-            fallback_reply = f"@{username} {FALLBACK_REPLY}"
-            await self.post_reply(fallback_reply, tweet_id)
+            response_text = f"@{username} {FALLBACK_REPLY}"
+
+        await self._deliver(response_text, tweet_id)
+
+    async def _deliver(self, reply_text: str, tweet_id: str) -> str | None:
+        """Post a reply, abandoning it once the delivery deadline has passed."""
+        try:
+            async with deadline(self.delivery_deadline, "twitter.deliver"):
+                return await self.post_reply(reply_text, tweet_id)
+        except DeadlineExceededError:
+            logger.warning("Reply not delivered in time", tweet_id=tweet_id)
+            return None
 
     async def monitor_mentions(self) -> None:
         """Main method to monitor mentions for all accounts"""
@@ -543,3 +605,24 @@ class TwitterBot:
             logger.info("Bot stopped by user")
         except Exception:
             logger.exception("Fatal error")
+
+
+def _rapidapi_quota(headers: Any) -> tuple[int | None, float | None]:
+    """Remaining requests and seconds to reset reported by RapidAPI."""
+    try:
+        remaining = headers.get("x-ratelimit-requests-remaining")
+        reset = headers.get("x-ratelimit-requests-reset")
+        return (
+            int(remaining) if remaining is not None else None,
+            float(reset) if reset is not None else None,
+        )
+    except ValueError:
+        return None, None
+
+
+def _retry_after(headers: Any) -> float | None:
+    """Seconds requested by a Retry-After header, if numeric."""
+    try:
+        return float(headers["Retry-After"])
+    except (KeyError, ValueError):
+        return None
@@ -0,0 +1,133 @@
+import asyncio
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any, override
+
+import httpx
+
+from flare_ai_social.ai.base import BaseAIProvider, ModelResponse
+from flare_ai_social.ai.deadline import remaining
+from flare_ai_social.ai.transport import TransportConfig
+
+Handler = Callable[[httpx.Request], httpx.Response]
+ConnectionFailure = httpx.ConnectError | httpx.ReadError
+
+
+@dataclass(frozen=True)
+class MockTransportConfig(TransportConfig):
+    """Transport whose async client is answered in-process by `handler`."""
+
+    handler: Handler = field(default=lambda _: httpx.Response(200, json={}))
+
+    @override
+    def httpx_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(transport=httpx.MockTransport(self.handler))
+
+
+def scripted(
+    *responses: httpx.Response | ConnectionFailure,
+) -> tuple[Handler, list[httpx.Request]]:
+    """
+    Handler replaying responses (or raising errors) in order, and the
+    requests it received. The last response repeats once the script runs out.
+    """
+    seen: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        response = responses[min(len(seen), len(responses)) - 1]
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    return handler, seen
+
+
+class FakeProvider(BaseAIProvider):
+    """
+    Configurable in-memory provider shared by the tests.
+
+    Answers with `reply` (a fixed text, or a function of the prompt and the
+    call number), or with its model name by default. Every answered prompt
+    is recorded. Async calls sleep for `delay` first so tests can overlap,
+    hedge or cancel them, and record the deadline budget they saw.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        reply: str | Callable[[str, int], str] | None = None,
+        *,
+        model_name: str = "test-model",
+        system_instruction: str = "Be brief.",
+        delay: float = 0.0,
+        fail: bool | Callable[[str], bool] = False,
+        metadata: dict[str, Any] | None = None,
+    ) -> None:
+        self.reply = reply
+        self.model_name = model_name
+        self.system_instruction = system_instruction
+        self.delay = delay
+        self.fail = fail
+        self.metadata = metadata or {}
+        self.chat_history = []
+        self.prompts: list[str] = []
+        self.remaining: list[float | None] = []
+        self.started = 0
+        self.cancelled = 0
+        self.in_flight = 0
+        self.peak = 0
+        self.closed = False
+
+    @property
+    def calls(self) -> int:
+        """Number of prompts answered."""
+        return len(self.prompts)
+
+    @override
+    def reset(self) -> None:
+        self.chat_history = []
+
+    @override
+    def generate_content(
+        self,
+        prompt: str,
+        response_mime_type: str | None = None,
+        response_schema: Any | None = None,
+    ) -> ModelResponse:
+        if self.fail(prompt) if callable(self.fail) else self.fail:
+            raise ConnectionError(self.model_name)
+        self.prompts.append(prompt)
+        if callable(self.reply):
+            text = self.reply(prompt, self.calls)
+        else:
+            text = self.model_name if self.reply is None else self.reply
+        return ModelResponse(text, None, dict(self.metadata))
+
+    @override
+    def send_message(self, msg: str) -> ModelResponse:
+        return self.generate_content(msg)
+
+    @override
+    async def agenerate_content(
+        self,
+        prompt: str,
+        response_mime_type: str | None = None,
+        response_schema: Any | None = None,
+        *,
+        timeout: float | None = None,  # noqa: ASYNC109
+    ) -> ModelResponse:
+        self.started += 1
+        self.remaining.append(remaining())
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        finally:
+            self.in_flight -= 1
+        return self.generate_content(prompt, response_mime_type, response_schema)
+
+    async def aclose(self) -> None:
+        self.closed = True
@@ -0,0 +1,100 @@
+import asyncio
+import json
+import threading
+import time
+
+import httpx
+import pytest
+
+from flare_ai_social.ai.base import BaseAIProvider
+from flare_ai_social.ai.openrouter import OpenRouterAIProvider
+from tests.conftest import FakeProvider, MockTransportConfig, scripted
+
+
+def completion(text: str) -> httpx.Response:
+    return httpx.Response(
+        200,
+        json={
+            "model": "meta-llama/llama-3-8b",
+            "provider": "Together",
+            "choices": [{"message": {"content": text}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 5, "completion_tokens": 1},
+        },
+    )
+
+
+def test_sync_providers_run_in_a_worker_thread() -> None:
+    """Test that the default async methods call the sync ones off the loop"""
+    provider = FakeProvider(lambda *_: str(threading.get_ident()))
+
+    async def run() -> tuple[str, str]:
+        generated = await BaseAIProvider.agenerate_content(provider, "gm")
+        sent = await BaseAIProvider.asend_message(provider, "gm")
+        return generated.text, sent.text
+
+    main_thread = str(threading.get_ident())
+    assert main_thread not in asyncio.run(run())
+    assert provider.prompts == ["gm", "gm"]
+
+
+def test_sync_fallback_times_out() -> None:
+    """Test that a slow sync call is abandoned once the timeout expires"""
+
+    def slow(*_: object) -> str:
+        time.sleep(0.2)
+        return "late"
+
+    provider = FakeProvider(slow)
+    with pytest.raises(TimeoutError):
+        asyncio.run(BaseAIProvider.agenerate_content(provider, "gm", timeout=0.01))
+    with pytest.raises(TimeoutError):
+        asyncio.run(BaseAIProvider.asend_message(provider, "gm", timeout=0.01))
+
+
+def test_openrouter_response_is_parsed() -> None:
+    """Test the request payload and the standardized response"""
+    handler, seen = scripted(completion('{"ok": true}'))
+    provider = OpenRouterAIProvider(
+        "key",
+        "meta-llama/llama-3-8b",
+        "Be brief.",
+        transport=MockTransportConfig(handler=handler),
+    )
+
+    response = asyncio.run(
+        provider.agenerate_content("gm", response_mime_type="application/json")
+    )
+
+    assert response.text == '{"ok": true}'
+    assert response.metadata["finish_reason"] == "stop"
+    assert response.metadata["provider"] == "Together"
+    payload = json.loads(seen[0].content)
+    assert payload["model"] == "meta-llama/llama-3-8b"
+    assert payload["response_format"] == {"type": "json_object"}
+    assert [m["role"] for m in payload["messages"]] == ["system", "user"]
+    assert seen[0].headers["Authorization"] == "Bearer key"
+
+
+def test_openrouter_conversation_history() -> None:
+    """Test that each message is sent with the exchanges before it"""
+    handler, seen = scripted(completion("gm"), completion("FTSO is an oracle."))
+    provider = OpenRouterAIProvider(
+        "key", "meta-llama/llama-3-8b", transport=MockTransportConfig(handler=handler)
+    )
+
+    async def run() -> None:
+        await provider.asend_message("gm")
+        await provider.asend_message("What is FTSO?")
+
+    asyncio.run(run())
+
+    contents = [m["content"] for m in json.loads(seen[1].content)["messages"]]
+    assert contents == ["gm", "gm", "What is FTSO?"]
+    assert [m["role"] for m in provider.chat_history] == [
+        "user",
+        "assistant",
+        "user",
+        "assistant",
+    ]
+    provider.reset()
+    assert provider.chat_history == []
@@ -0,0 +1,57 @@
+from collections.abc import Sequence
+from typing import Any
+
+from flare_ai_social.ai.base import ModelResponse
+from flare_ai_social.ai.batch import BatchExecutor
+from tests.conftest import FakeProvider
+
+
+def slow_provider() -> FakeProvider:
+    return FakeProvider(
+        lambda prompt, _: prompt.upper(), delay=0.01, fail=lambda p: p == "fail"
+    )
+
+
+class BatchingProvider(FakeProvider):
+    def __init__(self) -> None:
+        super().__init__(lambda prompt, _: prompt.upper())
+        self.batches: list[int] = []
+
+    async def agenerate_batch(
+        self,
+        prompts: Sequence[str],
+        response_mime_type: str | None = None,
+        response_schema: Any | None = None,
+    ) -> list[ModelResponse | Exception]:
+        self.batches.append(len(prompts))
+        return [ModelResponse(p.upper(), None, {}) for p in prompts]
+
+
+def test_results_are_ordered_with_item_errors() -> None:
+    """Test that a failing prompt is reported without failing the batch"""
+    provider = slow_provider()
+    executor = BatchExecutor(provider, concurrency=2)
+
+    results = executor.run(["a", "fail", "b", "c"])
+
+    assert [r.response.text if r.response else None for r in results] == [
+        "A",
+        None,
+        "B",
+        "C",
+    ]
+    assert isinstance(results[1].error, ConnectionError)
+    assert provider.peak == 2  # noqa: PLR2004
+    assert executor.last_stats is not None
+    assert executor.last_stats.failed == 1
+
+
+def test_batch_capable_provider_gets_chunks() -> None:
+    """Test that providers with a batch call receive prompts in chunks"""
+    provider = BatchingProvider()
+    executor = BatchExecutor(provider, batch_size=3)
+
+    results = executor.run([str(i) for i in range(7)])
+
+    assert provider.batches == [3, 3, 1]
+    assert [r.index for r in results] == list(range(7))
@@ -0,0 +1,23 @@
+import asyncio
+
+from flare_ai_social.ai import FAQIndex, ModelRegistry
+from flare_ai_social.bot_manager import BotManager
+from flare_ai_social.providers import ProviderStack
+from tests.conftest import FakeProvider
+
+
+def test_shared_stack_is_left_open() -> None:
+    """Test that bots sharing the API server's stack use it and never close it"""
+    provider = FakeProvider()
+    registry = ModelRegistry()
+    faq = FAQIndex([])
+    bots = BotManager()
+    bots.initialize_ai_provider(
+        ProviderStack(provider=provider, registry=registry, scheduler=None), faq=faq
+    )
+
+    asyncio.run(bots.stop_bots())
+
+    assert bots.registry is registry
+    assert bots.faq is faq
+    assert not provider.closed
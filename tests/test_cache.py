@@ -0,0 +1,106 @@
+import asyncio
+from pathlib import Path
+
+from flare_ai_social.ai.base import ModelResponse
+from flare_ai_social.ai.cache import (
+    CachedProvider,
+    ResponseCache,
+    no_cache,
+    report_served_model,
+)
+from tests.conftest import FakeProvider
+
+
+def counting_provider(system_instruction: str = "Be brief.") -> FakeProvider:
+    return FakeProvider(
+        lambda _, calls: f"answer {calls}", system_instruction=system_instruction
+    )
+
+
+def test_repeated_prompt_is_cached() -> None:
+    """Test that identical prompts reach the model once"""
+    provider = counting_provider()
+    cached = CachedProvider(provider)
+
+    first = cached.generate_content("What is FTSO?")
+    second = cached.generate_content("What is FTSO?")
+    cached.generate_content("What is FTSO?", response_mime_type="application/json")
+
+    assert second.text == first.text
+    assert second.metadata["cached"] is True
+    assert provider.calls == 2  # noqa: PLR2004
+    assert cached.cache.hits == 1
+
+
+def test_conversation_and_bypass_skip_cache() -> None:
+    """Test that chat calls and no_cache() always reach the model"""
+    provider = counting_provider()
+    cached = CachedProvider(provider)
+
+    cached.send_message("gm")
+    cached.send_message("gm")
+    with no_cache():
+        asyncio.run(cached.agenerate_content("gm"))
+        asyncio.run(cached.agenerate_content("gm"))
+
+    assert provider.calls == 4  # noqa: PLR2004
+    assert len(cached.cache) == 0
+
+
+def test_answers_are_keyed_on_the_serving_model() -> None:
+    """Test that an answer from another model is not reused as the primary's"""
+
+    def variant(_: str, calls: int) -> str:
+        if calls == 1:
+            report_served_model("model-b")
+        return f"answer {calls}"
+
+    provider = FakeProvider(variant)
+    cached = CachedProvider(provider)
+
+    cached.generate_content("What is FTSO?")
+    second = cached.generate_content("What is FTSO?")
+    third = cached.generate_content("What is FTSO?")
+
+    assert second.text == third.text == "answer 2"
+    assert provider.calls == 2  # noqa: PLR2004
+    assert cached.cache.get(cached.key("What is FTSO?", served=["model-b"]))
+
+
+def test_system_instruction_is_part_of_key() -> None:
+    """Test that providers with different instructions do not share answers"""
+    cache = ResponseCache()
+    CachedProvider(counting_provider("Be brief."), cache).generate_content("gm")
+    other = counting_provider("Be verbose.")
+    CachedProvider(other, cache).generate_content("gm")
+
+    assert other.calls == 1
+
+
+def test_expiry_and_lru_eviction() -> None:
+    """Test that entries expire and the least recently used is evicted"""
+    cache = ResponseCache(max_entries=2, ttl=-1)
+    cache.put("a", ModelResponse("a", None, {}))
+    assert cache.get("a") is None
+
+    cache = ResponseCache(max_entries=2)
+    for key in "abc":
+        cache.put(key, ModelResponse(key, None, {}))
+    assert cache.get("a") is None
+    assert cache.get("c") is not None
+
+
+def test_disk_tier_survives_restart(tmp_path: Path) -> None:
+    """Test that the SQLite tier answers after the memory tier is gone"""
+    db_path = tmp_path / "cache.sqlite"
+    provider = counting_provider()
+    cache = ResponseCache(db_path=db_path)
+    CachedProvider(provider, cache).generate_content("gm")
+    cache.close()
+
+    cache = ResponseCache(db_path=db_path)
+    response = CachedProvider(provider, cache).generate_content("gm")
+
+    assert response.text == "answer 1"
+    assert cache.disk_hits == 1
+    assert provider.calls == 1
@@ -0,0 +1,124 @@
+import asyncio
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+from google.generativeai import protos
+
+from flare_ai_social import providers
+from flare_ai_social.ai import ConversationStore, ModelRegistry
+from flare_ai_social.ai.cascade import CascadeProvider
+from flare_ai_social.ai.gemini import GeminiProvider
+from flare_ai_social.api import ChatRouter
+from flare_ai_social.settings import settings
+from tests.conftest import FakeProvider
+
+
+class TruncatingModel:
+    """Gemini model whose answers stop at the token limit."""
+
+    def generate_content(self, prompt: str, **kwargs: Any) -> Any:
+        candidate = SimpleNamespace(
+            finish_reason=protos.Candidate.FinishReason.MAX_TOKENS
+        )
+        return SimpleNamespace(
+            text="Flare is", candidates=[candidate], prompt_feedback=None
+        )
+
+
+def test_simple_prompt_is_answered_by_small_model() -> None:
+    """Test that a confident small-tier answer is returned without escalation"""
+    large = FakeProvider("large")
+    cascade = CascadeProvider(FakeProvider("gm, anon"), large)
+
+    response = asyncio.run(cascade.agenerate_content("gm"))
+
+    assert response.text == "gm, anon"
+    assert response.metadata["cascade_tier"] == "small"
+    assert large.calls == 0
+    assert cascade.stats()["small_hit_rate"] == 1.0
+
+
+def test_unsure_or_truncated_answers_escalate() -> None:
+    """Test that hedging and cut-off small answers go to the large model"""
+    large = FakeProvider("large")
+    unsure = CascadeProvider(FakeProvider("I'm not sure, sorry."), large)
+    truncated = CascadeProvider(
+        FakeProvider("Flare is", metadata={"finish_reason": "length"}), large
+    )
+
+    assert unsure.generate_content("Who are you?").text == "large"
+    assert truncated.generate_content("What is Flare?").text == "large"
+    assert unsure.counts["escalated"] == truncated.counts["escalated"] == 1
+
+
+def test_complex_prompt_skips_small_model() -> None:
+    """Test that technical prompts go straight to the large model"""
+    small = FakeProvider("small")
+    cascade = CascadeProvider(small, FakeProvider("large"))
+
+    response = cascade.generate_content(
+        "How does FTSO delegation affect staking yield and FAssets?"
+    )
+
+    assert response.metadata["cascade_tier"] == "large"
+    assert small.calls == 0
+    assert cascade.counts["skipped"] == 1
+
+
+def test_truncated_gemini_answer_escalates() -> None:
+    """Test that Gemini reports its finish reason to the confidence check"""
+    small = GeminiProvider("test-key", "gemini-1.5-flash-8b")
+    small.model = TruncatingModel()  # pyright: ignore [reportAttributeAccessIssue]
+    cascade = CascadeProvider(small, FakeProvider("large"))
+
+    assert small.generate_content("gm").metadata["finish_reason"] == "MAX_TOKENS"
+    assert cascade.generate_content("What is Flare?").text == "large"
+
+
+def test_streams_come_from_the_large_model() -> None:
+    """Test that streaming is not collapsed into a small-tier chunk"""
+    small = FakeProvider("small")
+    cascade = CascadeProvider(small, FakeProvider("large"))
+
+    async def stream() -> list[str]:
+        return [chunk async for chunk in cascade.stream_content("gm")]
+
+    assert "".join(asyncio.run(stream())) == "large"
+    assert small.calls == 0
+
+
+@pytest.fixture
+def tiers(monkeypatch: pytest.MonkeyPatch) -> tuple[FakeProvider, FakeProvider]:
+    """Small and large models of a stack built from the settings."""
+    small = FakeProvider("Flare is an EVM L1.", model_name="small")
+    large = FakeProvider("large", model_name="large")
+    registry = ModelRegistry()
+    registry.register("default", large, weight=1.0)
+    monkeypatch.setattr(providers, "build_registry", lambda: registry)
+    monkeypatch.setattr(providers, "gemini_provider", lambda _: small)
+    monkeypatch.setattr(settings, "ai_cascade_model", "small")
+    monkeypatch.setattr(settings, "ai_shadow_model", "")
+    monkeypatch.setattr(settings, "openrouter_api_key", "")
+    monkeypatch.setattr(settings, "few_shot_selection", True)
+    monkeypatch.setattr(settings, "ai_cache_enabled", False)
+    monkeypatch.setattr(settings, "ai_semantic_cache_enabled", False)
+    return small, large
+
+
+def test_stack_judges_the_question_not_the_expanded_prompt(
+    tiers: tuple[FakeProvider, FakeProvider],
+) -> None:
+    """Test that few-shot examples and history do not push out the small tier"""
+    small, large = tiers
+    stack = providers.build_provider_stack()
+    conversations = ConversationStore()
+    for i in range(3):
+        conversations.record("s", f"Tell me about staking round {i}", "Sure. " * 30)
+    chat = ChatRouter(stack.provider, conversations, reply_deadline=None)
+
+    reply = asyncio.run(chat.handle_conversation("What is Flare?", "s"))
+
+    assert reply == {"response": "Flare is an EVM L1."}
+    assert len(small.prompts[0].split()) > settings.ai_cascade_max_prompt_words
+    assert large.calls == 0
@@ -0,0 +1,105 @@
+import asyncio
+from collections.abc import AsyncIterator
+from typing import override
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from flare_ai_social.api.routes.chat import SESSION_HEADER, ChatRouter
+from tests.conftest import FakeProvider
+
+
+def make_client(
+    provider: FakeProvider | None = None,
+) -> tuple[TestClient, FakeProvider]:
+    provider = provider or FakeProvider(lambda _, calls: f"reply {calls}")
+    app = FastAPI()
+    app.include_router(ChatRouter(provider).router)
+    return TestClient(app), provider
+
+
+def test_sessions_keep_separate_histories() -> None:
+    """Test that each session ID only sees its own conversation"""
+    client, provider = make_client()
+
+    client.post("/", json={"message": "I am alice"}, headers={SESSION_HEADER: "a"})
+    client.post("/", json={"message": "I am bob"}, headers={SESSION_HEADER: "b"})
+    client.post("/", json={"message": "Who am I?"}, headers={SESSION_HEADER: "a"})
+
+    assert "I am alice" in provider.prompts[-1]
+    assert "I am bob" not in provider.prompts[-1]
+
+
+def test_session_cookie_is_issued_and_reset() -> None:
+    """Test that a new client gets a session cookie that /reset clears"""
+    client, provider = make_client()
+
+    first = client.post("/", json={"message": "gm"})
+    session_id = first.headers[SESSION_HEADER]
+    assert client.cookies["session_id"] == session_id
+
+    client.post("/", json={"message": "/reset"})
+    client.post("/", json={"message": "gm again"})
+    assert provider.prompts[-1] == "gm again"
+
+
+def test_stream_sends_chunks_then_done() -> None:
+    """Test the event stream of /stream and that the turn is recorded"""
+    client, provider = make_client()
+    headers = {SESSION_HEADER: "a"}
+
+    response = client.post("/stream", json={"message": "gm"}, headers=headers)
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.text == 'data: {"text": "reply 1"}\n\nevent: done\ndata: {}\n\n'
+    client.post("/", json={"message": "gm again"}, headers=headers)
+    assert "reply 1" in provider.prompts[-1]
+
+
+def test_stream_reports_errors_as_events() -> None:
+    """Test that a failing provider ends the stream with an error event"""
+    client, _ = make_client(FakeProvider(fail=True))
+
+    response = client.post("/stream", json={"message": "gm"})
+
+    assert response.status_code == 200  # noqa: PLR2004
+    assert response.text.startswith("event: error\n")
+    assert "event: done" not in response.text
+
+
+class StalledStream(FakeProvider):
+    """Provider whose stream stalls after its first chunk."""
+
+    @override
+    async def stream_content(self, prompt: str) -> AsyncIterator[str]:
+        self.prompts.append(prompt)
+        yield "Flare is"
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        yield " an L1."
+
+
+def test_stream_deadline_cancels_the_generation() -> None:
+    """Test that a deadline passing mid-stream ends it with an error event"""
+    provider = StalledStream()
+    chat = ChatRouter(provider, reply_deadline=0.05)
+
+    async def run() -> list[str]:
+        events: list[str] = []
+        async for event in chat.stream_events("gm", "a"):
+            events.append(event)
+            # A slow client: the deadline passes while the stream is suspended
+            await asyncio.sleep(0.1)
+        await chat.handle_conversation("gm again", "a")
+        return events
+
+    events = asyncio.run(run())
+
+    assert events[0] == 'data: {"text": "Flare is"}\n\n'
+    assert events[1].startswith("event: error\n")
+    assert "api.stream" in events[1]
+    assert len(events) == 2  # noqa: PLR2004
+    assert provider.cancelled == 1
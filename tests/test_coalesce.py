@@ -0,0 +1,78 @@
+import asyncio
+
+import pytest
+
+from flare_ai_social.ai.coalesce import SingleFlight, normalize_prompt
+
+
+def test_prompts_are_normalized() -> None:
+    """Test that case, spacing and trailing punctuation do not split keys"""
+    assert normalize_prompt("  What is\nFTSO?? ") == normalize_prompt("what is ftso")
+
+
+def test_followers_share_the_leader_result() -> None:
+    """Test that concurrent calls with one key run the function once"""
+    flight: SingleFlight[str] = SingleFlight()
+    release = asyncio.Event()
+
+    async def call() -> str:
+        await release.wait()
+        return "answer"
+
+    async def run() -> list[tuple[str, bool]]:
+        tasks = [asyncio.create_task(flight.do("k", call)) for _ in range(3)]
+        await asyncio.sleep(0)
+        assert len(flight) == 1
+        release.set()
+        return await asyncio.gather(*tasks)
+
+    assert asyncio.run(run()) == [
+        ("answer", False),
+        ("answer", True),
+        ("answer", True),
+    ]
+    assert flight.stats() == {"calls": 1, "coalesced": 2, "inflight": 0}
+
+
+def test_followers_see_the_leader_exception() -> None:
+    """Test that a failed call fails every caller and is not cached"""
+    flight: SingleFlight[str] = SingleFlight()
+
+    async def fail() -> str:
+        await asyncio.sleep(0.01)
+        msg = "provider down"
+        raise ConnectionError(msg)
+
+    async def run() -> list[tuple[str, bool] | BaseException]:
+        tasks = [asyncio.create_task(flight.do("k", fail)) for _ in range(2)]
+        return await asyncio.gather(*tasks, return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(result, ConnectionError) for result in results)
+    assert flight.stats() == {"calls": 1, "coalesced": 0, "inflight": 0}
+
+
+def test_follower_takes_over_from_a_cancelled_leader() -> None:
+    """Test that cancelling the leader hands the call to a follower"""
+    flight: SingleFlight[str] = SingleFlight()
+    started: list[str] = []
+
+    async def slow(name: str) -> str:
+        started.append(name)
+        await asyncio.sleep(0.01)
+        return name
+
+    async def run() -> tuple[str, bool]:
+        leader = asyncio.create_task(flight.do("k", lambda: slow("leader")))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flight.do("k", lambda: slow("follower")))
+        await asyncio.sleep(0)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert asyncio.run(run()) == ("follower", False)
+    assert started == ["leader", "follower"]
+    assert flight.calls == 2  # noqa: PLR2004
+    assert len(flight) == 0
@@ -0,0 +1,147 @@
+from datetime import timedelta
+from types import SimpleNamespace
+from typing import Any, ClassVar
+
+import pytest
+from google.api_core.exceptions import InvalidArgument, NotFound
+
+from flare_ai_social.ai import gemini
+from flare_ai_social.ai.gemini import GeminiProvider
+
+TTL = 60.0
+
+
+class FakeCachedContent:
+    """Server-side cache that records creations, renewals and expiry."""
+
+    created: ClassVar[list["FakeCachedContent"]] = []
+    fail_create: ClassVar[Exception | None] = None
+
+    def __init__(self, **kwargs: Any) -> None:
+        self.kwargs = kwargs
+        self.name = f"cachedContents/{len(self.created)}"
+        self.updates: list[timedelta] = []
+        self.expired = False
+
+    @classmethod
+    def create(cls, **kwargs: Any) -> "FakeCachedContent":
+        if cls.fail_create is not None:
+            raise cls.fail_create
+        cached = cls(**kwargs)
+        cls.created.append(cached)
+        return cached
+
+    def update(self, *, ttl: timedelta) -> None:
+        if self.expired:
+            raise NotFound(self.name)
+        self.updates.append(ttl)
+
+
+class FakeModel:
+    """Model answering with the name of the cache it was built on."""
+
+    def __init__(self, cached: FakeCachedContent | None = None) -> None:
+        self.cached = cached
+
+    def generate_content(self, prompt: str, **kwargs: Any) -> Any:
+        text = "inline" if self.cached is None else self.cached.name
+        return SimpleNamespace(
+            text=text, candidates=[None], prompt_feedback=None, usage_metadata=None
+        )
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(gemini, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def caching(monkeypatch: pytest.MonkeyPatch) -> type[FakeCachedContent]:
+    cached_content = type("CachedContent", (FakeCachedContent,), {"created": []})
+    monkeypatch.setattr(
+        gemini, "caching", SimpleNamespace(CachedContent=cached_content)
+    )
+    monkeypatch.setattr(gemini.genai.GenerativeModel, "from_cached_content", FakeModel)
+    return cached_content
+
+
+def make_provider() -> GeminiProvider:
+    provider = GeminiProvider(
+        "test-key",
+        "gemini-1.5-flash-001",
+        system_instruction="Be brief.",
+        cache_system_instruction=True,
+        cache_ttl=TTL,
+    )
+    provider.model = FakeModel()  # pyright: ignore [reportAttributeAccessIssue]
+    return provider
+
+
+def ask(provider: GeminiProvider) -> str:
+    return provider.generate_content("What is FTSO?").text
+
+
+@pytest.mark.usefixtures("clock")
+def test_cache_is_created_once(caching: type[FakeCachedContent]) -> None:
+    """Test that the system instruction is cached and the model rebuilt on it"""
+    provider = make_provider()
+
+    assert ask(provider) == "cachedContents/0"
+    assert ask(provider) == "cachedContents/0"
+    [cached] = caching.created
+    assert cached.kwargs["system_instruction"] == "Be brief."
+    assert cached.kwargs["ttl"] == timedelta(seconds=TTL)
+    assert cached.updates == []
+
+
+def test_cache_is_renewed_after_half_its_ttl(
+    caching: type[FakeCachedContent], clock: Clock
+) -> None:
+    """Test that an aging cache has its TTL extended instead of recreated"""
+    provider = make_provider()
+    ask(provider)
+    clock.now = TTL * 0.4
+    ask(provider)
+    clock.now = TTL * 0.6
+    ask(provider)
+
+    [cached] = caching.created
+    assert cached.updates == [timedelta(seconds=TTL)]
+
+
+def test_expired_cache_is_recreated(
+    caching: type[FakeCachedContent], clock: Clock
+) -> None:
+    """Test that a cache the server no longer knows is created again"""
+    provider = make_provider()
+    ask(provider)
+    caching.created[0].expired = True
+    clock.now = TTL * 0.6
+
+    assert ask(provider) == "cachedContents/1"
+    assert caching.created[0].updates == []
+    assert provider.cache_system_instruction
+
+
+@pytest.mark.usefixtures("clock")
+def test_unsupported_cache_falls_back_to_inline_instruction(
+    caching: type[FakeCachedContent],
+) -> None:
+    """Test that a rejected cache disables caching and keeps the model"""
+    caching.fail_create = InvalidArgument("below minimum token count")
+    provider = make_provider()
+
+    assert ask(provider) == "inline"
+    assert ask(provider) == "inline"
+    assert caching.created == []
+    assert not provider.cache_system_instruction
@@ -0,0 +1,114 @@
+import asyncio
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+from google.generativeai.types import helper_types
+
+from flare_ai_social.ai.deadline import (
+    DeadlineExceededError,
+    budget,
+    deadline,
+    deadline_misses,
+    fits,
+    remaining,
+)
+from flare_ai_social.ai.gemini import GeminiProvider
+
+
+def test_nested_deadline_only_tightens() -> None:
+    """Test that an inner deadline cannot extend the outer one"""
+
+    async def run() -> tuple[float | None, float | None, float | None]:
+        async with deadline(1.0, "outer"):
+            async with deadline(60.0, "inner"):
+                inner = remaining()
+            async with deadline(None, "inherit"):
+                inherited = remaining()
+        return inner, inherited, remaining()
+
+    inner, inherited, after = asyncio.run(run())
+
+    assert inner is not None
+    assert inner <= 1.0
+    assert inherited is not None
+    assert inherited <= 1.0
+    assert after is None
+
+
+def test_budget_and_retries_follow_the_deadline() -> None:
+    """Test that timeouts shrink and long retries are skipped near the deadline"""
+
+    async def run() -> tuple[float, bool, bool, float | None]:
+        async with deadline(0.5, "test"):
+            # Worker threads see the deadline of the awaiting task
+            threaded = await asyncio.to_thread(budget, None)
+            return budget(30.0), fits(0.1), fits(5.0), threaded
+
+    timeout, short_retry, long_retry, threaded = asyncio.run(run())
+
+    assert timeout <= 0.5  # noqa: PLR2004
+    assert short_retry
+    assert not long_retry
+    assert threaded is not None
+    assert budget(30.0) == 30.0  # noqa: PLR2004
+
+
+def test_expired_work_is_cancelled_and_counted() -> None:
+    """Test that work past its deadline is cancelled and the miss recorded"""
+    cancelled = False
+
+    async def slow() -> None:
+        nonlocal cancelled
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+
+    async def run() -> None:
+        async with deadline(0.05, "test.slow"):
+            await slow()
+
+    before = deadline_misses().get("test.slow", 0)
+    with pytest.raises(DeadlineExceededError, match=r"test\.slow"):
+        asyncio.run(run())
+
+    assert cancelled
+    assert deadline_misses()["test.slow"] == before + 1
+
+
+def test_unrelated_timeout_is_not_a_miss() -> None:
+    """Test that a shorter inner timeout propagates as a plain TimeoutError"""
+
+    async def run() -> None:
+        async with deadline(10.0, "test.inner"), asyncio.timeout(0.01):
+            await asyncio.sleep(1)
+
+    with pytest.raises(TimeoutError) as excinfo:
+        asyncio.run(run())
+
+    assert not isinstance(excinfo.value, DeadlineExceededError)
+    assert "test.inner" not in deadline_misses()
+
+
+def test_blocking_gemini_calls_are_bounded_by_the_deadline() -> None:
+    """Test that sync Gemini calls pass the time left as request options"""
+    sent: list[Any] = []
+
+    def generate_content(prompt: str, **kwargs: Any) -> Any:
+        sent.append(kwargs["request_options"])
+        return SimpleNamespace(text="gm", candidates=[], prompt_feedback=None)
+
+    provider = GeminiProvider("test-key", "gemini-1.5-flash", timeout=30.0)
+    provider.model = SimpleNamespace(generate_content=generate_content)  # pyright: ignore [reportAttributeAccessIssue]
+
+    async def run() -> None:
+        async with deadline(1.0, "reply"):
+            provider.generate_content("gm")
+
+    asyncio.run(run())
+    [options] = sent
+    assert isinstance(options, helper_types.RequestOptions)
+    assert isinstance(options.timeout, float)
+    assert 0 < options.timeout <= 1.0
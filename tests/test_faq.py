@@ -0,0 +1,70 @@
+from pathlib import Path
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from flare_ai_social.ai.faq import FAQEntry, FAQIndex
+from flare_ai_social.api.routes.chat import ChatRouter
+from flare_ai_social.twitter.service import MAX_TWEET_CHARS
+from tests.conftest import FakeProvider
+
+FAQ_PATH = Path(__file__).parent.parent / "src" / "data" / "faq.json"
+
+
+def make_index() -> FAQIndex:
+    return FAQIndex(
+        [
+            FAQEntry("What is FTSO?", "ftso answer", ["How does the FTSO work?"]),
+            FAQEntry("How can I stake XRP?", "xrp answer"),
+            FAQEntry("How do I stake FLR?", "flr answer"),
+        ]
+    )
+
+
+def answer(faq: FAQIndex, question: str) -> str | None:
+    entry = faq.match(question)
+    return None if entry is None else entry.answer
+
+
+def test_paraphrases_match_their_entry() -> None:
+    """Test exact, punctuation and word-overlap matches"""
+    faq = make_index()
+    assert answer(faq, "what is ftso") == "ftso answer"
+    assert answer(faq, "What's FTSO??") == "ftso answer"
+    assert answer(faq, "how does ftso work") == "ftso answer"
+    assert answer(faq, "Can I stake my XRP?") == "xrp answer"
+    assert faq.stats()["What is FTSO?"] == 3  # noqa: PLR2004
+
+
+def test_other_questions_go_to_the_model() -> None:
+    """Test that related but different questions are not matched"""
+    faq = make_index()
+    assert faq.match("What is FTSO and how do I stake FLR?") is None
+    assert faq.match("Is XRP going up?") is None
+    assert faq.match("what is ftso " * 10) is None
+    assert faq.stats()["misses"] == 3  # noqa: PLR2004
+
+
+def test_shipped_faq_loads() -> None:
+    """Test that the curated FAQ answers its own questions"""
+    faq = FAQIndex.from_json(FAQ_PATH)
+    for entry in faq.entries:
+        # Replies longer than a tweet would be cut off by the Twitter bot
+        assert len(entry.answer) <= MAX_TWEET_CHARS
+        for phrasing in entry.phrasings:
+            assert faq.lookup(phrasing) is entry
+
+
+def test_chat_answers_from_the_faq() -> None:
+    """Test that the chat API skips the model for FAQ questions"""
+    provider = FakeProvider("model reply")
+    app = FastAPI()
+    app.include_router(ChatRouter(provider, faq=make_index()).router)
+    client = TestClient(app)
+
+    assert client.post("/", json={"message": "What is FTSO?"}).json() == {
+        "response": "ftso answer"
+    }
+    assert provider.calls == 0
+    client.post("/", json={"message": "Tell me a joke"})
+    assert provider.calls == 1
@@ -0,0 +1,131 @@
+import asyncio
+import contextlib
+from collections.abc import AsyncIterator
+from types import SimpleNamespace
+from typing import Any
+
+from flare_ai_social.ai.gemini import GeminiProvider
+
+
+class FakeChat:
+    def __init__(self, history: list[Any]) -> None:
+        self.history = list(history)
+
+    async def send_message_async(self, msg: str, *, stream: bool = False) -> Any:
+        self.history.append({"role": "user", "parts": [msg]})
+        text = f"reply to {msg}"
+        self.history.append({"role": "model", "parts": [text]})
+        if stream:
+            return slow_stream(text)
+        return SimpleNamespace(
+            text=text, candidates=[None], prompt_feedback=None, usage_metadata=None
+        )
+
+
+async def slow_stream(text: str) -> AsyncIterator[Any]:
+    for word in text.split():
+        yield SimpleNamespace(text=word)
+        await asyncio.sleep(1)
+
+
+class FakeModel:
+    def __init__(self) -> None:
+        self.started: list[list[Any]] = []
+
+    def start_chat(self, history: list[Any]) -> FakeChat:
+        self.started.append(history)
+        return FakeChat(history)
+
+
+def make_provider(*, summarize: bool) -> tuple[GeminiProvider, FakeModel]:
+    provider = GeminiProvider(
+        "test-key",
+        "gemini-1.5-flash",
+        history_max_tokens=30,
+        summarize_history=summarize,
+    )
+    model = FakeModel()
+    provider.model = model  # pyright: ignore [reportAttributeAccessIssue]
+    return provider, model
+
+
+def test_history_stays_within_token_budget() -> None:
+    """Test that old turns are dropped and the session restarted"""
+    provider, model = make_provider(summarize=False)
+
+    async def chat() -> None:
+        for i in range(6):
+            await provider.asend_message(f"message number {i} " + "x" * 20)
+
+    asyncio.run(chat())
+
+    assert len(model.started) > 1
+    assert provider.memory is not None
+    assert provider.memory.token_count <= provider.memory.max_tokens
+    assert model.started[-1][0]["role"] == "user"
+
+
+def test_evicted_turns_are_summarized_in_background() -> None:
+    """Test that the summary replaces evicted turns in the next session"""
+    provider, model = make_provider(summarize=True)
+
+    async def summarize(summary: str, turns: list[Any]) -> str:
+        return "talked about numbers"
+
+    provider.summarizer = summarize
+
+    async def chat() -> None:
+        for i in range(4):
+            await provider.asend_message(f"message number {i} " + "x" * 20)
+        await asyncio.sleep(0.01)  # let the background summary finish
+        await provider.asend_message("and now?")
+
+    asyncio.run(chat())
+
+    assert "talked about numbers" in model.started[-1][0]["parts"][0]
+
+
+def test_abandoned_stream_restarts_the_session() -> None:
+    """Test that a stream cut short does not leave an unfinished response"""
+    provider, model = make_provider(summarize=False)
+
+    async def chat() -> list[str]:
+        await provider.asend_message("gm")
+        chunks: list[str] = []
+        with contextlib.suppress(TimeoutError):
+            async with asyncio.timeout(0.05):
+                async for chunk in provider.stream_message("what is FTSO?"):
+                    chunks.append(chunk)  # noqa: PERF401
+        return chunks
+
+    assert asyncio.run(chat()) == ["reply"]
+    restarted = model.started[-1]
+    assert [turn["parts"][0] for turn in restarted] == ["gm", "reply to gm"]
+
+
+def test_failed_summary_keeps_the_evicted_turns() -> None:
+    """Test that turns are kept pending when the summarizer fails"""
+    provider, _ = make_provider(summarize=True)
+    attempts: list[int] = []
+
+    async def summarize(summary: str, turns: list[Any]) -> str:
+        attempts.append(len(turns))
+        if len(attempts) == 1:
+            msg = "summarizer down"
+            raise ConnectionError(msg)
+        return "talked about numbers"
+
+    provider.summarizer = summarize
+
+    async def chat() -> None:
+        for i in range(4):
+            await provider.asend_message(f"message number {i} " + "x" * 20)
+            await asyncio.sleep(0.01)
+
+    asyncio.run(chat())
+
+    assert provider.memory is not None
+    assert provider.memory.summary == "talked about numbers"
+    assert provider.memory.pending == []
+    # The retry folded the turns of the failed attempt too
+    assert attempts[1] > attempts[0]
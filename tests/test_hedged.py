@@ -0,0 +1,91 @@
+import asyncio
+import time
+
+import pytest
+
+from flare_ai_social.ai.hedged import CircuitBreaker, HedgedProvider
+from tests.conftest import FakeProvider
+
+
+def hedged(primary: FakeProvider, backup: FakeProvider) -> HedgedProvider:
+    return HedgedProvider(
+        primary, backup, min_delay=0.01, max_delay=0.05, failure_threshold=2
+    )
+
+
+def test_fast_primary_is_not_hedged() -> None:
+    """Test that a primary answering within the delay is used alone"""
+    backup = FakeProvider(model_name="backup")
+    provider = hedged(FakeProvider(model_name="primary"), backup)
+
+    response = asyncio.run(provider.agenerate_content("gm"))
+
+    assert response.text == "primary"
+    assert backup.started == 0
+
+
+def test_slow_primary_is_hedged_and_cancelled() -> None:
+    """Test that the backup wins over a slow primary, which is cancelled"""
+    primary = FakeProvider(model_name="primary", delay=1.0)
+    provider = hedged(primary, FakeProvider(model_name="backup"))
+
+    response = asyncio.run(provider.agenerate_content("gm"))
+
+    assert response.text == "backup"
+    assert response.metadata["served_by"] == "backup"
+    assert primary.cancelled == 1
+    assert provider.stats["hedged"] == 1
+    # The cancelled primary still counts, with the time it ran as lower bound
+    assert len(provider.latency) == 1
+    assert (provider.latency.quantile(0.5) or 0) >= provider.hedge_delay()
+
+
+def test_breaker_skips_failing_primary() -> None:
+    """Test that repeated failures trip the primary's breaker"""
+    primary = FakeProvider(model_name="primary", fail=True)
+    provider = hedged(primary, FakeProvider(model_name="backup"))
+
+    for _ in range(3):
+        assert asyncio.run(provider.agenerate_content("gm")).text == "backup"
+
+    assert provider.breakers["primary"].state == "open"
+    assert primary.started == 2  # noqa: PLR2004
+
+
+def test_all_failing_raises() -> None:
+    """Test that the last error is raised when no provider answers"""
+    provider = hedged(
+        FakeProvider(model_name="primary", fail=True),
+        FakeProvider(model_name="backup", fail=True),
+    )
+
+    with pytest.raises(ConnectionError):
+        provider.generate_content("gm")
+
+
+def test_breaker_half_opens_after_timeout() -> None:
+    """Test that an open breaker allows a trial call after the timeout"""
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+
+    assert breaker.state == "half-open"
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+def test_half_open_breaker_lets_one_trial_call_through() -> None:
+    """Test that concurrent callers are rejected while the trial is running"""
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.01)
+    breaker.record_failure()
+    time.sleep(0.02)
+
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    time.sleep(0.02)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.allow()
+    assert breaker.allow()
@@ -0,0 +1,89 @@
+import asyncio
+import time
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+from google.api_core.client_options import ClientOptions
+from google.generativeai import protos
+
+from flare_ai_social.ai import gemini
+from flare_ai_social.ai.gemini import GeminiProvider
+from flare_ai_social.ai.keys import KeyPool, QuotaExhaustedError
+
+
+class FakeGenerativeClient:
+    """Generative service client answering with the key it was built with."""
+
+    def __init__(self, *, client_options: ClientOptions) -> None:
+        self.api_key = client_options.api_key
+
+    async def generate_content(
+        self, request: Any, **kwargs: Any
+    ) -> protos.GenerateContentResponse:
+        content = protos.Content(parts=[protos.Part(text=self.api_key)], role="model")
+        return protos.GenerateContentResponse(
+            candidates=[protos.Candidate(content=content)]
+        )
+
+
+def test_requests_spread_by_remaining_quota() -> None:
+    """Test that keys are drawn by remaining quota until all run out"""
+    pool = KeyPool(["a", "b", "a", ""], requests_per_minute=2)
+
+    drawn = [pool.acquire() for _ in range(4)]
+
+    assert sorted(drawn) == ["a", "a", "b", "b"]
+    with pytest.raises(QuotaExhaustedError):
+        pool.acquire()
+
+
+def test_server_reported_quota_wins() -> None:
+    """Test that a quota reported by the API overrides the local estimate"""
+    pool = KeyPool(["a", "b"])
+    pool.update("a", remaining=0, reset_after=30)
+
+    assert pool.acquire() == "b"
+    assert pool.remaining("a") == 0
+
+
+def test_throttled_key_is_quarantined() -> None:
+    """Test that a 429 takes the key out of rotation until it resets"""
+    pool = KeyPool(["a", "b"])
+    pool.throttled("a", retry_after=30)
+
+    assert {pool.acquire() for _ in range(3)} == {"b"}
+    stats = pool.stats()
+    assert stats["...a"]["quarantined"]
+    assert stats["...a"]["throttled"] == 1
+    assert stats["...b"]["requests"] == 3  # noqa: PLR2004
+
+
+def test_gemini_requests_use_per_key_clients(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that each pooled key gets a client of its own"""
+    monkeypatch.setattr(
+        gemini,
+        "glm",
+        SimpleNamespace(
+            GenerativeServiceClient=FakeGenerativeClient,
+            GenerativeServiceAsyncClient=FakeGenerativeClient,
+        ),
+    )
+    provider = GeminiProvider("a", "gemini-1.5-flash", key_pool=KeyPool(["a", "b"]))
+
+    async def run() -> list[str]:
+        return [(await provider.agenerate_content("gm")).text for _ in range(3)]
+
+    assert asyncio.run(run()) == ["a", "b", "a"]
+
+
+def test_gemini_key_wait_is_bounded_by_the_call_timeout() -> None:
+    """Test that a short call fails fast instead of waiting for quota"""
+    pool = KeyPool(["a"], requests_per_minute=6, window=10.0)
+    pool.acquire()
+    provider = GeminiProvider("a", "gemini-1.5-flash", timeout=60.0, key_pool=pool)
+
+    started = time.monotonic()
+    with pytest.raises(QuotaExhaustedError):
+        asyncio.run(provider.agenerate_content("gm", timeout=0.5))
+    assert time.monotonic() - started < 0.5  # noqa: PLR2004
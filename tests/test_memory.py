@@ -0,0 +1,121 @@
+import asyncio
+from pathlib import Path
+
+from flare_ai_social.ai.memory import ConversationMemory, ConversationStore, Turn
+
+
+def test_memory_caps_turns_and_tokens() -> None:
+    """Test that the window respects both the turn and the token cap"""
+    memory = ConversationMemory(max_turns=4, max_tokens=10_000)
+    for i in range(6):
+        memory.add("user", f"message {i}")
+    assert [turn.text for turn in memory.turns] == [f"message {i}" for i in range(2, 6)]
+
+    memory = ConversationMemory(max_turns=100, max_tokens=20)
+    evicted = [turn for _ in range(5) for turn in memory.add("user", "x" * 40)]
+    assert memory.token_count <= memory.max_tokens
+    assert len(evicted) + len(memory.turns) == len(range(5))
+
+
+def test_render_includes_summary_and_turns() -> None:
+    """Test that rendering prefixes the prompt with the conversation context"""
+    memory = ConversationMemory()
+    assert memory.render("hi") == "hi"
+
+    memory.add("user", "What is FTSO?", author="alice")
+    memory.add("model", "An oracle.")
+    memory.set_summary("Talked about oracles.")
+    rendered = memory.render("And FDC?")
+    assert "Talked about oracles." in rendered
+    assert "User (alice): What is FTSO?" in rendered
+    assert "Assistant: An oracle." in rendered
+    assert rendered.endswith("And FDC?")
+
+
+def test_store_evicts_least_recently_used(tmp_path: Path) -> None:
+    """Test LRU eviction and restoring a conversation from the spill tier"""
+    store = ConversationStore(max_conversations=2, spill_dir=tmp_path)
+
+    async def run() -> None:
+        store.record(1, "one", "reply one")
+        store.record(2, "two", "reply two")
+        store.get(1)
+        store.record(3, "three", "reply three")
+
+    asyncio.run(run())
+    assert 2 not in store  # noqa: PLR2004
+    assert len(store) == store.max_conversations
+    assert len(list(tmp_path.iterdir())) == 1
+
+    restored = store.get(2)
+    assert [turn.text for turn in restored.turns] == ["two", "reply two"]
+    assert 1 not in store
+    assert len(store) == store.max_conversations
+
+
+def test_store_summarizes_evicted_turns() -> None:
+    """Test that evicted turns are folded into the summary in the background"""
+    summarized: list[list[str]] = []
+
+    async def summarizer(summary: str, turns: list[Turn]) -> str:
+        summarized.append([turn.text for turn in turns])
+        return f"{summary} {' '.join(turn.text for turn in turns)}".strip()
+
+    store = ConversationStore(max_turns=2, summarizer=summarizer)
+
+    async def run() -> None:
+        store.record("chat", "q1", "a1")
+        store.record("chat", "q2", "a2")
+        await store.aclose()
+
+    asyncio.run(run())
+    memory = store.get("chat")
+    assert summarized == [["q1", "a1"]]
+    assert memory.summary == "q1 a1"
+    assert [turn.text for turn in memory.turns] == ["q2", "a2"]
+
+
+def test_store_retries_turns_of_a_failed_summary() -> None:
+    """Test that a failed summary leaves its turns for the next attempt"""
+    summarized: list[list[str]] = []
+
+    async def summarizer(summary: str, turns: list[Turn]) -> str:
+        summarized.append([turn.text for turn in turns])
+        if len(summarized) == 1:
+            msg = "summarizer down"
+            raise ConnectionError(msg)
+        return " ".join(turn.text for turn in turns)
+
+    store = ConversationStore(max_turns=2, summarizer=summarizer)
+
+    async def run() -> None:
+        store.record("chat", "q1", "a1")
+        store.record("chat", "q2", "a2")
+        await asyncio.sleep(0)
+        store.record("chat", "q3", "a3")
+        await store.aclose()
+
+    asyncio.run(run())
+    assert summarized == [["q1", "a1"], ["q1", "a1", "q2", "a2"]]
+    assert store.get("chat").summary == "q1 a1 q2 a2"
+
+
+def test_pending_turns_stay_bounded_while_summaries_fail() -> None:
+    """Test that a failing summarizer drops the oldest turns beyond the caps"""
+
+    async def summarizer(summary: str, turns: list[Turn]) -> str:
+        msg = "summarizer down"
+        raise ConnectionError(msg)
+
+    store = ConversationStore(max_turns=2, max_tokens=4, summarizer=summarizer)
+
+    async def run() -> None:
+        for i in range(10):
+            store.record("chat", f"q{i}", f"a{i}")
+            await asyncio.sleep(0)
+        await store.aclose()
+
+    asyncio.run(run())
+    memory = store.get("chat")
+    assert [turn.text for turn in memory.pending] == ["q7", "a7", "q8", "a8"]
+    assert memory.pending_tokens == sum(turn.tokens for turn in memory.pending)
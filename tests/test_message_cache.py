@@ -0,0 +1,91 @@
+from typing import Any
+
+import pytest
+from telegram import Message
+
+from flare_ai_social.telegram.message_cache import ChatRing, MessageCache
+
+GROUP = {"id": -100, "type": "supergroup", "title": "Flare"}
+OTHER_GROUP = {"id": -200, "type": "supergroup", "title": "Songbird"}
+ALICE = {"id": 7, "is_bot": False, "first_name": "alice"}
+
+
+def raw(
+    message_id: int,
+    text: str,
+    reply_to: int | None = None,
+    chat: dict[str, Any] = GROUP,
+) -> dict[str, Any]:
+    data: dict[str, Any] = {
+        "message_id": message_id,
+        "date": 0,
+        "chat": chat,
+        "from": ALICE,
+        "text": text,
+    }
+    if reply_to is not None:
+        data["reply_to_message"] = raw(reply_to, f"message {reply_to}", chat=chat)
+    return data
+
+
+def make_message(message_id: int, text: str, **extra: Any) -> Message:
+    return Message.de_json(raw(message_id, text, **extra), None)
+
+
+def test_chain_follows_replies_oldest_first() -> None:
+    """Test that a reply chain is rebuilt from cached messages"""
+    cache = MessageCache()
+    cache.add(make_message(1, "What is FTSO?"))
+    cache.add(make_message(2, "An oracle.", reply_to=1))
+    cache.add(make_message(3, "How often?", reply_to=2))
+
+    assert [r.text for r in cache.chain(-100, 3)] == ["What is FTSO?", "An oracle."]
+    assert [r.message_id for r in cache.chain(-100, 3, max_depth=1)] == [2]
+
+
+def test_chain_stops_at_missing_parents() -> None:
+    """Test that the chain ends at the first ancestor that is not cached"""
+    cache = MessageCache()
+    # The reply carries its parent, but the parent's own parent was never seen
+    cache.add(
+        Message.de_json(
+            raw(3, "How often?")
+            | {"reply_to_message": raw(2, "An oracle.", reply_to=1)},
+            None,
+        )
+    )
+
+    assert [r.message_id for r in cache.chain(-100, 3)] == [2]
+    assert cache.chain(-100, 99) == []
+
+
+def test_chats_are_isolated() -> None:
+    """Test that message IDs in one chat never resolve in another"""
+    cache = MessageCache()
+    cache.add(make_message(1, "What is FTSO?"))
+    cache.add(make_message(2, "gm", reply_to=1, chat=OTHER_GROUP))
+
+    [parent] = cache.chain(-200, 2)
+    assert parent.text == "message 1"
+    assert cache.chain(-100, 2) == []
+
+
+def test_old_messages_and_chats_are_evicted() -> None:
+    """Test ring overwrites within a chat and LRU eviction across chats"""
+    cache = MessageCache(per_chat=2, max_chats=1)
+    cache.add(make_message(1, "one"))
+    cache.add(make_message(2, "two", reply_to=1))
+    cache.add(make_message(3, "three", reply_to=2))
+
+    assert [r.message_id for r in cache.chain(-100, 3)] == [2]
+
+    cache.add(make_message(1, "gm", chat=OTHER_GROUP))
+    assert cache.chain(-100, 3) == []
+
+
+def test_capacity_must_be_positive() -> None:
+    """Test that an empty ring is rejected up front"""
+    with pytest.raises(ValueError, match="at least one"):
+        ChatRing(0)
+    with pytest.raises(ValueError, match="at least one"):
+        MessageCache(per_chat=0)
@@ -0,0 +1,106 @@
+import asyncio
+import math
+import time
+from typing import Any
+
+from flare_ai_social.ai.model_router import ModelRouter
+
+MODELS = ["openai/gpt-4o-mini", "meta-llama/llama-3.3-70b-instruct"]
+
+
+class FakeCatalogue:
+    def __init__(self) -> None:
+        self.model_listings = 0
+
+    async def get_available_models(self) -> dict[str, Any]:
+        self.model_listings += 1
+        return {
+            "data": [
+                {
+                    "id": "openai/gpt-4o-mini",
+                    "pricing": {"prompt": "0.00000015", "completion": "0.0000006"},
+                    "context_length": 128000,
+                    "supported_parameters": ["response_format", "max_tokens"],
+                },
+                {
+                    "id": "meta-llama/llama-3.3-70b-instruct",
+                    "pricing": {"prompt": "0.00000012", "completion": "0.0000003"},
+                    "context_length": 8192,
+                    "supported_parameters": ["max_tokens"],
+                },
+            ]
+        }
+
+    async def get_model_endpoints(self, author: str, slug: str) -> dict[str, Any]:
+        providers = ["Fast", "Slow"] if slug == "gpt-4o-mini" else ["Together"]
+        return {
+            "data": {
+                "endpoints": [
+                    {
+                        "provider_name": name,
+                        "pricing": {"prompt": "0.00000015"},
+                        "context_length": 128000,
+                        "supported_parameters": ["response_format"],
+                    }
+                    for name in providers
+                ]
+            }
+        }
+
+
+def make_router() -> ModelRouter:
+    router = ModelRouter(FakeCatalogue(), MODELS)  # pyright: ignore [reportArgumentType]
+    asyncio.run(router.refresh())
+    return router
+
+
+def test_request_class_constraints() -> None:
+    """Test that catalogue metadata filters models per request class"""
+    router = make_router()
+    for model in MODELS:
+        router.observe(model, None, 1.0, error=False)
+
+    assert router.choose("json")[0] == "openai/gpt-4o-mini"
+    assert router.choose("long")[0] == "openai/gpt-4o-mini"
+    assert router.choose("chat")[0] == "meta-llama/llama-3.3-70b-instruct"
+
+
+def test_fastest_model_and_endpoint_win() -> None:
+    """Test that observed latency and errors drive the choice"""
+    router = make_router()
+    router.observe("openai/gpt-4o-mini", "Slow", 3.0, error=False)
+    router.observe("openai/gpt-4o-mini", "Fast", 0.5, error=False)
+    router.observe("meta-llama/llama-3.3-70b-instruct", "Together", 5.0, error=False)
+
+    model, endpoints = router.choose("chat")
+
+    assert model == "openai/gpt-4o-mini"
+    assert endpoints == ["Fast", "Slow"]
+
+    for _ in range(5):
+        router.observe("openai/gpt-4o-mini", None, None, error=True)
+    assert router.choose("chat")[0] == "meta-llama/llama-3.3-70b-instruct"
+
+
+def test_unmeasured_models_are_tried_first() -> None:
+    """Test that models without samples are explored"""
+    router = make_router()
+    router.observe("meta-llama/llama-3.3-70b-instruct", None, 0.1, error=False)
+
+    assert router.choose("chat")[0] == "openai/gpt-4o-mini"
+
+
+def test_excluded_models_are_probed_again() -> None:
+    """Test that a model excluded for its errors gets one periodic retry"""
+    router = ModelRouter(FakeCatalogue(), MODELS, probe_interval=0.01)  # pyright: ignore [reportArgumentType]
+    asyncio.run(router.refresh())
+    router.observe("meta-llama/llama-3.3-70b-instruct", None, 1.0, error=False)
+    for _ in range(5):
+        router.observe("openai/gpt-4o-mini", None, None, error=True)
+
+    assert router.stats_for("openai/gpt-4o-mini").score() == math.inf
+    assert router.choose("chat")[0] == "meta-llama/llama-3.3-70b-instruct"
+
+    time.sleep(0.02)
+    assert router.choose("chat")[0] == "openai/gpt-4o-mini"
+    assert router.choose("chat")[0] == "meta-llama/llama-3.3-70b-instruct"
@@ -0,0 +1,102 @@
+from typing import Any
+
+import pytest
+from telegram import Message, User
+
+from flare_ai_social.telegram.prefilter import GroupMentionFilter
+
+BOT = User(id=42, first_name="Flare Pulse", is_bot=True, username="FlarePulseBot")
+GROUP = {"id": -100, "type": "supergroup", "title": "Flare"}
+PRIVATE = {"id": 7, "type": "private", "first_name": "alice"}
+ALICE = {"id": 7, "is_bot": False, "first_name": "alice"}
+
+
+def make_message(text: str, chat: dict[str, Any] = GROUP, **extra: Any) -> Message:
+    data = {"message_id": 1, "date": 0, "chat": chat, "from": ALICE, "text": text}
+    return Message.de_json({**data, **extra}, None)
+
+
+@pytest.fixture
+def mention_filter() -> GroupMentionFilter:
+    mention_filter = GroupMentionFilter()
+    mention_filter.set_bot(BOT)
+    return mention_filter
+
+
+@pytest.mark.parametrize(
+    ("message", "expected"),
+    [
+        (make_message("gm everyone"), False),
+        (make_message("hi", chat=PRIVATE), True),
+        (
+            make_message(
+                "@flarepulsebot what is FTSO?",
+                entities=[{"type": "mention", "offset": 0, "length": 14}],
+            ),
+            True,
+        ),
+        (
+            make_message(
+                "@FlarePulseBotFan nice",
+                entities=[{"type": "mention", "offset": 0, "length": 17}],
+            ),
+            False,
+        ),
+        (
+            make_message(
+                "🔥 @FlarePulseBot hi",
+                entities=[{"type": "mention", "offset": 3, "length": 14}],
+            ),
+            True,
+        ),
+        (
+            make_message(
+                "Pulse, explain FDC",
+                entities=[
+                    {
+                        "type": "text_mention",
+                        "offset": 0,
+                        "length": 5,
+                        "user": {"id": 42, "is_bot": True, "first_name": "Pulse"},
+                    }
+                ],
+            ),
+            True,
+        ),
+        (
+            make_message(
+                "and FAssets?",
+                reply_to_message={
+                    "message_id": 0,
+                    "date": 0,
+                    "chat": GROUP,
+                    "from": {"id": 42, "is_bot": True, "first_name": "Pulse"},
+                    "text": "FTSO is an oracle.",
+                },
+            ),
+            True,
+        ),
+    ],
+)
+def test_filter(
+    mention_filter: GroupMentionFilter,
+    message: Message,
+    expected: bool,  # noqa: FBT001
+) -> None:
+    """Test which messages pass the pre-filter"""
+    assert mention_filter.filter(message) is expected
+
+
+def test_unconfigured_filter_passes_everything() -> None:
+    """Test that messages pass until the bot's identity is known"""
+    assert GroupMentionFilter().filter(make_message("gm everyone"))
+
+
+def test_strip_mention(mention_filter: GroupMentionFilter) -> None:
+    """Test removing case-insensitive mentions of the bot"""
+    assert mention_filter.strip_mention("@flarepulsebot what is FTSO?") == (
+        "what is FTSO?"
+    )
+    assert mention_filter.strip_mention("@FlarePulseBotFan hi") == (
+        "@FlarePulseBotFan hi"
+    )
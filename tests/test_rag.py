@@ -0,0 +1,120 @@
+import asyncio
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from flare_ai_social.ai.retrieval import RetrievalProvider, retrieval_query
+from flare_ai_social.ai.semantic_cache import HashingEmbedder
+from flare_ai_social.rag import PassageStore, chunk_text
+from flare_ai_social.rag.ingest import build_store
+from flare_ai_social.rag.store import PASSAGES_FILE, VECTORS_FILE
+from tests.conftest import FakeProvider
+
+DOCS = {
+    "ftso/overview.md": "# FTSO\n\nThe Flare Time Series Oracle aggregates price "
+    "submissions from data providers into a weighted median every block.",
+    "fdc.md": "# Flare Data Connector\n\nThe FDC verifies payments and events on "
+    "other chains such as Bitcoin and XRPL with attestation proofs.",
+    "notes.txt": "Validators secure the P-chain with staked FLR.",
+    "image.png": "not documentation",
+}
+
+
+@pytest.fixture
+def store(tmp_path: Path) -> PassageStore:
+    docs = tmp_path / "docs"
+    for name, text in DOCS.items():
+        (docs / name).parent.mkdir(parents=True, exist_ok=True)
+        (docs / name).write_text(text)
+    build_store(docs, HashingEmbedder(), "hashing").save(tmp_path / "index")
+    return PassageStore.load(tmp_path / "index")
+
+
+def test_chunks_overlap_and_respect_the_size() -> None:
+    """Test that long text is split into overlapping passages"""
+    words = [f"w{i}" for i in range(250)]
+    chunks = chunk_text(" ".join(words), max_words=100, overlap=20)
+    assert [len(chunk.split()) for chunk in chunks] == [100, 100, 90]
+    assert chunks[1].split()[0] == "w80"
+    with pytest.raises(ValueError, match="overlap"):
+        chunk_text("text", max_words=10, overlap=10)
+
+
+def test_ingested_store_round_trips(store: PassageStore) -> None:
+    """Test that ingestion writes one float16 row per passage"""
+    assert {p.source for p in store.passages} == {
+        "ftso/overview.md",
+        "fdc.md",
+        "notes.txt",
+    }
+    assert next(p for p in store.passages if p.source == "fdc.md").title == (
+        "Flare Data Connector"
+    )
+    assert store.vectors.shape == (3, store.dim)
+
+
+def test_relevant_passages_are_added_to_prompts(store: PassageStore) -> None:
+    """Test that the best matching passage prefixes the prompt"""
+    recorder = FakeProvider("ok")
+    provider = RetrievalProvider(recorder, store, HashingEmbedder(), k=1)
+
+    provider.generate_content("How does the oracle aggregate price data?")
+    assert "(ftso/overview.md)" in recorder.prompts[-1]
+    assert recorder.prompts[-1].endswith("How does the oracle aggregate price data?")
+
+    provider.generate_content("gm")
+    assert recorder.prompts[-1] == "gm"
+
+    provider.send_message("What is the FDC?")
+    assert recorder.prompts[-1] == "What is the FDC?"
+
+
+def test_passages_follow_the_question_not_the_prompt(store: PassageStore) -> None:
+    """Test that retrieval uses the named question over the rendered prompt"""
+    recorder = FakeProvider("ok")
+    provider = RetrievalProvider(recorder, store, HashingEmbedder(), k=1)
+    prompt = "Earlier: how does the oracle aggregate price data?\n\nWhat is the FDC?"
+
+    with retrieval_query("Which chains does the data connector verify?"):
+        asyncio.run(provider.agenerate_content(prompt))
+
+    assert "(fdc.md)" in recorder.prompts[-1]
+    assert recorder.prompts[-1].endswith(prompt)
+
+
+def test_save_switches_the_whole_index(store: PassageStore, tmp_path: Path) -> None:
+    """Test that a save replaces the matrix named by the passages file"""
+    index = tmp_path / "index"
+    before = json.loads((index / PASSAGES_FILE).read_text())["vectors"]
+
+    store.save(index)
+
+    after = json.loads((index / PASSAGES_FILE).read_text())["vectors"]
+    assert after != before
+    assert [p.name for p in index.glob("*.npy")] == [after]
+    assert PassageStore.load(index).passages == store.passages
+
+    (index / after).rename(index / VECTORS_FILE)
+    data = json.loads((index / PASSAGES_FILE).read_text())
+    del data["vectors"]
+    (index / PASSAGES_FILE).write_text(json.dumps(data))
+    assert len(PassageStore.load(index)) == len(store)
+
+
+def test_memory_mapped_search_matches_decoded(tmp_path: Path) -> None:
+    """Test that both load modes rank the passages the same way"""
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    for name, text in DOCS.items():
+        (docs / Path(name).name).write_text(text)
+    build_store(docs, HashingEmbedder(), "hashing").save(tmp_path / "index")
+    decoded = PassageStore.load(tmp_path / "index")
+    mapped = PassageStore.load(tmp_path / "index", decode=False)
+    assert mapped.vectors.dtype == np.float16
+
+    query = HashingEmbedder().embed(["price oracle"])[0]
+    assert [p for p, _ in decoded.search(query, 3)] == [
+        p for p, _ in mapped.search(query, 3)
+    ]
@@ -0,0 +1,94 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from flare_ai_social.ai.cache import served_models
+from flare_ai_social.ai.registry import ModelRegistry
+from flare_ai_social.api.routes.admin import ADMIN_TOKEN_HEADER, AdminRouter
+from tests.conftest import FakeProvider
+
+
+def make_registry() -> ModelRegistry:
+    registry = ModelRegistry(factory=lambda name: FakeProvider(model_name=name))
+    registry.register("a", FakeProvider(model_name="model-a"), weight=1.0)
+    registry.register("b", FakeProvider(model_name="model-b"))
+    return registry
+
+
+def test_traffic_follows_the_weights() -> None:
+    """Test that a split sends each variant its share and a swap moves all"""
+    registry = make_registry()
+    assert {registry.generate_content("q").text for _ in range(20)} == {"model-a"}
+
+    registry.set_weights({"a": 3.0, "b": 1.0})
+    answers = [registry.generate_content("q").text for _ in range(2000)]
+    assert 0.2 < answers.count("model-b") / len(answers) < 0.3  # noqa: PLR2004
+
+    registry.swap("b")
+    assert registry.send_message("hi").text == "model-b"
+    assert registry.stats()["b"]["requests"] > 0
+
+
+def test_serving_variant_is_reported() -> None:
+    """Test that calls report the model of the variant that served them"""
+    registry = make_registry()
+    registry.set_weights({"a": 0.0, "b": 1.0})
+
+    with served_models() as served:
+        asyncio.run(registry.agenerate_content("q"))
+        registry.send_message("hi")
+
+    assert served == ["model-b", "model-b"]
+
+
+def test_invalid_splits_are_rejected() -> None:
+    """Test that unknown variants and all-zero weights leave the split intact"""
+    registry = make_registry()
+    with pytest.raises(ValueError, match="Unknown"):
+        registry.set_weights({"c": 1.0})
+    with pytest.raises(ValueError, match="positive"):
+        registry.set_weights({"a": 0.0})
+    assert registry.primary.name == "a"
+
+
+def test_removed_variant_drains_before_closing() -> None:
+    """Test that in-flight calls finish on a variant being removed"""
+    registry = ModelRegistry()
+    slow = FakeProvider(model_name="slow", delay=0.05)
+    registry.register("slow", slow, weight=1.0)
+    registry.register("new", FakeProvider(model_name="new"))
+
+    async def run() -> str:
+        call = asyncio.create_task(registry.agenerate_content("q"))
+        await asyncio.sleep(0.01)
+        registry.swap("new")
+        await registry.remove("slow")
+        assert slow.closed
+        return (await call).text
+
+    assert asyncio.run(run()) == "slow"
+    assert registry.generate_content("q").text == "new"
+
+
+def test_admin_routes_require_the_token() -> None:
+    """Test the admin routes' auth, variant creation and traffic split"""
+    registry = make_registry()
+    app = FastAPI()
+    app.include_router(AdminRouter(registry, "secret").router)
+    client = TestClient(app)
+    auth = {ADMIN_TOKEN_HEADER: "secret"}
+
+    assert client.get("/models").status_code == 401  # noqa: PLR2004
+    created = client.post(
+        "/models", json={"name": "c", "model": "model-c"}, headers=auth
+    )
+    assert created.json()["variants"]["c"]["model"] == "model-c"
+
+    split = client.put("/models/weights", json={"weights": {"c": 1.0}}, headers=auth)
+    assert split.status_code == 200  # noqa: PLR2004
+    assert registry.generate_content("q").text == "model-c"
+
+    assert client.delete("/models/c", headers=auth).status_code == 409  # noqa: PLR2004
+    assert client.delete("/models/a", headers=auth).status_code == 200  # noqa: PLR2004
@@ -0,0 +1,123 @@
+import asyncio
+from collections.abc import Sequence
+
+import pytest
+
+from flare_ai_social.ai.deadline import deadline
+from flare_ai_social.ai.scheduler import (
+    OverloadedError,
+    Priority,
+    RequestScheduler,
+    TrafficClass,
+    traffic,
+)
+
+CLASSES = {
+    "chat": TrafficClass(Priority.INTERACTIVE, weight=2.0),
+    "group": TrafficClass(Priority.INTERACTIVE, weight=1.0),
+    "backfill": TrafficClass(Priority.BACKGROUND),
+}
+
+
+async def dispatch_order(
+    scheduler: RequestScheduler, requests: Sequence[tuple[str, float | None]]
+) -> list[int]:
+    """Queue requests behind a held slot and return the order they ran in."""
+    order: list[int] = []
+
+    async def call(i: int, source: str, seconds: float | None) -> None:
+        async with deadline(seconds, "test"), scheduler.slot(source):
+            order.append(i)
+
+    async with scheduler.slot("chat"):
+        tasks = [
+            asyncio.create_task(call(i, source, seconds))
+            for i, (source, seconds) in enumerate(requests)
+        ]
+        await asyncio.sleep(0.01)
+    await asyncio.gather(*tasks)
+    return order
+
+
+def test_interactive_traffic_goes_first() -> None:
+    """Test that queued interactive calls overtake background ones"""
+    scheduler = RequestScheduler(max_concurrency=1, classes=CLASSES)
+    order = asyncio.run(
+        dispatch_order(scheduler, [("backfill", None), ("group", None)])
+    )
+    assert order == [1, 0]
+
+
+def test_sources_share_by_weight() -> None:
+    """Test that a source with twice the weight gets twice the slots"""
+    scheduler = RequestScheduler(max_concurrency=1, classes=CLASSES)
+    requests = [("group", None)] * 6 + [("chat", None)] * 6
+    order = asyncio.run(dispatch_order(scheduler, requests))
+    first = [requests[i][0] for i in order[:6]]
+    assert first.count("chat") == 4  # noqa: PLR2004
+    assert first.count("group") == 2  # noqa: PLR2004
+
+
+def test_earliest_deadline_first_within_a_source() -> None:
+    """Test that calls of one source run in deadline order"""
+    scheduler = RequestScheduler(max_concurrency=1, classes=CLASSES)
+    order = asyncio.run(
+        dispatch_order(scheduler, [("chat", 30.0), ("chat", 5.0), ("chat", 10.0)])
+    )
+    assert order == [1, 2, 0]
+
+
+def test_stale_background_work_is_shed() -> None:
+    """Test that background calls waiting too long are dropped"""
+    scheduler = RequestScheduler(max_concurrency=1, stale_after=0.01, classes=CLASSES)
+
+    async def run() -> None:
+        async with scheduler.slot("chat"):
+            waiting = asyncio.create_task(scheduler.slot("backfill").__aenter__())
+            await asyncio.sleep(0.05)
+        await waiting
+
+    with pytest.raises(OverloadedError, match="stale"):
+        asyncio.run(run())
+    assert scheduler.stats()["backfill"]["shed"] == 1
+
+
+def test_full_queue_sheds_lowest_priority() -> None:
+    """Test that a full queue makes room for interactive traffic"""
+    scheduler = RequestScheduler(max_concurrency=1, max_queue=1, classes=CLASSES)
+
+    async def run() -> list[BaseException | None]:
+        async def call(source: str) -> None:
+            with traffic(source):
+                async with scheduler.slot():
+                    pass
+
+        async with scheduler.slot("chat"):
+            backfill = asyncio.create_task(call("backfill"))
+            await asyncio.sleep(0.01)
+            chat = asyncio.create_task(call("chat"))
+            await asyncio.sleep(0.01)
+        return list(await asyncio.gather(backfill, chat, return_exceptions=True))
+
+    backfill, chat = asyncio.run(run())
+    assert isinstance(backfill, OverloadedError)
+    assert chat is None
+
+
+def test_blocking_slot_from_another_thread() -> None:
+    """Test that blocking callers are woken when an async slot is released"""
+    scheduler = RequestScheduler(max_concurrency=1, classes=CLASSES)
+
+    def blocking() -> str:
+        with scheduler.blocking_slot("group"):
+            return "done"
+
+    async def run() -> str:
+        async with scheduler.slot("chat"):
+            result = asyncio.create_task(asyncio.to_thread(blocking))
+            await asyncio.sleep(0.01)
+            assert not result.done()
+        return await result
+
+    assert asyncio.run(run()) == "done"
+    assert scheduler.stats()["group"]["admitted"] == 1
@@ -0,0 +1,44 @@
+from pathlib import Path
+
+from flare_ai_social.prompts.selector import (
+    FewShotExample,
+    FewShotSelector,
+    render_examples,
+)
+
+EXAMPLES = [
+    FewShotExample("Where can I short $TRUMP coin?", "Perps on Flare."),
+    FewShotExample("Is the FTSO better than Chainlink?", "Different designs."),
+    FewShotExample("When do FAssets launch for XRP?", "Soon."),
+    FewShotExample("gm frens", "gm"),
+]
+TRAINING_DATA = Path(__file__).parent.parent / "src" / "data" / "training_data.json"
+
+
+def test_selects_most_similar_examples_first() -> None:
+    """Test that examples sharing rare terms with the prompt rank first"""
+    selector = FewShotSelector(EXAMPLES, k=2)
+
+    selected = selector.select("How do FAssets work with XRP?")
+
+    assert selected[0] == EXAMPLES[2]
+    assert len(selected) == 1
+
+
+def test_no_overlap_selects_nothing() -> None:
+    """Test that unrelated prompts fall back to zero-shot"""
+    selector = FewShotSelector(EXAMPLES)
+
+    assert selector.select("lorem ipsum") == []
+    assert render_examples([]) == ""
+
+
+def test_training_data_index() -> None:
+    """Test indexing the bundled tuning dataset"""
+    selector = FewShotSelector.from_json(TRAINING_DATA)
+
+    selected = selector.select("Where can I short $TRUMP Coin?")
+
+    assert len(selected) == selector.k
+    assert selected[0].text_input.startswith("Where can I short $TRUMP")
+    assert render_examples(selected).count("*Text Input:*") == selector.k
@@ -0,0 +1,101 @@
+import asyncio
+from pathlib import Path
+
+import numpy as np
+
+from flare_ai_social.ai.cache import no_cache, report_served_model
+from flare_ai_social.ai.semantic_cache import (
+    HashingEmbedder,
+    SemanticCacheProvider,
+    VectorIndex,
+)
+from tests.conftest import FakeProvider
+
+SCOPE = 1
+
+
+def test_embedder_is_deterministic() -> None:
+    """Test that embeddings are stable unit vectors"""
+    embedder = HashingEmbedder(dim=64)
+    first = embedder.embed(["What is FAssets?"])
+    second = HashingEmbedder(dim=64).embed(["What is FAssets?"])
+
+    np.testing.assert_array_equal(first, second)
+    assert np.isclose(np.linalg.norm(first[0]), 1.0)
+
+
+def test_paraphrase_hits_and_new_topic_misses() -> None:
+    """Test that near-duplicates reuse an answer and other topics do not"""
+    provider = FakeProvider(lambda prompt, _: f"answer to {prompt}")
+    cached = SemanticCacheProvider(provider)
+
+    first = cached.generate_content("what is FAssets?")
+    paraphrase = asyncio.run(cached.agenerate_content("explain FAssets pls"))
+    cached.generate_content("what is FTSO?")
+
+    assert paraphrase.text == first.text
+    assert paraphrase.metadata["cached_prompt"] == "what is FAssets?"
+    assert provider.prompts == ["what is FAssets?", "what is FTSO?"]
+    assert cached.stats()["hits"] == 1
+
+
+def test_bypass_and_response_format_skip_cached_answers() -> None:
+    """Test that no_cache() and a different response format reach the model"""
+    provider = FakeProvider(lambda prompt, _: f"answer to {prompt}")
+    cached = SemanticCacheProvider(provider)
+
+    cached.generate_content("what is FAssets?")
+    cached.generate_content("what is FAssets?", response_mime_type="application/json")
+    with no_cache():
+        cached.generate_content("what is FAssets?")
+
+    assert len(provider.prompts) == 3  # noqa: PLR2004
+
+
+def test_answers_from_another_model_are_not_reused() -> None:
+    """Test that an answer reported by a non-primary model is scoped to it"""
+
+    def variant(prompt: str, calls: int) -> str:
+        if calls == 1:
+            report_served_model("model-b")
+        return f"answer {calls} to {prompt}"
+
+    provider = FakeProvider(variant)
+    cached = SemanticCacheProvider(provider)
+
+    cached.generate_content("what is FAssets?")
+    cached.generate_content("what is FAssets?")
+    cached.generate_content("explain FAssets pls")
+
+    assert len(provider.prompts) == 2  # noqa: PLR2004
+    assert cached.stats()["hits"] == 1
+
+
+def test_index_evicts_least_recently_used() -> None:
+    """Test that a full index replaces the entry unused for longest"""
+    embedder = HashingEmbedder(dim=64)
+    index = VectorIndex(embedder.dim, capacity=2)
+    a, b, c = embedder.embed(["FAssets", "FTSO", "staking"])
+    index.add(a, {"text": "a"}, SCOPE, ttl=60)
+    index.add(b, {"text": "b"}, SCOPE, ttl=60)
+    assert index.search(a, SCOPE, threshold=0.9) is not None
+    index.add(c, {"text": "c"}, SCOPE, ttl=60)
+
+    assert index.search(a, SCOPE, threshold=0.9) is not None
+    assert index.search(b, SCOPE, threshold=0.9) is None
+    assert index.search(a, SCOPE + 1, threshold=0.9) is None
+
+
+def test_memory_mapped_index_persists(tmp_path: Path) -> None:
+    """Test that a flushed memory-mapped index is reloaded with its entries"""
+    embedder = HashingEmbedder(dim=64)
+    vector = embedder.embed(["FAssets"])[0]
+    index = VectorIndex(embedder.dim, capacity=8, path=tmp_path / "index.f32")
+    index.add(vector, {"text": "cached"}, SCOPE, ttl=60)
+    index.flush()
+
+    reloaded = VectorIndex(embedder.dim, capacity=8, path=tmp_path / "index.f32")
+    match = reloaded.search(vector, SCOPE, threshold=0.9)
+
+    assert match is not None
+    assert match[1] == {"text": "cached"}
@@ -0,0 +1,80 @@
+import asyncio
+import json
+from pathlib import Path
+
+from flare_ai_social.ai.deadline import deadline
+from flare_ai_social.ai.scheduler import traffic
+from flare_ai_social.ai.shadow import ShadowProvider, ShadowStore
+from tests.conftest import FakeProvider
+
+
+def echo(model_name: str, delay: float = 0.0) -> FakeProvider:
+    return FakeProvider(
+        lambda prompt, _: f"{model_name}: {prompt}", model_name=model_name, delay=delay
+    )
+
+
+def test_sampled_prompts_are_mirrored_and_stored(tmp_path: Path) -> None:
+    """Test that mirrored calls are recorded next to production's answer"""
+    store = ShadowStore(tmp_path / "shadow.jsonl")
+    candidate = echo("candidate")
+    provider = ShadowProvider(echo("production"), candidate, store, sample_rate=1.0)
+
+    async def run() -> str:
+        with traffic("api"):
+            async with deadline(5.0, "test"):
+                response = await provider.agenerate_content("gm")
+        chunks = [chunk async for chunk in provider.stream_content("gn")]
+        await provider.aclose()
+        return response.text + "".join(chunks)
+
+    assert asyncio.run(run()).startswith("production: gm")
+    # The mirrored call runs outside the request's deadline
+    assert candidate.prompts == ["gm", "gn"]
+    assert candidate.remaining == [None, None]
+
+    first = store.records()[0]
+    assert first.source == "api"
+    assert first.production == "production: gm"
+    assert first.candidate == "candidate: gm"
+    assert first.similarity is not None
+    assert 0 < first.similarity < 1
+    lines = (tmp_path / "shadow.jsonl").read_text().splitlines()
+    assert json.loads(lines[0])["candidate_model"] == "candidate"
+    assert store.stats()["mirrored"] == 2  # noqa: PLR2004
+
+
+def test_slow_candidate_does_not_delay_production() -> None:
+    """Test that the caller never waits on the candidate"""
+    store = ShadowStore()
+    provider = ShadowProvider(
+        echo("production"),
+        echo("candidate", delay=0.2),
+        store,
+        sample_rate=1.0,
+        concurrency=1,
+    )
+
+    async def run() -> float:
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        for _ in range(3):
+            await provider.agenerate_content("gm")
+        elapsed = loop.time() - started
+        await provider.aclose()
+        return elapsed
+
+    assert asyncio.run(run()) < 0.1  # noqa: PLR2004
+    # Samples beyond the concurrency budget are dropped, not queued
+    assert store.stats()["mirrored"] == 1
+    assert store.stats()["dropped"] == 2  # noqa: PLR2004
+
+
+def test_unsampled_prompts_are_not_mirrored() -> None:
+    """Test that a zero sample rate leaves the candidate idle"""
+    candidate = echo("candidate")
+    provider = ShadowProvider(
+        echo("production"), candidate, ShadowStore(), sample_rate=0.0
+    )
+    asyncio.run(provider.agenerate_content("gm"))
+    assert candidate.prompts == []
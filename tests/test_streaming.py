@@ -0,0 +1,83 @@
+import asyncio
+from collections.abc import AsyncIterator
+from typing import TYPE_CHECKING, cast
+
+from telegram.error import RetryAfter
+
+from flare_ai_social.telegram.streaming import (
+    TELEGRAM_MAX_MESSAGE_LENGTH,
+    StreamingReply,
+)
+
+if TYPE_CHECKING:
+    from telegram import Message
+
+
+class FakeMessage:
+    """Telegram message that records replies and edits."""
+
+    def __init__(self, text: str = "", flood: int = 0) -> None:
+        self.text = text
+        self.flood = flood
+        self.replies: list[FakeMessage] = []
+        self.edits = 0
+
+    async def reply_text(self, text: str) -> "FakeMessage":
+        sent = FakeMessage(text, self.flood)
+        self.replies.append(sent)
+        return sent
+
+    async def edit_text(self, text: str) -> None:
+        if self.flood:
+            self.flood -= 1
+            raise RetryAfter(0)
+        self.edits += 1
+        self.text = text
+
+
+async def stream(*chunks: str) -> AsyncIterator[str]:
+    for chunk in chunks:
+        yield chunk
+
+
+def run(message: FakeMessage, *chunks: str, edit_interval: float) -> StreamingReply:
+    reply = StreamingReply(cast("Message", message), edit_interval=edit_interval)
+    asyncio.run(reply.run(stream(*chunks)))
+    return reply
+
+
+def test_edits_are_throttled() -> None:
+    """Test that chunks inside the edit interval are shown by one final edit"""
+    throttled = FakeMessage()
+    run(throttled, "Flare ", "is ", "an ", "L1", edit_interval=60.0)
+    [sent] = throttled.replies
+    assert sent.text == "Flare is an L1"
+    assert sent.edits == 1
+
+    unthrottled = FakeMessage()
+    run(unthrottled, "Flare ", "is ", "an ", "L1", edit_interval=0.0)
+    assert unthrottled.replies[0].edits == 3  # noqa: PLR2004
+
+
+def test_rate_limited_edits_are_postponed_and_final_edit_retried() -> None:
+    """Test that RetryAfter skips an intermediate edit but not the final one"""
+    intermediate = FakeMessage(flood=1)
+    run(intermediate, "a", "b", "c", edit_interval=0.0)
+    assert intermediate.replies[0].text == "abc"
+    assert intermediate.replies[0].edits == 1
+
+    final = FakeMessage(flood=1)
+    run(final, "a", "b", "c", edit_interval=60.0)
+    assert final.replies[0].text == "abc"
+
+
+def test_long_replies_roll_over_into_new_messages() -> None:
+    """Test that text past the message limit continues in a follow-up"""
+    message = FakeMessage()
+    chunks = ["x" * 3000, "y" * 3000]
+    reply = run(message, *chunks, edit_interval=0.0)
+
+    texts = [sent.text for sent in message.replies]
+    assert [len(text) for text in texts] == [TELEGRAM_MAX_MESSAGE_LENGTH, 1904]
+    assert "".join(texts) == "".join(chunks)
+    assert [text for _, text in reply.sent] == texts
@@ -0,0 +1,73 @@
+import asyncio
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Any, cast
+
+from telegram import Message, Update, User
+
+from flare_ai_social.telegram import TelegramBot
+from tests.conftest import FakeProvider
+
+if TYPE_CHECKING:
+    from telegram.ext import ContextTypes
+
+BOT = User(id=42, first_name="Flare Pulse", is_bot=True, username="FlarePulseBot")
+GROUP = {"id": -100, "type": "supergroup", "title": "Flare"}
+QUESTION = "@FlarePulseBot what is FTSO?"
+
+
+class FakeBot:
+    """Telegram bot API that records the messages sent."""
+
+    def __init__(self) -> None:
+        self.sent: list[str] = []
+
+    async def get_me(self) -> User:
+        return BOT
+
+    async def send_chat_action(self, **_: Any) -> None:
+        return None
+
+    async def send_message(self, *, chat_id: int, text: str, **_: Any) -> Message:
+        self.sent.append(text)
+        data = {
+            "message_id": 1000 + len(self.sent),
+            "date": 0,
+            "chat": GROUP,
+            "from": BOT.to_dict(),
+            "text": text,
+        }
+        return Message.de_json(data, cast("Any", self))
+
+
+def group_update(update_id: int, user_id: int, name: str, bot: FakeBot) -> Update:
+    message = {
+        "message_id": update_id,
+        "date": 0,
+        "chat": GROUP,
+        "from": {"id": user_id, "is_bot": False, "first_name": name},
+        "text": QUESTION,
+        "entities": [{"type": "mention", "offset": 0, "length": 14}],
+    }
+    return Update.de_json(
+        {"update_id": update_id, "message": message}, cast("Any", bot)
+    )
+
+
+def test_same_question_in_a_group_is_generated_once() -> None:
+    """Test that concurrent identical questions in one chat share a call"""
+    provider = FakeProvider("FTSO is Flare's oracle.", delay=0.05)
+    bot = TelegramBot(provider, "token", stream_replies=False)
+    api = FakeBot()
+    context = cast("ContextTypes.DEFAULT_TYPE", SimpleNamespace(bot=api))
+
+    async def run() -> None:
+        await asyncio.gather(
+            bot.handle_message(group_update(1, 7, "alice", api), context),
+            bot.handle_message(group_update(2, 8, "bob", api), context),
+        )
+
+    asyncio.run(run())
+
+    assert provider.calls == 1
+    assert api.sent == ["FTSO is Flare's oracle."] * 2
+    assert len(bot.conversations.get(GROUP["id"]).turns) == 4  # noqa: PLR2004
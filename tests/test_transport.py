@@ -0,0 +1,108 @@
+import asyncio
+from typing import Any
+
+import httpx
+import pytest
+from requests.adapters import HTTPAdapter
+
+from flare_ai_social.ai.base import AsyncBaseRouter
+from flare_ai_social.ai.transport import TransportConfig, parse_retry_after
+from tests.conftest import Handler, MockTransportConfig, scripted
+
+
+class Router(AsyncBaseRouter):
+    async def get(
+        self,
+        endpoint: str,
+        timeout: float | None = None,  # noqa: ASYNC109
+    ) -> dict[str, Any]:
+        return await self._get(endpoint, timeout=timeout)
+
+    async def post(self, endpoint: str) -> dict[str, Any]:
+        return await self._post(endpoint, {"prompt": "gm"})
+
+    async def stream(self, endpoint: str) -> list[dict[str, Any]]:
+        return [event async for event in self._stream_post(endpoint, {})]
+
+
+def make_router(handler: Handler) -> Router:
+    return Router("https://api.test", transport=MockTransportConfig(handler=handler))
+
+
+def test_transient_status_is_retried() -> None:
+    """Test that 429 and 5xx responses are retried until one succeeds"""
+    handler, seen = scripted(
+        httpx.Response(429, headers={"Retry-After": "0"}),
+        httpx.Response(503, headers={"Retry-After": "0"}),
+        httpx.Response(200, json={"ok": True}),
+    )
+    router = make_router(handler)
+
+    assert asyncio.run(router.get("/models")) == {"ok": True}
+    assert len(seen) == 3  # noqa: PLR2004
+
+
+def test_retries_stop_at_the_deadline() -> None:
+    """Test that a Retry-After beyond the deadline ends the retries"""
+    handler, seen = scripted(httpx.Response(503, headers={"Retry-After": "60"}))
+    router = make_router(handler)
+
+    with pytest.raises(ConnectionError, match="503"):
+        asyncio.run(router.get("/models", timeout=1.0))
+    assert len(seen) == 1
+
+
+def test_posts_are_only_retried_when_unprocessed() -> None:
+    """Test that a POST is retried on connect errors and 503 but not after 502"""
+    handler, seen = scripted(
+        httpx.ConnectError("refused"),
+        httpx.Response(503, headers={"Retry-After": "0"}),
+        httpx.Response(200, json={"ok": True}),
+    )
+    assert asyncio.run(make_router(handler).post("/chat")) == {"ok": True}
+    assert len(seen) == 3  # noqa: PLR2004
+
+    for failure in (httpx.Response(502), httpx.ReadError("reset")):
+        handler, seen = scripted(failure, httpx.Response(200, json={}))
+        with pytest.raises(ConnectionError):
+            asyncio.run(make_router(handler).post("/chat"))
+        assert len(seen) == 1
+
+
+def test_sync_session_retries_posts_only_when_unprocessed() -> None:
+    """Test the status policy of the pooled requests session"""
+    adapter = TransportConfig().requests_session().get_adapter("https://")
+    assert isinstance(adapter, HTTPAdapter)
+    retry = adapter.max_retries
+    assert retry.is_retry("GET", 502)
+    assert retry.is_retry("POST", 503)
+    assert not retry.is_retry("POST", 502)
+
+
+def test_event_stream_is_parsed() -> None:
+    """Test that keep-alive comments are skipped and [DONE] ends the stream"""
+    body = (
+        ": OPENROUTER PROCESSING\n\n"
+        'data: {"n": 1}\n\n'
+        ": keep-alive\n"
+        "event: ping\n\n"
+        'data: {"n": 2}\n\n'
+        "data: [DONE]\n\n"
+        'data: {"n": 3}\n\n'
+    )
+    handler, _ = scripted(httpx.Response(200, text=body))
+    assert asyncio.run(make_router(handler).stream("/chat")) == [{"n": 1}, {"n": 2}]
+
+
+def test_event_stream_error_status_raises() -> None:
+    """Test that a non-200 answer to a stream request raises with its body"""
+    handler, _ = scripted(httpx.Response(400, text="bad model"))
+    with pytest.raises(ConnectionError, match=r"\(400\): bad model"):
+        asyncio.run(make_router(handler).stream("/chat"))
+
+
+def test_parse_retry_after() -> None:
+    """Test that delta-seconds and HTTP dates are both understood"""
+    assert parse_retry_after("2") == 2.0  # noqa: PLR2004
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert parse_retry_after("soon") is None